@@ -0,0 +1,28 @@
+"""Benchmarks for the PID thermostat integration."""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from homeassistant import loader
+from homeassistant.util.unit_system import METRIC_SYSTEM
+from pytest_homeassistant_custom_component.common import async_test_home_assistant
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from homeassistant.core import HomeAssistant
+
+
+@asynccontextmanager
+async def async_bench_hass() -> AsyncIterator[HomeAssistant]:
+    """Boot a local Home Assistant test instance with custom integrations."""
+    async with async_test_home_assistant() as hass:
+        # Same as the enable_custom_integrations fixture of the tests
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+        hass.config.units = METRIC_SYSTEM
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
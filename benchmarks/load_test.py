@@ -0,0 +1,226 @@
+"""
+Synthetic load test for fleet-scale PID thermostat deployments.
+
+Boots a local Home Assistant test instance with N PID thermostats, each bound
+to its own synthetic temperature sensor and input_number heater. The sensors
+follow a simple first-order room model driven by their heater. After the run
+the event loop lag percentiles, CPU time, RSS, service calls per second and
+state writes per second are reported. No network or external services are
+used.
+
+Run from the repository root with `python -m benchmarks.load_test`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import resource
+import statistics
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.components.climate import HVACMode
+from homeassistant.components.input_number import CONF_MAX, CONF_MIN, CONF_STEP
+from homeassistant.const import (
+    CONF_NAME,
+    CONF_PLATFORM,
+    EVENT_CALL_SERVICE,
+    EVENT_STATE_CHANGED,
+    EVENT_STATE_REPORTED,
+    Platform,
+)
+from homeassistant.core import Event, callback
+from homeassistant.setup import async_setup_component
+
+from custom_components.pid_thermostat.const import (
+    CONF_CYCLE_TIME,
+    CONF_DIRECT_OUTPUT,
+    CONF_HEATER,
+    CONF_INITIAL_HVAC_MODE,
+    CONF_PID_KD,
+    CONF_PID_KI,
+    CONF_PID_KP,
+    CONF_SENSOR,
+    DOMAIN,
+)
+
+from . import async_bench_hass
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+LAG_PROBE_INTERVAL = 0.01
+ROOM_OUTDOOR_TEMP = 5.0
+ROOM_START_TEMP = 15.0
+ROOM_HEAT_GAIN = 0.02  # degC per second at full output
+ROOM_LOSS = 0.001  # per second
+
+
+def _climate_config(args: argparse.Namespace) -> dict:
+    """Return the YAML configuration of all thermostats."""
+    return {
+        Platform.CLIMATE: [
+            {
+                CONF_PLATFORM: DOMAIN,
+                CONF_NAME: f"Bench {i}",
+                CONF_SENSOR: f"sensor.bench_{i}",
+                CONF_HEATER: f"input_number.bench_{i}",
+                CONF_CYCLE_TIME: {"seconds": args.cycle_time},
+                CONF_PID_KP: 20.0,
+                CONF_PID_KI: 0.05,
+                CONF_PID_KD: 0.0,
+                CONF_INITIAL_HVAC_MODE: HVACMode.HEAT,
+                CONF_DIRECT_OUTPUT: args.direct_output,
+            }
+            for i in range(args.thermostats)
+        ]
+    }
+
+
+def _heater_config(count: int) -> dict:
+    """Return the configuration of all input_number heaters."""
+    return {
+        "input_number": {
+            f"bench_{i}": {
+                CONF_NAME: f"Bench {i}",
+                CONF_MIN: 0,
+                CONF_MAX: 100,
+                CONF_STEP: 1,
+            }
+            for i in range(count)
+        }
+    }
+
+
+async def _async_drive_sensors(
+    hass: HomeAssistant, count: int, interval: float
+) -> None:
+    """Update the synthetic sensors round-robin, spread evenly over the interval."""
+    temps = [ROOM_START_TEMP] * count
+    step = interval / count
+    while True:
+        for i in range(count):
+            heater = hass.states.get(f"input_number.bench_{i}")
+            output = float(heater.state) if heater else 0.0
+            temps[i] += interval * (
+                ROOM_HEAT_GAIN * output / 100.0
+                - ROOM_LOSS * (temps[i] - ROOM_OUTDOOR_TEMP)
+            )
+            hass.states.async_set(f"sensor.bench_{i}", round(temps[i], 2))
+            await asyncio.sleep(step)
+
+
+async def _async_probe_lag(lags: list[float]) -> None:
+    """Record how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_PROBE_INTERVAL
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    """Return a percentile of the values in milliseconds."""
+    if len(values) < 2:  # noqa: PLR2004
+        return values[0] * 1e3 if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1] * 1e3
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run the load test."""
+    async with async_bench_hass() as hass:
+        for i in range(args.thermostats):
+            hass.states.async_set(f"sensor.bench_{i}", ROOM_START_TEMP)
+        assert await async_setup_component(
+            hass, "input_number", _heater_config(args.thermostats)
+        )
+        assert await async_setup_component(
+            hass, Platform.CLIMATE, _climate_config(args)
+        )
+        await hass.async_block_till_done()
+
+        counters = {"service_calls": 0, "state_writes": 0}
+
+        @callback
+        def _count_service_call(_event: Event) -> None:
+            counters["service_calls"] += 1
+
+        @callback
+        def _count_state_write(_event: Event) -> None:
+            counters["state_writes"] += 1
+
+        @callback
+        def _all_states(_event_data: dict) -> bool:
+            return True
+
+        unsubs = [
+            hass.bus.async_listen(EVENT_CALL_SERVICE, _count_service_call),
+            hass.bus.async_listen(EVENT_STATE_CHANGED, _count_state_write),
+            hass.bus.async_listen(
+                EVENT_STATE_REPORTED, _count_state_write, event_filter=_all_states
+            ),
+        ]
+        lags: list[float] = []
+        tasks = [
+            hass.async_create_background_task(
+                _async_drive_sensors(hass, args.thermostats, args.sensor_interval),
+                "pid_thermostat load test sensors",
+            ),
+            hass.async_create_background_task(
+                _async_probe_lag(lags), "pid_thermostat load test lag probe"
+            ),
+        ]
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        for unsub in unsubs:
+            unsub()
+
+        rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"Thermostats:        {args.thermostats}")
+        print(f"Duration:           {wall:.1f} s")
+        print(
+            "Event loop lag:     "
+            f"p50 {_percentile(lags, 50):.2f} ms, "
+            f"p95 {_percentile(lags, 95):.2f} ms, "
+            f"p99 {_percentile(lags, 99):.2f} ms, "
+            f"max {max(lags, default=0.0) * 1e3:.2f} ms"
+        )
+        print(f"CPU time:           {cpu:.2f} s ({cpu / wall * 100:.1f} %)")
+        print(f"Peak RSS:           {rss_mib:.1f} MiB")
+        print(f"Service calls/s:    {counters['service_calls'] / wall:.1f}")
+        print(f"State writes/s:     {counters['state_writes'] / wall:.1f}")
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--thermostats", type=int, default=100)
+    parser.add_argument(
+        "--sensor-interval",
+        type=float,
+        default=10.0,
+        help="seconds between updates of each sensor",
+    )
+    parser.add_argument(
+        "--cycle-time", type=float, default=5.0, help="PID cycle time in seconds"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=60.0, help="run time in seconds"
+    )
+    parser.add_argument("--direct-output", action="store_true")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark the output write paths of the PID thermostat.
+
+Compares the `set_value` service call with the direct in-process write for an
+input_number output and reports wall-clock latency and CPU time per write.
+
+Run from the repository root with `python -m benchmarks.output_write`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from homeassistant.components.input_number import CONF_MAX, CONF_MIN, CONF_STEP
+from homeassistant.const import CONF_NAME
+from homeassistant.setup import async_setup_component
+
+from custom_components.pid_thermostat.output import OutputWriter
+
+from . import async_bench_hass
+
+ENTITY_HEATER = "input_number.heater"
+
+
+async def _async_measure(writer: OutputWriter, writes: int) -> tuple[float, float]:
+    """Return wall-clock and CPU time per write in microseconds."""
+    hass = writer.hass
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for i in range(writes):
+        await writer.async_set_value(float(i % 100))
+    # The service call is not blocking; include the time until it is handled
+    await hass.async_block_till_done()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return wall / writes * 1e6, cpu / writes * 1e6
+
+
+async def async_main(writes: int) -> None:
+    """Run the output write benchmark."""
+    async with async_bench_hass() as hass:
+        assert await async_setup_component(
+            hass,
+            "input_number",
+            {
+                "input_number": {
+                    "heater": {
+                        CONF_NAME: "Heater",
+                        CONF_MIN: 0,
+                        CONF_MAX: 100,
+                        CONF_STEP: 1,
+                    }
+                }
+            },
+        )
+        await hass.async_block_till_done()
+
+        results = {}
+        for direct in (False, True):
+            writer = OutputWriter(hass, ENTITY_HEATER, direct=direct)
+            # Warm up caches and lazy imports before measuring
+            await _async_measure(writer, 100)
+            results[direct] = await _async_measure(writer, writes)
+
+        service_wall, service_cpu = results[False]
+        direct_wall, direct_cpu = results[True]
+        print(f"Writes per path: {writes}")
+        for label, wall, cpu in (
+            ("Service call", service_wall, service_cpu),
+            ("Direct write", direct_wall, direct_cpu),
+            ("Saved per write", service_wall - direct_wall, service_cpu - direct_cpu),
+        ):
+            print(f"{label:<16} {wall:8.1f} us wall, {cpu:8.1f} us CPU")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(async_main(args.writes))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,40 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from .const import PLATFORMS
+import homeassistant.helpers.config_validation as cv
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+from .const import DOMAIN, PLATFORMS
+from .metrics import PidThermostatMetricsView, async_get_metrics
+from .reload import DATA_YAML_THERMOSTATS, YamlThermostats
+from .rooms import EntryThermostats
+from .schedule import DATA_SCHEDULER, ScheduleEngine
+from .services import async_setup_services
+from .storage import DATA_STORE, ThermostatStore
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
+
+CONFIG_SCHEMA = cv.platform_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:  # noqa: ARG001
+    """Set up the PID thermostat integration services, schedules and metrics."""
+    store = hass.data[DATA_STORE] = ThermostatStore(hass)
+    await store.async_load()
+    scheduler = hass.data[DATA_SCHEDULER] = ScheduleEngine(hass, store)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, scheduler.async_shutdown)
+    hass.data[DATA_YAML_THERMOSTATS] = YamlThermostats()
+    async_setup_services(hass)
+    hass.http.register_view(PidThermostatMetricsView(async_get_metrics(hass)))
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up slow PID Controller from a config entry."""
+    entry.runtime_data = EntryThermostats(entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     entry.async_on_unload(entry.add_update_listener(config_entry_update_listener))
@@ -21,7 +46,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def config_entry_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update listener, called when the config entry options are changed."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    # Only the changed rooms are rebuilt, not the whole entry
+    await entry.runtime_data.async_update(hass, entry)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -0,0 +1,185 @@
+"""Relay autotune of the PID thermostat."""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from enum import StrEnum
+from typing import Any
+
+
+class TuningRule(StrEnum):
+    """Rule to compute the gains from the ultimate gain and period."""
+
+    ZIEGLER_NICHOLS = "ziegler_nichols"
+    TYREUS_LUYBEN = "tyreus_luyben"
+    SIMC = "simc"
+
+
+class AutotuneState(StrEnum):
+    """State of a relay experiment."""
+
+    RUNNING = "running"
+    DONE = "done"
+    ABORTED = "aborted"
+
+
+# Spread of the measured periods and amplitudes that counts as stable
+STABLE_SPREAD = 0.1
+
+
+def tuning_gains(
+    rule: TuningRule, ultimate_gain: float, ultimate_period: float
+) -> tuple[float, float, float]:
+    """Return kp, ki (per second) and kd (seconds) of a tuning rule."""
+    if rule is TuningRule.ZIEGLER_NICHOLS:
+        kp = 0.6 * ultimate_gain
+        integral_time = ultimate_period / 2
+        derivative_time = ultimate_period / 8
+    elif rule is TuningRule.TYREUS_LUYBEN:
+        kp = ultimate_gain / 2.2
+        integral_time = 2.2 * ultimate_period
+        derivative_time = ultimate_period / 6.3
+    else:
+        # SIMC PI for a room as an integrating process with dead time, for
+        # which the period is four dead times, with the closed loop time
+        # constant equal to the dead time
+        kp = ultimate_gain / math.pi
+        integral_time = 2 * ultimate_period
+        derivative_time = 0.0
+    return kp, kp / integral_time, kp * derivative_time
+
+
+class RelayAutotune:
+    """
+    Åström-Hägglund relay experiment.
+
+    The output is switched between its limits when the temperature crosses
+    the setpoint, with a hysteresis against sensor noise, which makes the
+    temperature oscillate at the ultimate period. Every period between two
+    switches to the high output gives a period and an amplitude, of which
+    only the last few are kept. Once they agree, the ultimate gain follows
+    from the describing function of the relay. The experiment aborts when the
+    temperature leaves a band around the setpoint or on a timeout.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        setpoint: float,
+        low: float,
+        high: float,
+        *,
+        direction: int,
+        hysteresis: float,
+        max_deviation: float,
+        timeout: float,
+        cycles: int,
+        start: float,
+    ) -> None:
+        """Initialize the experiment."""
+        self.setpoint = setpoint
+        self._low = low
+        self._high = high
+        self._direction = direction
+        self._hysteresis = hysteresis
+        self._max_deviation = max_deviation
+        self._deadline = start + timeout
+        self._relay_high: bool | None = None
+        self._period_start: float | None = None
+        self._first_period_start = start
+        self._minimum = math.inf
+        self._maximum = -math.inf
+        self._measurements: deque[tuple[float, float]] = deque(maxlen=cycles)
+        self._output_integral = 0.0
+        self._last_time: float | None = None
+        self.state = AutotuneState.RUNNING
+        self.reason: str | None = None
+        self.mean_output: float | None = None
+        self.ultimate_gain: float | None = None
+        self.ultimate_period: float | None = None
+
+    @property
+    def output(self) -> float:
+        """Return the relay output."""
+        return self._high if self._relay_high else self._low
+
+    def abort(self, reason: str) -> None:
+        """Stop the experiment without a result."""
+        self.state = AutotuneState.ABORTED
+        self.reason = reason
+
+    def update(self, now: float, process_value: float) -> float:
+        """Process a temperature and return the relay output."""
+        if now > self._deadline:
+            self.abort("timeout")
+        elif abs(process_value - self.setpoint) > self._max_deviation:
+            self.abort("temperature left the allowed band around the setpoint")
+        if self.state is not AutotuneState.RUNNING:
+            return self.output
+        if self._period_start is not None and self._last_time is not None:
+            self._output_integral += self.output * (now - self._last_time)
+        self._last_time = now
+        self._minimum = min(self._minimum, process_value)
+        self._maximum = max(self._maximum, process_value)
+
+        error = self._direction * (self.setpoint - process_value)
+        if error > self._hysteresis and not self._relay_high:
+            self._relay_high = True
+            self._period_done(now)
+        elif error < -self._hysteresis and self._relay_high is not False:
+            self._relay_high = False
+        return self.output
+
+    def _period_done(self, now: float) -> None:
+        """Record a period, started and ended by a switch to the high output."""
+        if self._period_start is not None:
+            self._measurements.append(
+                (now - self._period_start, (self._maximum - self._minimum) / 2)
+            )
+        else:
+            # The first partial period is the approach to the setpoint
+            self._output_integral = 0.0
+            self._first_period_start = now
+        self._period_start = now
+        self._minimum = math.inf
+        self._maximum = -math.inf
+        if len(self._measurements) == self._measurements.maxlen and self._stable():
+            self._finish(now)
+
+    def _stable(self) -> bool:
+        """Return True if the last periods and amplitudes agree."""
+        for values in zip(*self._measurements, strict=True):
+            if max(values) - min(values) > STABLE_SPREAD * (sum(values) / len(values)):
+                return False
+        return True
+
+    def _finish(self, now: float) -> None:
+        """Compute the ultimate gain and period."""
+        periods, amplitudes = zip(*self._measurements, strict=True)
+        amplitude = sum(amplitudes) / len(amplitudes)
+        if amplitude <= self._hysteresis:
+            self.abort("oscillation is not larger than the hysteresis")
+            return
+        relay_amplitude = (self._high - self._low) / 2
+        self.ultimate_period = sum(periods) / len(periods)
+        self.ultimate_gain = (
+            4
+            * relay_amplitude
+            / (math.pi * math.sqrt(amplitude**2 - self._hysteresis**2))
+        )
+        self.mean_output = self._output_integral / (now - self._first_period_start)
+        self.state = AutotuneState.DONE
+
+    def gains(self, rule: TuningRule) -> tuple[float, float, float]:
+        """Return kp, ki and kd of a finished experiment."""
+        return tuning_gains(rule, self.ultimate_gain, self.ultimate_period)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the experiment."""
+        data: dict[str, Any] = {"state": self.state}
+        if self.reason is not None:
+            data["reason"] = self.reason
+        if self.state is AutotuneState.DONE:
+            data["ultimate_gain"] = round(self.ultimate_gain, 4)
+            data["ultimate_period"] = round(self.ultimate_period, 1)
+        return data
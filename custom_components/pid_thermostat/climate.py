@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
+import time
+from functools import partial
 from typing import TYPE_CHECKING, Any
 
 import homeassistant.helpers.config_validation as cv
@@ -11,6 +14,7 @@ import homeassistant.util.dt as dt_util
 import voluptuous as vol
 from dvg_pid_controller import Constants as PIDConst
 from homeassistant.components.climate import (
+    ATTR_HVAC_MODE,
     ATTR_PRESET_MODE,
     PLATFORM_SCHEMA,
     PRESET_AWAY,
@@ -20,16 +24,22 @@ from homeassistant.components.climate import (
     HVACAction,
     HVACMode,
 )
-from homeassistant.components.number import ATTR_VALUE, SERVICE_SET_VALUE
 from homeassistant.const import (
-    ATTR_ENTITY_ID,
     ATTR_TEMPERATURE,
+    CONF_ENTITY_ID,
+    CONF_MAXIMUM,
+    CONF_MINIMUM,
     CONF_NAME,
+    CONF_OFFSET,
+    CONF_TIMEOUT,
     CONF_UNIQUE_ID,
     EVENT_HOMEASSISTANT_START,
     PRECISION_TENTHS,
+    STATE_OFF,
+    STATE_ON,
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
+    Platform,
 )
 from homeassistant.core import (
     CoreState,
@@ -39,76 +49,265 @@ from homeassistant.core import (
     State,
     callback,
 )
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.event import async_track_state_change_event
-from homeassistant.helpers.reload import async_setup_reload_service
 from homeassistant.helpers.restore_state import RestoreEntity
 
+from .autotune import AutotuneState, RelayAutotune, TuningRule
 from .const import (
     AC_MODE_COOL,
+    AC_MODE_HEAT_COOL,
+    ATTR_AUTOTUNE,
+    ATTR_CONTROL_LAW,
+    ATTR_FEEDFORWARD,
+    ATTR_HEALTH,
+    ATTR_PREDICTED_TEMPERATURE,
+    ATTR_RULE,
+    ATTR_SHADOWS,
     CONF_AC_MODE,
     CONF_AWAY_TEMP,
+    CONF_COMPUTE_WORKER,
+    CONF_COOLER,
     CONF_CYCLE_TIME,
+    CONF_DEAD_TIME,
+    CONF_DEADBAND,
+    CONF_DIRECT_OUTPUT,
+    CONF_FAULT_WINDOW,
+    CONF_FEEDFORWARD,
+    CONF_GAIN,
     CONF_HEATER,
+    CONF_HORIZON,
     CONF_INITIAL_HVAC_MODE,
+    CONF_INTERPOLATE,
+    CONF_JOURNAL,
+    CONF_MAX_AGE,
+    CONF_MAX_ERROR,
     CONF_MAX_TEMP,
+    CONF_MIN_OFF_TIME,
+    CONF_MIN_ON_TIME,
     CONF_MIN_TEMP,
+    CONF_MODEL_GAIN,
+    CONF_MOVE_SUPPRESSION,
+    CONF_MPC,
+    CONF_OUTDOOR_SENSOR,
     CONF_PID_KD,
     CONF_PID_KI,
     CONF_PID_KP,
+    CONF_REFERENCE,
+    CONF_SCALE,
     CONF_SENSOR,
+    CONF_SENSOR_REFRESH,
+    CONF_SHADOWS,
+    CONF_SMITH_PREDICTOR,
+    CONF_TABLE_MEMORY,
     CONF_TARGET_TEMP,
+    CONF_TIME_CONSTANT,
     DEFAULT_AC_MODE,
+    DEFAULT_AUTOTUNE_CYCLES,
+    DEFAULT_COMPUTE_WORKER,
     DEFAULT_CYCLE_TIME,
+    DEFAULT_DEADBAND,
+    DEFAULT_DIRECT_OUTPUT,
+    DEFAULT_FAULT_WINDOW,
+    DEFAULT_INTERPOLATE,
+    DEFAULT_JOURNAL,
+    DEFAULT_MOVE_SUPPRESSION,
     DEFAULT_NAME,
     DEFAULT_PID_KD,
     DEFAULT_PID_KI,
     DEFAULT_PID_KP,
+    DEFAULT_REFRESH_MAX_AGE,
+    DEFAULT_REFRESH_TIMEOUT,
+    DEFAULT_TABLE_MEMORY,
     DEFAULT_TARGET_TEMPERATURE,
     DOMAIN,
-    PLATFORMS,
     SUPPORT_FLAGS,
 )
+from .disturbance import LagFilter, async_get_disturbances
+from .faults import FaultDetector
+from .health import Health, async_get_health
+from .journal import (
+    FLAG_AUTOTUNE,
+    FLAG_MPC,
+    FLAG_WRITE_FAILED,
+    Journal,
+    async_get_journal,
+)
+from .kpi import KpiTracker, async_get_kpi_tracker, async_load_kpi_sensors
+from .measurement import Measurement
+from .metrics import STATUS_ACTIVE, STATUS_IDLE, STATUS_OFF, async_get_metrics
+from .mpc import ControlLaw, design_control_law
+from .output import (
+    MultiOutputWriter,
+    OutputMapping,
+    OutputWriter,
+    SplitRangeWriter,
+    WriteResult,
+)
+from .output_map import OutputMap
 from .pid_shared import PidBaseClass
+from .profiler import profiled
+from .pwm import PwmOutput, is_pwm_output
+from .refresh import async_get_refresher
+from .reload import DATA_YAML_THERMOSTATS
+from .rooms import thermostat_options
+from .schedule import DATA_SCHEDULER
+from .shadow import ShadowController
+from .smith import SmithPredictor
+from .storage import DATA_STORE, SECTION_OUTPUT_MAP
+from .worker import ComputeWorker, async_get_worker
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from datetime import datetime
+
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
+SMITH_PREDICTOR_SCHEMA = vol.Schema(
     {
-        vol.Required(CONF_HEATER): cv.entity_id,
-        vol.Required(CONF_SENSOR): cv.entity_id,
-        vol.Optional(CONF_CYCLE_TIME, default=DEFAULT_CYCLE_TIME): cv.time_period_dict,
-        vol.Optional(CONF_PID_KP, default=DEFAULT_PID_KP): vol.Coerce(float),
-        vol.Optional(CONF_PID_KI, default=DEFAULT_PID_KI): vol.Coerce(float),
-        vol.Optional(CONF_PID_KD, default=DEFAULT_PID_KD): vol.Coerce(float),
-        vol.Optional(CONF_AC_MODE, default=DEFAULT_AC_MODE): cv.string,
-        vol.Optional(CONF_MAX_TEMP): vol.Coerce(float),
-        vol.Optional(CONF_MIN_TEMP): vol.Coerce(float),
-        vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
-        vol.Optional(CONF_TARGET_TEMP, default=DEFAULT_TARGET_TEMPERATURE): vol.Coerce(
-            float
+        vol.Required(CONF_MODEL_GAIN): vol.Coerce(float),
+        vol.Required(CONF_TIME_CONSTANT): vol.All(
+            cv.time_period, cv.positive_timedelta
         ),
-        vol.Optional(CONF_INITIAL_HVAC_MODE): vol.In(
-            [HVACMode.COOL, HVACMode.HEAT, HVACMode.OFF]
+        vol.Required(CONF_DEAD_TIME): vol.All(cv.time_period, cv.positive_timedelta),
+    }
+)
+
+MPC_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_HORIZON): vol.All(cv.time_period, cv.positive_timedelta),
+        vol.Optional(CONF_MOVE_SUPPRESSION, default=DEFAULT_MOVE_SUPPRESSION): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
         ),
-        vol.Optional(CONF_AWAY_TEMP): vol.Coerce(float),
-        vol.Optional(CONF_UNIQUE_ID): cv.string,
+        # Each point is solved in Python, 32768 points take seconds on a small host
+        vol.Optional(CONF_TABLE_MEMORY, default=DEFAULT_TABLE_MEMORY): vol.All(
+            vol.Coerce(int), vol.Range(min=64, max=256 * 1024)
+        ),
+    }
+)
+
+OUTPUT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_ENTITY_ID): cv.entity_id,
+        vol.Optional(CONF_SCALE, default=1.0): vol.Coerce(float),
+        vol.Optional(CONF_OFFSET, default=0.0): vol.Coerce(float),
+        vol.Optional(CONF_MINIMUM): vol.Coerce(float),
+        vol.Optional(CONF_MAXIMUM): vol.Coerce(float),
+    }
+)
+
+SENSOR_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_MAX_AGE, default=DEFAULT_REFRESH_MAX_AGE): vol.All(
+            cv.time_period, cv.positive_timedelta
+        ),
+        vol.Optional(CONF_MAX_ERROR): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_TIMEOUT, default=DEFAULT_REFRESH_TIMEOUT): vol.All(
+            cv.time_period, cv.positive_timedelta
+        ),
+    }
+)
+
+FEEDFORWARD_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_ENTITY_ID): cv.entity_id,
+        vol.Required(CONF_GAIN): vol.Coerce(float),
+        vol.Optional(CONF_REFERENCE, default=0.0): vol.Coerce(float),
+        vol.Optional(CONF_TIME_CONSTANT, default={"seconds": 0}): cv.time_period,
+    }
+)
+
+SHADOW_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Optional(CONF_PID_KP): vol.Coerce(float),
+        vol.Optional(CONF_PID_KI): vol.Coerce(float),
+        vol.Optional(CONF_PID_KD): vol.Coerce(float),
     }
 )
 
 
+def _validate_heat_cool(config: ConfigType) -> ConfigType:
+    """Require a cooler for the heat_cool mode."""
+    if config[CONF_AC_MODE] == AC_MODE_HEAT_COOL and CONF_COOLER not in config:
+        msg = f"{CONF_COOLER} is required with {CONF_AC_MODE} {AC_MODE_HEAT_COOL}"
+        raise vol.Invalid(msg)
+    return config
+
+
+PLATFORM_SCHEMA = vol.All(
+    PLATFORM_SCHEMA.extend(
+        {
+            vol.Required(CONF_HEATER): vol.Any(
+                cv.entity_id, vol.All(cv.ensure_list, [OUTPUT_SCHEMA])
+            ),
+            vol.Required(CONF_SENSOR): cv.entity_id,
+            vol.Optional(
+                CONF_CYCLE_TIME, default=DEFAULT_CYCLE_TIME
+            ): cv.time_period_dict,
+            vol.Optional(CONF_PID_KP, default=DEFAULT_PID_KP): vol.Coerce(float),
+            vol.Optional(CONF_PID_KI, default=DEFAULT_PID_KI): vol.Coerce(float),
+            vol.Optional(CONF_PID_KD, default=DEFAULT_PID_KD): vol.Coerce(float),
+            vol.Optional(CONF_AC_MODE, default=DEFAULT_AC_MODE): cv.string,
+            vol.Optional(CONF_COOLER): cv.entity_id,
+            vol.Optional(CONF_DEADBAND, default=DEFAULT_DEADBAND): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+            vol.Optional(CONF_MAX_TEMP): vol.Coerce(float),
+            vol.Optional(CONF_MIN_TEMP): vol.Coerce(float),
+            vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
+            vol.Optional(
+                CONF_TARGET_TEMP, default=DEFAULT_TARGET_TEMPERATURE
+            ): vol.Coerce(float),
+            vol.Optional(CONF_INITIAL_HVAC_MODE): vol.In(
+                [HVACMode.COOL, HVACMode.HEAT, HVACMode.HEAT_COOL, HVACMode.OFF]
+            ),
+            vol.Optional(CONF_AWAY_TEMP): vol.Coerce(float),
+            vol.Optional(CONF_UNIQUE_ID): cv.string,
+            vol.Optional(CONF_DIRECT_OUTPUT, default=DEFAULT_DIRECT_OUTPUT): cv.boolean,
+            vol.Optional(CONF_INTERPOLATE, default=DEFAULT_INTERPOLATE): cv.boolean,
+            vol.Optional(CONF_MIN_ON_TIME): cv.time_period,
+            vol.Optional(CONF_MIN_OFF_TIME): cv.time_period,
+            vol.Optional(CONF_SMITH_PREDICTOR): SMITH_PREDICTOR_SCHEMA,
+            vol.Optional(CONF_SHADOWS): vol.All(cv.ensure_list, [SHADOW_SCHEMA]),
+            vol.Optional(
+                CONF_COMPUTE_WORKER, default=DEFAULT_COMPUTE_WORKER
+            ): cv.boolean,
+            vol.Optional(CONF_MPC): MPC_SCHEMA,
+            vol.Optional(CONF_OUTDOOR_SENSOR): cv.entity_id,
+            vol.Optional(CONF_FAULT_WINDOW, default=DEFAULT_FAULT_WINDOW): vol.All(
+                cv.time_period, cv.positive_timedelta
+            ),
+            vol.Optional(CONF_FEEDFORWARD): vol.All(
+                cv.ensure_list, [FEEDFORWARD_SCHEMA]
+            ),
+            vol.Optional(CONF_JOURNAL, default=DEFAULT_JOURNAL): cv.boolean,
+            vol.Optional(CONF_SENSOR_REFRESH): SENSOR_REFRESH_SCHEMA,
+        }
+    ),
+    # The predictive controller runs on the model of the Smith predictor
+    cv.key_dependency(CONF_MPC, CONF_SMITH_PREDICTOR),
+    # The output of the predictive controller leaves no room for a feedforward
+    cv.has_at_most_one_key(CONF_MPC, CONF_FEEDFORWARD),
+    _validate_heat_cool,
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Initialize PID Controller config entry."""
-    async_add_entities(
-        [PidThermostat(hass, config_entry.options, config_entry.entry_id)]
+    """Initialize the PID thermostats of a config entry."""
+    config_entry.runtime_data.async_setup_platform(
+        Platform.CLIMATE,
+        async_add_entities,
+        lambda unique_id, config: [PidThermostat(hass, config, unique_id)],
     )
 
 
@@ -120,8 +319,10 @@ async def async_setup_platform(
     discovery_info: DiscoveryInfoType | None = None,  # noqa: ARG001
 ) -> None:
     """Set up the generic thermostat platform."""
-    await async_setup_reload_service(hass, DOMAIN, PLATFORMS)
-    async_add_entities([PidThermostat(hass, config, config.get(CONF_UNIQUE_ID))])
+    entity = PidThermostat(hass, config, config.get(CONF_UNIQUE_ID))
+    async_add_entities([entity])
+    # Tracked to only rebuild the changed thermostats on a reload
+    hass.data[DATA_YAML_THERMOSTATS].async_add(config, [entity], async_add_entities)
 
 
 class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
@@ -131,15 +332,33 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
     # thermostat already contains a lot of attributes...
     def __init__(
         self,
-        hass: HomeAssistant,  # noqa: ARG002
+        hass: HomeAssistant,
         config: ConfigType,
         unique_id: str,
     ) -> None:
         """Initialize the thermostat."""
         self._config = config
-        self.heater_entity_id = config[CONF_HEATER]
+        heater = config[CONF_HEATER]
+        # A zone of outputs is controlled on the range of its first output
+        self.heater_entity_id = (
+            heater if isinstance(heater, str) else heater[0][CONF_ENTITY_ID]
+        )
         self.sensor_entity_id = config[CONF_SENSOR]
+        self._cycle_seconds = cv.time_period(
+            config.get(CONF_CYCLE_TIME, DEFAULT_CYCLE_TIME)
+        ).total_seconds()
+        self._output = self._create_output(hass, config)
+        self._split = (
+            self._output if isinstance(self._output, SplitRangeWriter) else None
+        )
+        self._metrics = async_get_metrics(hass)
+        self._health = async_get_health(hass)
+        self._kpi = (
+            async_get_kpi_tracker(hass, unique_id) if unique_id else KpiTracker()
+        )
+        self._last_cycle_time: float | None = None
         self.ac_mode = config.get(CONF_AC_MODE, DEFAULT_AC_MODE) == AC_MODE_COOL
+        # Heating drives the signed output of a heat_cool thermostat up
         super().__init__(
             config.get(CONF_PID_KP, DEFAULT_PID_KP),
             config.get(CONF_PID_KI, DEFAULT_PID_KI),
@@ -148,9 +367,42 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
             config.get(CONF_CYCLE_TIME, DEFAULT_CYCLE_TIME),
         )
         self._pid.setpoint = config.get(CONF_TARGET_TEMP)
+        self._init_models(config)
+        # Candidate gains default to the live gains, so one can be varied
+        self._shadows = [
+            ShadowController(
+                shadow[CONF_NAME],
+                shadow.get(CONF_PID_KP, config.get(CONF_PID_KP, DEFAULT_PID_KP)),
+                shadow.get(CONF_PID_KI, config.get(CONF_PID_KI, DEFAULT_PID_KI)),
+                shadow.get(CONF_PID_KD, config.get(CONF_PID_KD, DEFAULT_PID_KD)),
+                self._pid.controller_direction,
+            )
+            for shadow in config.get(CONF_SHADOWS, [])
+        ]
+        self._last_compute: float | None = None
+        self._autotune: RelayAutotune | None = None
+        self._autotune_rule = TuningRule.TYREUS_LUYBEN
+        self._autotune_apply = False
+        self._autotune_resume_output: float | None = None
+        # Controller computed out of process, this entity holds a copy of its state
+        self._worker: ComputeWorker | None = (
+            async_get_worker(hass)
+            if config.get(CONF_COMPUTE_WORKER, DEFAULT_COMPUTE_WORKER)
+            else None
+        )
+        self._worker_state: dict[str, Any] | None = None
+        self._journal: Journal | None = (
+            async_get_journal(hass)
+            if config.get(CONF_JOURNAL, DEFAULT_JOURNAL)
+            else None
+        )
         self._hvac_list = [
             HVACMode.OFF,
-            HVACMode.COOL if self.ac_mode else HVACMode.HEAT,
+            HVACMode.HEAT_COOL
+            if self._split is not None
+            else HVACMode.COOL
+            if self.ac_mode
+            else HVACMode.HEAT,
         ]
         self._hvac_mode = config.get(CONF_INITIAL_HVAC_MODE)
         self._min_temp = config.get(CONF_MIN_TEMP)
@@ -168,9 +420,102 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
         else:
             self._attr_preset_modes = [PRESET_NONE]
         self._cur_temp = None
+        self._sensor_error: str | None = None
+        self._measurement = Measurement()
+        self._interpolate = config.get(CONF_INTERPOLATE, DEFAULT_INTERPOLATE)
         self._output_step = 0.01
         self._attr_last_cycle_start = dt_util.utcnow().replace(microsecond=0)
         self._attr_extra_state_attributes = super().pid_state_attributes
+        self._attr_extra_state_attributes[ATTR_HEALTH] = Health.OK
+
+    def _init_models(self, config: ConfigType) -> None:
+        """Initialize the models of the plant and its disturbances."""
+        self._smith: SmithPredictor | None = None
+        if (model := config.get(CONF_SMITH_PREDICTOR)) is not None:
+            self._smith = SmithPredictor(
+                model[CONF_MODEL_GAIN],
+                cv.time_period(model[CONF_TIME_CONSTANT]).total_seconds(),
+                cv.time_period(model[CONF_DEAD_TIME]).total_seconds(),
+                self._cycle_seconds,
+                self._pid.controller_direction,
+            )
+        self._control_law: ControlLaw | None = None
+        # Disturbance sensors with the lag of their filter, gain and reference
+        self._feedforward = [
+            (
+                disturbance[CONF_ENTITY_ID],
+                cv.time_period(disturbance[CONF_TIME_CONSTANT]).total_seconds(),
+                disturbance[CONF_GAIN],
+                disturbance[CONF_REFERENCE],
+            )
+            for disturbance in config.get(CONF_FEEDFORWARD, [])
+        ]
+        self._feedforward_filters: list[LagFilter] = []
+        self._output_map = OutputMap()
+        self._outdoor_filter: LagFilter | None = None
+        fault_window = cv.time_period(
+            config.get(CONF_FAULT_WINDOW, DEFAULT_FAULT_WINDOW)
+        ).total_seconds()
+        self._faults = FaultDetector(
+            max(2, round(fault_window / self._cycle_seconds)),
+            self._pid.controller_direction,
+        )
+
+    def _create_output(
+        self, hass: HomeAssistant, config: ConfigType
+    ) -> OutputWriter | MultiOutputWriter | PwmOutput | SplitRangeWriter:
+        """Create the writer of the output entity or entities."""
+        heater = self._create_heater_output(hass, config)
+        if config.get(CONF_AC_MODE) != AC_MODE_HEAT_COOL:
+            return heater
+        cooler = config[CONF_COOLER]
+        return SplitRangeWriter(
+            heater,
+            PwmOutput(
+                hass,
+                cooler,
+                self._cycle_seconds,
+                cv.time_period(config.get(CONF_MIN_ON_TIME, 0)).total_seconds(),
+                cv.time_period(config.get(CONF_MIN_OFF_TIME, 0)).total_seconds(),
+            )
+            if is_pwm_output(cooler)
+            else OutputWriter(
+                hass,
+                cooler,
+                direct=config.get(CONF_DIRECT_OUTPUT, DEFAULT_DIRECT_OUTPUT),
+            ),
+            config.get(CONF_DEADBAND, DEFAULT_DEADBAND),
+        )
+
+    def _create_heater_output(
+        self, hass: HomeAssistant, config: ConfigType
+    ) -> OutputWriter | MultiOutputWriter | PwmOutput:
+        """Create the writer of the heater entity or entities."""
+        heater = config[CONF_HEATER]
+        direct = config.get(CONF_DIRECT_OUTPUT, DEFAULT_DIRECT_OUTPUT)
+        if not isinstance(heater, str):
+            return MultiOutputWriter(
+                hass,
+                [
+                    OutputMapping(
+                        OutputWriter(hass, output[CONF_ENTITY_ID], direct=direct),
+                        output[CONF_SCALE],
+                        output[CONF_OFFSET],
+                        output.get(CONF_MINIMUM),
+                        output.get(CONF_MAXIMUM),
+                    )
+                    for output in heater
+                ],
+            )
+        if is_pwm_output(self.heater_entity_id):
+            return PwmOutput(
+                hass,
+                self.heater_entity_id,
+                self._cycle_seconds,
+                cv.time_period(config.get(CONF_MIN_ON_TIME, 0)).total_seconds(),
+                cv.time_period(config.get(CONF_MIN_OFF_TIME, 0)).total_seconds(),
+            )
+        return OutputWriter(hass, self.heater_entity_id, direct=direct)
 
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added."""
@@ -182,9 +527,25 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
                 self.hass, self.sensor_entity_id, self._async_sensor_changed
             )
         )
+        # Disturbance sensors are shared with the other thermostats
+        disturbances = async_get_disturbances(self.hass)
+        self._feedforward_filters = [
+            disturbances.async_acquire(entity_id, lag)
+            for entity_id, lag, _, _ in self._feedforward
+        ]
+        if (outdoor := self._config.get(CONF_OUTDOOR_SENSOR)) is not None:
+            self._outdoor_filter = disturbances.async_acquire(outdoor, 0.0)
 
         # Recover state
-        await self._async_recover_state()
+        last_seen = await self._async_recover_state()
+        self._recover_model()
+
+        # Follow the setpoint schedule, if there is one
+        self.hass.data[DATA_SCHEDULER].async_register(self, last_seen)
+
+        # Config entries set up their KPI sensors as a platform of the entry
+        if self.platform.config_entry is None and self._unique_id:
+            async_load_kpi_sensors(self.hass, self._unique_id, self.name)
 
         @callback
         async def _async_startup(*_) -> None:  # noqa: ANN002
@@ -196,16 +557,31 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
             ):
                 await self._async_set_curr_temp(sensor_state)
             heater_state = self.hass.states.get(self.heater_entity_id)
-            if heater_state and heater_state.state not in (
+            heater_available = heater_state is not None and heater_state.state not in (
                 STATE_UNAVAILABLE,
                 STATE_UNKNOWN,
-            ):
+            )
+            limits = None
+            if heater_available:
                 # Get knowledge about the limits of our outputs
-                attr_min = heater_state.attributes.get("min", 0.0)
-                attr_max = heater_state.attributes.get("max", 100.0)
+                limits = self._output_range(self.heater_entity_id)
                 self._output_step = heater_state.attributes.get("step", 0.01)
+            if self._split is not None:
+                # The cooler takes the negative side of the output, also while
+                # the heater is not available
+                limits = self._split.set_ranges(
+                    self._output_range(self.heater_entity_id),
+                    self._output_range(self._split.cooler.entity_id),
+                )
+            if limits is not None:
                 # Set min/max for output
-                self._pid.set_output_limits(attr_min, attr_max)
+                self._pid.set_output_limits(*limits)
+                if CONF_MPC in self._config:
+                    self.hass.async_create_background_task(
+                        self._async_design_control_law(),
+                        f"{DOMAIN} control law of {self.entity_id}",
+                    )
+            if heater_available:
                 # Set to initial state
                 self.hass.create_task(self._check_switch_initial_state())
 
@@ -220,8 +596,31 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
         else:
             self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, _async_startup)
 
-    async def _async_recover_state(self) -> None:
-        """Recover state."""
+    async def async_will_remove_from_hass(self) -> None:
+        """Run when entity will be removed from hass."""
+        await super().async_will_remove_from_hass()
+        self.hass.data[DATA_SCHEDULER].async_unregister(self.entity_id)
+        self._metrics.remove(self.entity_id)
+        self._health.remove(self.entity_id)
+        if self._worker is not None:
+            self._worker.async_remove(self.entity_id)
+        outputs = (
+            (self._split.heater, self._split.cooler)
+            if self._split is not None
+            else (self._output,)
+        )
+        for output in outputs:
+            if isinstance(output, PwmOutput):
+                output.async_remove()
+        for entity_id, lag, _, _ in self._feedforward:
+            async_get_disturbances(self.hass).async_release(entity_id, lag)
+        if (outdoor := self._config.get(CONF_OUTDOOR_SENSOR)) is not None:
+            async_get_disturbances(self.hass).async_release(outdoor, 0.0)
+        for fault in self._faults.faults:
+            ir.async_delete_issue(self.hass, DOMAIN, f"{fault}_{self.entity_id}")
+
+    async def _async_recover_state(self) -> datetime | None:
+        """Recover state, return the time the old state was written."""
         # Check If we have an old state
         if (old_state := await self.async_get_last_state()) is not None:
             # If we have a previously saved temperature
@@ -250,9 +649,45 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
             _LOGGER.warning(
                 "No previously saved temperature, setting to %s", self._pid.setpoint
             )
-        # Set default state to off
-        if not self._hvac_mode:
-            self._hvac_mode = HVACMode.OFF
+        self._hvac_mode = self._supported_hvac_mode(self._hvac_mode)
+        return old_state.last_updated if old_state is not None else None
+
+    def _supported_hvac_mode(self, hvac_mode: str | None) -> str:
+        """Return a configured or restored hvac mode the thermostat supports."""
+        if hvac_mode in self._hvac_list:
+            return hvac_mode
+        if hvac_mode not in (HVACMode.HEAT, HVACMode.COOL, HVACMode.HEAT_COOL):
+            # Set default state to off, also for a restored unavailable state
+            return HVACMode.OFF
+        # Configured or restored for another ac_mode, run in the own mode
+        _LOGGER.warning(
+            "Hvac mode %s is not supported by %s, using %s",
+            hvac_mode,
+            self.entity_id,
+            self._hvac_list[-1],
+        )
+        return self._hvac_list[-1]
+
+    def _output_range(self, entity_id: str) -> tuple[float, float]:
+        """Return the range of an output entity, 0 to 100 if it has none."""
+        state = self.hass.states.get(entity_id)
+        attributes = state.attributes if state is not None else {}
+        return attributes.get("min", 0.0), attributes.get("max", 100.0)
+
+    def _recover_model(self) -> None:
+        """Recover the effect of the output that is still in the dead time."""
+        if self._smith is not None and (
+            data := self.hass.data[DATA_STORE].get(self.entity_id, CONF_SMITH_PREDICTOR)
+        ):
+            try:
+                self._smith.restore(data)
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Could not restore the model state of %s", self.name)
+        if data := self.hass.data[DATA_STORE].get(self.entity_id, SECTION_OUTPUT_MAP):
+            try:
+                self._output_map.restore(data)
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Could not restore the output map of %s", self.name)
 
     @property
     def should_poll(self) -> bool:
@@ -305,6 +740,8 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
         """
         if self._hvac_mode == HVACMode.OFF:
             return HVACAction.OFF
+        if self._split is not None:
+            return self._split_action()
         if not self._is_device_active:
             return HVACAction.IDLE
         if self.ac_mode:
@@ -323,38 +760,57 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
 
     async def async_set_hvac_mode(self, hvac_mode: str) -> None:
         """Set hvac mode."""
-        if hvac_mode not in (HVACMode.HEAT, HVACMode.COOL, HVACMode.OFF):
-            _LOGGER.error("Unrecognized hvac mode: %s", hvac_mode)
+        await self._async_apply_hvac_mode(hvac_mode)
+        self.schedule_update_ha_state()
+
+    async def _async_apply_hvac_mode(self, hvac_mode: str) -> None:
+        """Apply a hvac mode without writing the state."""
+        if hvac_mode not in self._hvac_list:
+            _LOGGER.error("Unsupported hvac mode of %s: %s", self.entity_id, hvac_mode)
             return
 
         input_sensor = self._cur_temp
         output_sensor = None
         try:
-            output_sensor = float(self.hass.states.get(self.heater_entity_id).state)
+            output_sensor = self._output_value()
         except (ValueError, TypeError, AttributeError) as ex:
-            _LOGGER.warning("Could not read state of output for %s: %s", self.name, ex)
+            self._set_health(Health.OUTPUT_MISSING, f"could not read output: {ex}")
 
         mode = PIDConst.MANUAL
         if hvac_mode != HVACMode.OFF:
             mode = PIDConst.AUTOMATIC
 
         if None not in (input_sensor, output_sensor):
-            self._pid.set_mode(mode, input_sensor, output_sensor)
+            if mode == PIDConst.AUTOMATIC and not self._pid.in_auto:
+                # Cycles are skipped while off; do not integrate over that time
+                self._pid.last_time = time.perf_counter()
+                self._last_compute = None
+                self._kpi.reset_time()
+            # The controller starts from the output without the feedforward
+            self._pid.set_mode(
+                mode, input_sensor, output_sensor - self._feedforward_at(time.time())
+            )
+            if mode == PIDConst.AUTOMATIC:
+                self._restart_worker()
 
         # Switch off output if device was switched off
         if hvac_mode == HVACMode.OFF:
+            self._faults.reset()
+            if self._autotune is not None:
+                self._autotune.abort("thermostat turned off")
+                self._end_autotune()
             await self._async_heater_turn_off()
 
         # All is done, set value
         self._hvac_mode = hvac_mode
+        self._record_status()
         self._attr_extra_state_attributes.update(self.pid_state_attributes)
-        self.schedule_update_ha_state()
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
         if (temperature := kwargs.get(ATTR_TEMPERATURE)) is None:
             return
-        self._pid.setpoint = temperature
+        self._change_setpoint(temperature)
         self.schedule_update_ha_state()
 
     @property
@@ -376,10 +832,16 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
         return super().max_temp
 
     @callback
+    @profiled
     async def _async_sensor_changed(self, event: Event[EventStateChangedData]) -> None:
         """Handle temperature changes."""
         new_state = event.data.get("new_state")
-        if new_state is None or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        if new_state is None:
+            self._sensor_error = "sensor was removed"
+            return
+        if new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            # The last temperature is held, flagged by the health
+            self._sensor_error = f"sensor is {new_state.state}"
             return
         await self._async_set_curr_temp(new_state)
 
@@ -395,8 +857,11 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
 
         try:
             self._cur_temp = _check_value(new_state.state)
-        except ValueError:
-            _LOGGER.exception("Unable to update from sensor.")
+            self._measurement.add(new_state.last_updated.timestamp(), self._cur_temp)
+            self._sensor_error = None
+        except ValueError as ex:
+            # Logged by the health tracking on the next cycle
+            self._sensor_error = str(ex)
         self.schedule_update_ha_state()
 
     async def _check_switch_initial_state(self) -> None:
@@ -408,41 +873,673 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
             )
             await self._async_heater_turn_off()
 
+    @profiled
     async def _async_pid_cycle(self, *_: Any) -> None:
         """PID controller cycle."""
-        if not self._cur_temp:
-            _LOGGER.warning("Could not read actual temperature for %s", self.name)
+        now = time.monotonic()
+        if self._last_cycle_time is not None:
+            self._metrics.record_lateness(
+                self.entity_id,
+                max(0.0, now - self._last_cycle_time - self._cycle_seconds),
+            )
+        self._last_cycle_time = now
+        if CONF_SENSOR_REFRESH in self._config and self._hvac_mode != HVACMode.OFF:
+            await self._async_refresh_sensor(self._config[CONF_SENSOR_REFRESH])
+        await self._async_compute_output(write_state=True)
+
+    async def _async_compute_output(self, *, write_state: bool) -> None:
+        """Compute and write the output and advance the model with it."""
+        # Every written output goes through here, so the model sees all of them
+        output = await self._async_pid_compute()
+        if self._smith is not None:
+            self._advance_model(output)
+        if output is not None and write_state:
+            self.schedule_update_ha_state()
+
+    async def _async_refresh_sensor(self, refresh: ConfigType) -> None:
+        """Refresh a polled sensor whose value is old or far from the setpoint."""
+        if (state := self.hass.states.get(self.sensor_entity_id)) is None:
             return
-        if not self._pid.setpoint:
-            _LOGGER.warning("Could not read actual setpoint for %s", self.name)
+        age = time.time() - state.last_reported.timestamp()
+        max_error = refresh.get(CONF_MAX_ERROR)
+        if age <= cv.time_period(refresh[CONF_MAX_AGE]).total_seconds() and not (
+            max_error is not None
+            and self._cur_temp is not None
+            and self._pid.setpoint is not None
+            and abs(self._pid.setpoint - self._cur_temp) > max_error
+            # Not more often than once a cycle
+            and age >= self._cycle_seconds
+        ):
+            return
+        try:
+            # Within half a cycle, so the cycles keep their pace
+            async with asyncio.timeout(
+                min(
+                    cv.time_period(refresh[CONF_TIMEOUT]).total_seconds(),
+                    self._cycle_seconds / 2,
+                )
+            ):
+                refreshed = await async_get_refresher(self.hass).async_refresh(
+                    self.sensor_entity_id
+                )
+        except TimeoutError:
+            refreshed = False
+        if not refreshed:
+            _LOGGER.debug("%s: computing on the cached temperature", self.entity_id)
             return
+        # The state change may reach the listener after this cycle, take it now
+        state = self.hass.states.get(self.sensor_entity_id)
+        if state is not None and state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            await self._async_set_curr_temp(state)
 
+    def _advance_model(self, output: float | None) -> None:
+        """Advance the dead time model one step with the written output."""
         if self._hvac_mode == HVACMode.OFF:
-            return
+            # Written when the thermostat was turned off
+            output = self._idle_output
+        # No output is written before the first temperature or setpoint
+        if output is not None and math.isfinite(output):
+            self._smith.update(output)
+            self.hass.data[DATA_STORE].async_set(
+                self.entity_id, CONF_SMITH_PREDICTOR, self._smith.as_dict()
+            )
 
-        if not self._pid.compute(self._cur_temp) and self._pid.in_auto:
-            _LOGGER.warning("PID regulator fails for thermostat %s!", self.name)
-        await self._async_heater_set_value(self._pid.output)
+    async def _async_pid_compute(self) -> float | None:
+        """Compute and write a new output, return the output if it was written."""
+        if not self._cur_temp:
+            self._set_health(
+                Health.SENSOR_MISSING, self._sensor_error or "no temperature received"
+            )
+            return None
+        if not self._pid.setpoint:
+            self._set_health(Health.DEGRADED, "no setpoint")
+            return None
+
+        if self._hvac_mode == HVACMode.OFF:
+            return None
+
+        now = time.time()
+        process_value = self._cur_temp
+        if (
+            self._interpolate
+            and (estimate := self._measurement.value_at(now)) is not None
+        ):
+            process_value = estimate
+        if self._autotune is not None:
+            # The relay works on the measurement, not on a model prediction
+            flags = FLAG_AUTOTUNE
+            computed = self._autotune_step(process_value, now)
+        else:
+            flags = FLAG_MPC if self._control_law is not None else 0
+            if self._smith is not None:
+                process_value = self._smith.correct(process_value)
+            computed = await self._async_control(process_value, now)
+        self._metrics.record_compute()
+        output = self._pid.output
+        result = await self._async_heater_set_value(output)
+        if self._journal is not None:
+            if result is WriteResult.FAILED:
+                flags |= FLAG_WRITE_FAILED
+            self._journal_cycle(now, flags)
+        self._kpi.record(now, self._pid.setpoint, self._cur_temp, self._pid.output)
+        self._set_health(*self._check_health(computed=computed, result=result))
+        if self._smith is not None:
+            self._attr_extra_state_attributes[ATTR_PREDICTED_TEMPERATURE] = round(
+                process_value, 2
+            )
+        self._record_status()
         self._attr_last_cycle_start = dt_util.utcnow().replace(microsecond=0)
         self._attr_extra_state_attributes.update(self.pid_state_attributes)
-        self.schedule_update_ha_state()
+        return output
+
+    async def _async_control(self, process_value: float, now: float) -> bool:
+        """Compute the output of the controller, return True if it was computed."""
+        feedforward = self._feedforward_at(now)
+        if self._split is not None and self._control_law is None:
+            self._split_integral(process_value)
+        if self._control_law is not None:
+            computed = self._mpc_compute(process_value, now)
+        elif self._worker is not None:
+            computed = await self._async_worker_compute(process_value, now, feedforward)
+        else:
+            computed = self._pid_compute(process_value, now, feedforward)
+        if computed:
+            if self._shadows:
+                self._compute_shadows(process_value, now, feedforward)
+            self._learn_output_map(now)
+            self._detect_faults()
+        return computed
+
+    def _split_integral(self, process_value: float) -> None:
+        """
+        Cut the integral that holds the side of the split range the error opposes.
+
+        Once the temperature crossed the setpoint, an integral beyond the
+        neutral band on the other side is cut back to the band edge. The
+        cooler then stops right away instead of cooling on while its integral
+        unwinds, and the heater is still only reached through the band.
+        """
+        pid = self._pid
+        band = self._split.deadband
+        error = pid.setpoint - process_value
+        if error > 0 and pid.iTerm < -band:
+            pid.iTerm = -band
+        elif error < 0 and pid.iTerm > band:
+            pid.iTerm = band
+        else:
+            return
+        self._restart_worker()
+
+    def _journal_cycle(self, now: float, flags: int) -> None:
+        """Append the cycle to the journal."""
+        pid = self._pid
+        self._journal.async_append(
+            self.entity_id,
+            now,
+            (
+                self._cur_temp,
+                pid.setpoint,
+                pid.output,
+                pid.pTerm,
+                pid.iTerm,
+                pid.dTerm,
+            ),
+            flags,
+        )
+
+    def _detect_faults(self) -> None:
+        """Raise or clear repair issues of the faults of the loop."""
+        pid = self._pid
+        if self._split is not None:
+            # Signed, each side of the split range as a fraction of its own span
+            if pid.output_limit_min >= 0 or pid.output_limit_max <= 0:
+                return
+            fraction = (
+                pid.output / pid.output_limit_max
+                if pid.output >= 0
+                else -pid.output / pid.output_limit_min
+            )
+        else:
+            span = pid.output_limit_max - pid.output_limit_min
+            if span <= 0:
+                return
+            fraction = (pid.output - pid.output_limit_min) / span
+        changes = self._faults.update(fraction, self._cur_temp)
+        for fault, raised in changes.items():
+            issue_id = f"{fault}_{self.entity_id}"
+            if not raised:
+                _LOGGER.info("%s: %s cleared", self.entity_id, fault)
+                ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+                continue
+            evidence = self._faults.faults[fault]
+            _LOGGER.warning("%s: %s detected: %s", self.entity_id, fault, evidence)
+            ir.async_create_issue(
+                self.hass,
+                DOMAIN,
+                issue_id,
+                is_fixable=False,
+                severity=ir.IssueSeverity.WARNING,
+                translation_key=fault,
+                translation_placeholders={
+                    "entity_id": self.entity_id,
+                    **{key: str(value) for key, value in evidence.items()},
+                },
+            )
+
+    def _pid_compute(
+        self, process_value: float, now: float, feedforward: float
+    ) -> bool:
+        """
+        Compute the controller with the feedforward added to its output.
+
+        The controller runs within the limits of the output minus the
+        feedforward, so its integral stops winding up when the combined output
+        reaches a limit, not when the controller output alone does.
+        """
+        pid = self._pid
+        low, high = pid.output_limit_min, pid.output_limit_max
+        if feedforward:
+            pid.output_limit_min = low - feedforward
+            pid.output_limit_max = high - feedforward
+        try:
+            if computed := pid.compute(process_value):
+                self._apply_measured_derivative(now)
+                pid.output += feedforward
+        finally:
+            pid.output_limit_min = low
+            pid.output_limit_max = high
+        return computed
+
+    def _outdoor_at(self, now: float) -> float | None:
+        """Return the outdoor temperature, 0 without an outdoor sensor."""
+        if self._outdoor_filter is None:
+            return 0.0 if CONF_OUTDOOR_SENSOR not in self._config else None
+        return self._outdoor_filter.value_at(now)
+
+    def _learn_output_map(self, now: float) -> None:
+        """Learn the output that holds the setpoint, while the loop is settled."""
+        pid = self._pid
+        if (outdoor := self._outdoor_at(now)) is None:
+            return
+        if self._output_map.learn(
+            now,
+            pid.setpoint,
+            outdoor,
+            pid.setpoint - self._cur_temp,
+            pid.output,
+            saturated=not pid.output_limit_min < pid.output < pid.output_limit_max,
+        ):
+            self.hass.data[DATA_STORE].async_set(
+                self.entity_id, SECTION_OUTPUT_MAP, self._output_map.as_dict()
+            )
+
+    def _change_setpoint(self, temperature: float | None) -> None:
+        """Change the setpoint, preloading the integral with the learned output."""
+        if temperature == self._pid.setpoint:
+            return
+        self._pid.setpoint = temperature
+        self._output_map.reset()
+        pid = self._pid
+        now = time.time()
+        # The MPC law and the relay experiment have no integral to preload
+        if (
+            temperature is None
+            or not pid.in_auto
+            or self._autotune is not None
+            or self._control_law is not None
+            or (outdoor := self._outdoor_at(now)) is None
+            or (output := self._output_map.lookup(temperature, outdoor)) is None
+        ):
+            return
+        # Start near the output that held this setpoint before, instead of
+        # winding the integral up from the output of the old setpoint
+        feedforward = self._feedforward_at(now)
+        pid.iTerm = min(
+            max(output - feedforward, pid.output_limit_min - feedforward),
+            pid.output_limit_max - feedforward,
+        )
+        self._restart_worker()
+        _LOGGER.debug(
+            "Preloaded the integral of %s to %.2f for %s",
+            self.entity_id,
+            pid.iTerm,
+            temperature,
+        )
+
+    def _feedforward_at(self, now: float) -> float:
+        """Return the feedforward of the disturbance sensors at a time."""
+        if not self._feedforward_filters:
+            # Not configured, or the filters are not acquired yet
+            return 0.0
+        feedforward = 0.0
+        for lag_filter, (_, _, gain, reference) in zip(
+            self._feedforward_filters, self._feedforward, strict=True
+        ):
+            # A sensor without any value yet does not contribute
+            if (value := lag_filter.value_at(now)) is not None:
+                feedforward += gain * (value - reference)
+        self._attr_extra_state_attributes[ATTR_FEEDFORWARD] = round(feedforward, 2)
+        return feedforward
+
+    def _apply_measured_derivative(self, now: float) -> None:
+        """
+        Replace the derivative term by one based on sensor timestamps.
+
+        The controller computes the derivative over the time between computes.
+        A sensor that updates slower than the cycle then gives a spike on one
+        cycle and nothing on the others. The slope between the last sensor
+        samples, at their real update times, does not depend on the cycle.
+        """
+        pid = self._pid
+        pid.dTerm = -pid.controller_direction * pid.kd * self._slope_at(now)
+        pid.output = min(
+            max(pid.pTerm + pid.iTerm + pid.dTerm, pid.output_limit_min),
+            pid.output_limit_max,
+        )
+
+    async def _async_design_control_law(self) -> None:
+        """Precompute the MPC law, the PID controller runs until it is done."""
+        model = self._config[CONF_SMITH_PREDICTOR]
+        mpc = self._config[CONF_MPC]
+        time_constant = cv.time_period(model[CONF_TIME_CONSTANT]).total_seconds()
+        started = time.monotonic()
+        self._control_law = await self.hass.async_add_executor_job(
+            partial(
+                design_control_law,
+                model[CONF_MODEL_GAIN],
+                time_constant,
+                self._cycle_seconds,
+                self._pid.output_limit_min,
+                self._pid.output_limit_max,
+                horizon=cv.time_period(
+                    mpc.get(CONF_HORIZON, model[CONF_TIME_CONSTANT])
+                ).total_seconds(),
+                move_suppression=mpc[CONF_MOVE_SUPPRESSION],
+                memory=mpc[CONF_TABLE_MEMORY],
+            )
+        )
+        _LOGGER.debug(
+            "Designed the control law of %s in %.1f s: %s",
+            self.entity_id,
+            time.monotonic() - started,
+            self._control_law.as_dict(),
+        )
+        self._attr_extra_state_attributes[ATTR_CONTROL_LAW] = (
+            self._control_law.as_dict()
+        )
+
+    def _mpc_compute(self, process_value: float, now: float) -> bool:
+        """Look the output up in the MPC law, return True as it is computed."""
+        pid = self._pid
+        direction = pid.controller_direction
+        # Before the first compute only the integral holds the heater output
+        previous = pid.iTerm if math.isnan(pid.output) else pid.output
+        output = self._control_law.output(
+            direction * (pid.setpoint - process_value),
+            direction * self._slope_at(now) * self._cycle_seconds,
+            previous,
+        )
+        # The integral holds the output, for a bumpless return to the PID
+        pid.pTerm = 0.0
+        pid.iTerm = output
+        pid.dTerm = 0.0
+        pid.output = output
+        pid.last_input = process_value
+        return True
+
+    def _restart_worker(self) -> None:
+        """Restart the worker controller from the output of the controller."""
+        if self._worker is not None:
+            self._worker_state = {"i_term": float(self._pid.iTerm), "last_time": None}
+            self._worker.async_forget(self.entity_id)
+
+    @callback
+    def async_start_autotune(
+        self,
+        rule: TuningRule,
+        *,
+        hysteresis: float,
+        max_deviation: float,
+        timeout: float,
+        apply: bool,
+    ) -> None:
+        """Start a relay experiment in place of the controller."""
+        if (
+            self._hvac_mode in (None, HVACMode.OFF)
+            or self._pid.setpoint is None
+            or self._cur_temp is None
+            or self._pid.output_limit_min is None
+        ):
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="autotune_unavailable",
+                translation_placeholders={"entity_id": self.entity_id},
+            )
+        self._autotune = RelayAutotune(
+            self._pid.setpoint,
+            self._pid.output_limit_min,
+            self._pid.output_limit_max,
+            direction=self._pid.controller_direction,
+            hysteresis=hysteresis,
+            max_deviation=max_deviation,
+            timeout=timeout,
+            cycles=DEFAULT_AUTOTUNE_CYCLES,
+            start=time.time(),
+        )
+        self._autotune_rule = rule
+        self._autotune_apply = apply
+        # Before the first compute there is no output to resume from
+        output = float(self._pid.output)
+        self._autotune_resume_output = (
+            output if math.isfinite(output) else self._idle_output
+        )
+        _LOGGER.info("Autotune of %s started with rule %s", self.entity_id, rule)
+        self._attr_extra_state_attributes[ATTR_AUTOTUNE] = self._autotune.as_dict()
+        self.async_write_ha_state()
+
+    def _autotune_step(self, process_value: float, now: float) -> bool:
+        """Run the relay experiment for a cycle, return True if it set the output."""
+        tuner = self._autotune
+        self._pid.output = tuner.update(now, process_value)
+        if tuner.state is AutotuneState.RUNNING:
+            self._attr_extra_state_attributes[ATTR_AUTOTUNE] = tuner.as_dict()
+            return True
+        self._end_autotune()
+        # Resume the controller bumpless, integrating from now on
+        self._pid.initialize(process_value, self._pid.output)
+        self._pid.last_time = time.perf_counter()
+        self._last_compute = None
+        self._restart_worker()
+        return True
+
+    def _end_autotune(self) -> None:
+        """Finish the relay experiment, applying the gains if it succeeded."""
+        tuner, self._autotune = self._autotune, None
+        result = tuner.as_dict()
+        if tuner.state is not AutotuneState.DONE:
+            _LOGGER.warning("Autotune of %s aborted: %s", self.entity_id, tuner.reason)
+            self._pid.output = self._autotune_resume_output
+            self._attr_extra_state_attributes[ATTR_AUTOTUNE] = result
+            return
+        kp, ki, kd = tuner.gains(self._autotune_rule)
+        gains = {
+            CONF_PID_KP: round(kp, 4),
+            CONF_PID_KI: round(ki, 6),
+            CONF_PID_KD: round(kd, 2),
+        }
+        _LOGGER.info("Autotune of %s done: %s", self.entity_id, gains)
+        # The mean relay output is close to the output that holds the setpoint
+        self._pid.output = tuner.mean_output
+        self._attr_extra_state_attributes[ATTR_AUTOTUNE] = {
+            **result,
+            ATTR_RULE: self._autotune_rule,
+            **gains,
+        }
+        if self._autotune_apply:
+            self._apply_gains(gains)
+
+    def _apply_gains(self, gains: dict[str, float]) -> None:
+        """Apply tuned gains, through the options of a config entry thermostat."""
+        entry = self.platform.config_entry
+        if entry is None:
+            # A YAML thermostat runs with the gains until it is reloaded
+            self._pid.set_tunings(
+                gains[CONF_PID_KP],
+                gains[CONF_PID_KI],
+                gains[CONF_PID_KD],
+                self._pid.controller_direction,
+            )
+            return
+        self.hass.config_entries.async_update_entry(
+            entry, options=thermostat_options(entry, self._unique_id, gains)
+        )
+
+    async def _async_worker_compute(
+        self, process_value: float, now: float, feedforward: float
+    ) -> bool:
+        """Compute the controller in the worker, return True if it was computed."""
+        pid = self._pid
+        if not pid.in_auto:
+            return False
+        try:
+            reply = await self._worker.async_compute(
+                self.entity_id,
+                {
+                    "direction": pid.controller_direction,
+                    # Limits of the controller output, see _pid_compute
+                    "min": pid.output_limit_min - feedforward,
+                    "max": pid.output_limit_max - feedforward,
+                    "setpoint": pid.setpoint,
+                    "input": process_value,
+                    "time": now,
+                    "kp": pid.kp,
+                    "ki": pid.ki,
+                    "kd": pid.kd,
+                    "slope": self._slope_at(now),
+                },
+                self._worker_state,
+            )
+        except HomeAssistantError:
+            return False
+        self._worker_state = reply["state"]
+        pid.pTerm = reply["p"]
+        pid.iTerm = reply["i"]
+        pid.dTerm = reply["d"]
+        pid.output = reply["output"] + feedforward
+        pid.last_input = process_value
+        return True
+
+    def _slope_at(self, now: float) -> float:
+        """Return the rate of change of the process value per second."""
+        slope = self._measurement.slope_at(now)
+        if self._smith is not None:
+            slope += self._smith.slope
+        return slope
+
+    def _compute_shadows(
+        self, process_value: float, now: float, feedforward: float
+    ) -> None:
+        """Compute the shadow controllers on the data of the live controller."""
+        time_step = 0.0 if self._last_compute is None else now - self._last_compute
+        self._last_compute = now
+        slope = self._slope_at(now)
+        # Compared on the controller output, without the feedforward
+        limits = (
+            self._pid.output_limit_min - feedforward,
+            self._pid.output_limit_max - feedforward,
+        )
+        for shadow in self._shadows:
+            shadow.compute(
+                self._pid.setpoint,
+                process_value,
+                slope,
+                time_step,
+                self._pid.output - feedforward,
+                limits,
+            )
+        self._attr_extra_state_attributes[ATTR_SHADOWS] = {
+            shadow.name: shadow.as_dict() for shadow in self._shadows
+        }
+
+    def _check_health(
+        self, *, computed: bool, result: WriteResult
+    ) -> tuple[Health, str | None]:
+        """Return the health and its reason after a compute and output write."""
+        if self._sensor_error is not None:
+            return Health.SENSOR_MISSING, self._sensor_error
+        outputs = (
+            (
+                (self.heater_entity_id, self._split.heater),
+                (self._split.cooler.entity_id, self._split.cooler),
+            )
+            if self._split is not None
+            else ((self.heater_entity_id, self._output),)
+        )
+        for entity_id, output in outputs:
+            output_state = self.hass.states.get(entity_id)
+            if output_state is None or output_state.state in (
+                STATE_UNAVAILABLE,
+                STATE_UNKNOWN,
+            ):
+                return (
+                    Health.OUTPUT_MISSING,
+                    output.last_error or f"output {entity_id} unavailable",
+                )
+        if result is WriteResult.FAILED:
+            return Health.DEGRADED, self._output.last_error
+        if not computed:
+            if self._pid.in_auto:
+                return Health.DEGRADED, "PID computation failed"
+            return Health.DEGRADED, "controller not in automatic mode"
+        return Health.OK, None
+
+    def _set_health(self, health: Health, reason: str | None = None) -> None:
+        """Track the health, logging and writing the state on transitions only."""
+        if self._health.update(self.entity_id, health, reason):
+            self._attr_extra_state_attributes[ATTR_HEALTH] = health
+            self.async_write_ha_state()
+
+    def _record_status(self) -> None:
+        """Update the active, idle or off status in the aggregate metrics."""
+        output = self._pid.output
+        if self._hvac_mode == HVACMode.OFF:
+            status = STATUS_OFF
+        elif None not in (output, self._pid.output_limit_min) and self._output_active(
+            output
+        ):
+            status = STATUS_ACTIVE
+        else:
+            status = STATUS_IDLE
+        self._metrics.record_status(self.entity_id, status)
 
     @property
     def _is_device_active(self) -> bool:
         """If the toggleable device is currently active."""
         output_state = self.hass.states.get(self.heater_entity_id)
         if not output_state:
-            _LOGGER.warning("PID thermostat cannot detect output state")
+            # Reported by the health tracking, not on every state write
             return None
         if (
             self._pid.output_limit_min is None
         ):  # During startup pid controller returns None
-            _LOGGER.warning(
-                "PID thermostat pid controller not yet started: no output limit"
-            )
             return None
+        if self._split is not None:
+            return self._split_action() != HVACAction.IDLE
+        if isinstance(self._output, PwmOutput):
+            return output_state.state == STATE_ON
         # check if output state is minimal
-        output = float(output_state.state)
+        return self._output_value() > self._pid.output_limit_min
+
+    def _output_value(self) -> float:
+        """Return the current value of the output."""
+        if self._split is not None:
+            return self._split.output(
+                self._writer_value(self._split.heater, self.heater_entity_id),
+                self._writer_value(self._split.cooler, self._split.cooler.entity_id),
+            )
+        return self._writer_value(self._output, self.heater_entity_id)
+
+    def _writer_value(
+        self, writer: OutputWriter | MultiOutputWriter | PwmOutput, entity_id: str
+    ) -> float:
+        """Return the current value of an output entity."""
+        state = self.hass.states.get(entity_id)
+        if isinstance(writer, MultiOutputWriter):
+            # The first output of a zone holds the mapped controller output
+            return writer.output(state)
+        if not isinstance(writer, PwmOutput):
+            return float(state.state)
+        if state.state not in (STATE_ON, STATE_OFF):
+            msg = f"Switch has illegal state: {state.state}"
+            raise ValueError(msg)
+        if writer.duty is not None:
+            # A switch has no value, take the duty cycle it was driven with
+            return writer.duty
+        if state.state == STATE_OFF:
+            return 0.0
+        return 100.0 if self._split is not None else self._pid.output_limit_max
+
+    def _split_action(self) -> HVACAction:
+        """Return the side of the split range that runs."""
+        try:
+            output = self._output_value()
+        except (ValueError, TypeError, AttributeError):
+            return HVACAction.IDLE
+        if output > 0:
+            return HVACAction.HEATING
+        if output < 0:
+            return HVACAction.COOLING
+        return HVACAction.IDLE
+
+    @property
+    def _idle_output(self) -> float:
+        """Return the output that turns the heater, and a cooler, off."""
+        return 0.0 if self._split is not None else self._pid.output_limit_min
+
+    def _output_active(self, output: float) -> bool:
+        """Return True if a controller output drives the heater or the cooler."""
+        if self._split is not None:
+            return abs(output) > self._split.deadband
         return output > self._pid.output_limit_min
 
     @property
@@ -450,30 +1547,24 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
         """Return the list of supported features."""
         return self._support_flags
 
-    async def _async_heater_set_value(self, value: float) -> None:
+    @profiled
+    async def _async_heater_set_value(self, value: float) -> WriteResult:
         """Turn heater toggleable device on."""
         output_value = (
             round(value / self._output_step) * self._output_step
         )  # Round off to step
-        # Make output as type-agnostic as possible by picking the
-        # domain and calling set_value service
-        state = self.hass.states.get(self.heater_entity_id)
-        if state:
-            output_domain = state.domain
-            await self.hass.services.async_call(
-                output_domain,
-                SERVICE_SET_VALUE,
-                {ATTR_ENTITY_ID: self.heater_entity_id, ATTR_VALUE: output_value},
-                blocking=False,
-            )
-        # Next line does not work; it only switches the state in HA but does
-        # not activate set_value within the numbers....
-        # self.hass.states.async_set(
-        #           self.heater_entity_id,output_value, attr)
+        result = await self._output.async_set_value(output_value)
+        if result is WriteResult.WRITTEN:
+            self._metrics.set_value_calls += 1
+        elif result is WriteResult.SUPPRESSED:
+            self._metrics.suppressed_writes += 1
+        else:
+            self._metrics.failed_writes += 1
+        return result
 
     async def _async_heater_turn_off(self) -> None:
         """Turn heater toggleable device off."""
-        await self._async_heater_set_value(self._pid.output_limit_min)
+        await self._async_heater_set_value(self._idle_output)
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set new preset mode."""
@@ -487,10 +1578,48 @@ class PidThermostat(ClimateEntity, RestoreEntity, PidBaseClass):
             # I don't think we need to call async_write_ha_state
             # if we didn't change the state
             return
+        self._apply_preset_mode(preset_mode)
+        self.async_write_ha_state()
+
+    def _apply_preset_mode(self, preset_mode: str) -> None:
+        """Apply a preset mode without writing the state."""
+        if preset_mode == self._attr_preset_mode:
+            return
         if preset_mode == PRESET_AWAY:
             self._attr_preset_mode = PRESET_AWAY
             self._saved_target_temp = self._pid.setpoint
-            self._pid.setpoint = self._away_temp
+            self._change_setpoint(self._away_temp)
         elif preset_mode == PRESET_NONE:
             self._attr_preset_mode = PRESET_NONE
-            self._pid.setpoint = self._saved_target_temp
+            self._change_setpoint(self._saved_target_temp)
+
+    def apply_scheduled_setpoint(self, temperature: float) -> None:
+        """
+        Apply a scheduled setpoint without writing the state.
+
+        While away, the scheduled setpoint is remembered and becomes active
+        when the away preset is left.
+        """
+        if self._attr_preset_mode == PRESET_AWAY:
+            self._saved_target_temp = temperature
+        else:
+            self._change_setpoint(temperature)
+
+    async def async_apply_bulk(
+        self, settings: Mapping[str, Any], *, compute: bool
+    ) -> None:
+        """
+        Apply the settings of a bulk update without writing the state.
+
+        The preset is applied before the temperature, so an explicit
+        temperature overrides the preset temperature. The caller is
+        responsible for writing the state.
+        """
+        if (preset_mode := settings.get(ATTR_PRESET_MODE)) is not None:
+            self._apply_preset_mode(preset_mode)
+        if (temperature := settings.get(ATTR_TEMPERATURE)) is not None:
+            self._change_setpoint(temperature)
+        if (hvac_mode := settings.get(ATTR_HVAC_MODE)) is not None:
+            await self._async_apply_hvac_mode(hvac_mode)
+        if compute:
+            await self._async_compute_output(write_state=False)
@@ -0,0 +1,68 @@
+"""
+Out-of-process PID compute worker.
+
+Run as a standalone script by the integration, it only uses the standard
+library. Batches are exchanged over stdin and stdout as length-prefixed JSON
+messages. The worker holds the controller state of every thermostat and
+hands it back with every output, so a restarted worker can be given the
+state again.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from typing import Any
+
+HEADER = struct.Struct("!I")
+
+
+def compute(state: dict[str, Any], request: dict[str, Any]) -> dict[str, Any]:
+    """Compute a PID output, same equations as the in-process controller."""
+    direction = request["direction"]
+    low = request["min"]
+    high = request["max"]
+    error = direction * (request["setpoint"] - request["input"])
+    now = request["time"]
+    last_time = state.get("last_time")
+    time_step = 0.0 if last_time is None else now - last_time
+    i_term = min(max(state["i_term"] + request["ki"] * error * time_step, low), high)
+    p_term = request["kp"] * error
+    # Derivative on the measured slope, not on the error
+    d_term = -direction * request["kd"] * request["slope"]
+    state["i_term"] = i_term
+    state["last_time"] = now
+    return {
+        "output": min(max(p_term + i_term + d_term, low), high),
+        "p": p_term,
+        "i": i_term,
+        "d": d_term,
+        "state": state,
+    }
+
+
+def main() -> None:
+    """Serve batches until stdin is closed."""
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    states: dict[str, dict[str, Any]] = {}
+    while header := stdin.read(HEADER.size):
+        (length,) = HEADER.unpack(header)
+        message = json.loads(stdin.read(length))
+        for key in message.get("remove", []):
+            states.pop(key, None)
+        replies = {}
+        for key, request in message.get("compute", {}).items():
+            if (state := request.get("state")) is not None:
+                states[key] = state
+            elif key not in states:
+                states[key] = {"i_term": 0.0, "last_time": None}
+            replies[key] = compute(states[key], request)
+        data = json.dumps(replies).encode()
+        stdout.write(HEADER.pack(len(data)) + data)
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
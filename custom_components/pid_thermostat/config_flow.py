@@ -1,16 +1,21 @@
 """Config flow for pid integration."""
+
 import logging
 from collections.abc import Mapping
 from typing import Any, cast
 
 import voluptuous as vol
+from homeassistant.components.input_boolean import DOMAIN as INPUT_BOOLEAN_DOMAIN
 from homeassistant.components.input_number import DOMAIN as INPUT_NUMBER_DOMAIN
 from homeassistant.components.number import DOMAIN as NUMBER_DOMAIN
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
 from homeassistant.const import CONF_NAME
 from homeassistant.helpers import selector
 from homeassistant.helpers.schema_config_entry_flow import (
+    SchemaCommonFlowHandler,
     SchemaConfigFlowHandler,
+    SchemaFlowError,
     SchemaFlowFormStep,
 )
 
@@ -19,18 +24,26 @@ from .const import (
     AC_MODE_HEAT,
     CONF_AC_MODE,
     CONF_CYCLE_TIME,
+    CONF_DIRECT_OUTPUT,
     CONF_HEATER,
+    CONF_INTERPOLATE,
+    CONF_MIN_OFF_TIME,
+    CONF_MIN_ON_TIME,
     CONF_PID_KD,
     CONF_PID_KI,
     CONF_PID_KP,
+    CONF_ROOMS,
     CONF_SENSOR,
     DEFAULT_AC_MODE,
     DEFAULT_CYCLE_TIME,
+    DEFAULT_DIRECT_OUTPUT,
+    DEFAULT_INTERPOLATE,
     DEFAULT_PID_KD,
     DEFAULT_PID_KI,
     DEFAULT_PID_KP,
     DOMAIN,
 )
+from .rooms import ROOMS_SCHEMA
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,7 +55,14 @@ _AC_MODES = [
 OPTIONS_BASE_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_HEATER): selector.EntitySelector(
-            selector.EntitySelectorConfig(domain=[NUMBER_DOMAIN, INPUT_NUMBER_DOMAIN]),
+            selector.EntitySelectorConfig(
+                domain=[
+                    NUMBER_DOMAIN,
+                    INPUT_NUMBER_DOMAIN,
+                    SWITCH_DOMAIN,
+                    INPUT_BOOLEAN_DOMAIN,
+                ]
+            ),
         ),
         vol.Required(CONF_SENSOR): selector.EntitySelector(
             selector.EntitySelectorConfig(domain=[SENSOR_DOMAIN, INPUT_NUMBER_DOMAIN]),
@@ -70,6 +90,15 @@ OPTIONS_BASE_SCHEMA = vol.Schema(
         vol.Optional(
             CONF_CYCLE_TIME, default=DEFAULT_CYCLE_TIME
         ): selector.DurationSelector(),
+        vol.Optional(
+            CONF_DIRECT_OUTPUT, default=DEFAULT_DIRECT_OUTPUT
+        ): selector.BooleanSelector(),
+        vol.Optional(
+            CONF_INTERPOLATE, default=DEFAULT_INTERPOLATE
+        ): selector.BooleanSelector(),
+        vol.Optional(CONF_MIN_ON_TIME): selector.DurationSelector(),
+        vol.Optional(CONF_MIN_OFF_TIME): selector.DurationSelector(),
+        vol.Optional(CONF_ROOMS): selector.ObjectSelector(),
     }
 )
 
@@ -81,12 +110,27 @@ CONFIG_SCHEMA = vol.Schema(
 ).extend(OPTIONS_BASE_SCHEMA.schema)
 
 
+async def validate_rooms(
+    handler: SchemaCommonFlowHandler,  # noqa: ARG001
+    user_input: dict[str, Any],
+) -> dict[str, Any]:
+    """Validate the rooms table."""
+    if CONF_ROOMS in user_input:
+        try:
+            user_input[CONF_ROOMS] = ROOMS_SCHEMA(user_input[CONF_ROOMS])
+        except vol.Invalid as ex:
+            _LOGGER.debug("Invalid rooms: %s", ex)
+            msg = "invalid_rooms"
+            raise SchemaFlowError(msg) from ex
+    return user_input
+
+
 CONFIG_FLOW = {
-    "user": SchemaFlowFormStep(CONFIG_SCHEMA),
+    "user": SchemaFlowFormStep(CONFIG_SCHEMA, validate_user_input=validate_rooms),
 }
 
 OPTIONS_FLOW = {
-    "init": SchemaFlowFormStep(OPTIONS_BASE_SCHEMA),
+    "init": SchemaFlowFormStep(OPTIONS_BASE_SCHEMA, validate_user_input=validate_rooms),
 }
 
 
@@ -11,9 +11,11 @@ from .pid_shared.const import (  # noqa: F401
 )
 
 DOMAIN = "pid_thermostat"
-PLATFORMS = [Platform.CLIMATE]
+PLATFORMS = [Platform.CLIMATE, Platform.SENSOR]
 
 CONF_HEATER = "heater"
+CONF_COOLER = "cooler"
+CONF_DEADBAND = "deadband"
 CONF_SENSOR = "target_sensor"
 CONF_MIN_TEMP = "min_temp"
 CONF_MAX_TEMP = "max_temp"
@@ -21,9 +23,67 @@ CONF_TARGET_TEMP = "target_temp"
 CONF_AC_MODE = "ac_mode"
 CONF_INITIAL_HVAC_MODE = "initial_hvac_mode"
 CONF_AWAY_TEMP = "away_temp"
+CONF_DIRECT_OUTPUT = "direct_output"
+CONF_INTERPOLATE = "interpolate"
+CONF_SMITH_PREDICTOR = "smith_predictor"
+CONF_MODEL_GAIN = "model_gain"
+CONF_TIME_CONSTANT = "time_constant"
+CONF_DEAD_TIME = "dead_time"
+CONF_SHADOWS = "shadows"
+CONF_COMPUTE_WORKER = "compute_worker"
+CONF_ROOMS = "rooms"
+CONF_MIN_ON_TIME = "min_on_time"
+CONF_MIN_OFF_TIME = "min_off_time"
+CONF_SCALE = "scale"
+CONF_MPC = "mpc"
+CONF_HORIZON = "horizon"
+CONF_MOVE_SUPPRESSION = "move_suppression"
+CONF_TABLE_MEMORY = "table_memory"
+CONF_FEEDFORWARD = "feedforward"
+CONF_GAIN = "gain"
+CONF_REFERENCE = "reference"
+CONF_OUTDOOR_SENSOR = "outdoor_sensor"
+CONF_FAULT_WINDOW = "fault_window"
+CONF_JOURNAL = "journal"
+CONF_SENSOR_REFRESH = "sensor_refresh"
+CONF_MAX_AGE = "max_age"
+CONF_MAX_ERROR = "max_error"
+
+SERVICE_AUTOTUNE = "autotune"
+SERVICE_BULK_SET = "bulk_set"
+SERVICE_EXPORT_JOURNAL = "export_journal"
+SERVICE_PROFILE = "profile"
+SERVICE_SET_SCHEDULE = "set_schedule"
+
+ATTR_APPLY = "apply"
+ATTR_AUTOTUNE = "autotune"
+ATTR_COMPUTE = "compute"
+ATTR_CONTROL_LAW = "control_law"
+ATTR_DURATION = "duration"
+ATTR_END = "end"
+ATTR_FEEDFORWARD = "feedforward"
+ATTR_FORMAT = "format"
+ATTR_HEALTH = "health"
+ATTR_HOTSPOTS = "hotspots"
+ATTR_HYSTERESIS = "hysteresis"
+ATTR_MAX_DEVIATION = "max_deviation"
+ATTR_MODE = "mode"
+ATTR_PREDICTED_TEMPERATURE = "predicted_temperature"
+ATTR_RULE = "rule"
+ATTR_SCHEDULE = "schedule"
+ATTR_SHADOWS = "shadows"
+ATTR_START = "start"
+ATTR_THERMOSTATS = "thermostats"
+ATTR_TIME = "time"
+ATTR_TIMEOUT = "timeout"
+
+PROFILE_MODE_DETERMINISTIC = "deterministic"
+PROFILE_MODE_SAMPLING = "sampling"
+PROFILE_MODES = [PROFILE_MODE_DETERMINISTIC, PROFILE_MODE_SAMPLING]
 
 AC_MODE_COOL = "cool"
 AC_MODE_HEAT = "heat"
+AC_MODE_HEAT_COOL = "heat_cool"
 
 
 DEFAULT_NAME = "PID Thermostat"
@@ -32,7 +92,23 @@ DEFAULT_PID_KP = 100.0
 DEFAULT_PID_KI = 0.1
 DEFAULT_PID_KD = 0.0
 DEFAULT_AC_MODE = AC_MODE_HEAT
+DEFAULT_DEADBAND = 0.0
 DEFAULT_TARGET_TEMPERATURE = 19.0
+DEFAULT_DIRECT_OUTPUT = False
+DEFAULT_INTERPOLATE = False
+DEFAULT_COMPUTE_WORKER = False
+DEFAULT_PROFILE_DURATION = 60
+DEFAULT_PROFILE_HOTSPOTS = 20
+DEFAULT_AUTOTUNE_HYSTERESIS = 0.2
+DEFAULT_AUTOTUNE_MAX_DEVIATION = 2.0
+DEFAULT_AUTOTUNE_TIMEOUT = {"hours": 8}
+DEFAULT_AUTOTUNE_CYCLES = 3
+DEFAULT_MOVE_SUPPRESSION = 1.0
+DEFAULT_TABLE_MEMORY = 32768
+DEFAULT_FAULT_WINDOW = {"hours": 2}
+DEFAULT_JOURNAL = False
+DEFAULT_REFRESH_MAX_AGE = {"minutes": 5}
+DEFAULT_REFRESH_TIMEOUT = {"seconds": 5}
 
 SUPPORT_FLAGS = (
     ClimateEntityFeature.TARGET_TEMPERATURE
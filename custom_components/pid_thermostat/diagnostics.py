@@ -0,0 +1,38 @@
+"""Diagnostics support for the PID thermostat."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import Platform
+from homeassistant.helpers import entity_registry as er
+
+from .kpi import async_get_kpi_tracker
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of the thermostats of a config entry."""
+    now = time.time()
+    thermostats = {
+        entity.entity_id: state.as_dict()
+        for entity in er.async_entries_for_config_entry(
+            er.async_get(hass), entry.entry_id
+        )
+        if entity.domain == Platform.CLIMATE
+        and (state := hass.states.get(entity.entity_id)) is not None
+    }
+    return {
+        "options": dict(entry.options),
+        "thermostats": thermostats,
+        "kpi": {
+            unique_id: async_get_kpi_tracker(hass, unique_id).as_dict(now)
+            for unique_id in entry.runtime_data.configs
+        },
+    }
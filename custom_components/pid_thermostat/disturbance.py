@@ -0,0 +1,126 @@
+"""Filtered disturbance sensors for the feedforward of the PID thermostat."""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import TYPE_CHECKING
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import CALLBACK_TYPE, Event, EventStateChangedData
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_DISTURBANCES: HassKey[DisturbanceSensors] = HassKey(f"{DOMAIN}_disturbances")
+
+
+class LagFilter:
+    """
+    First-order lag of a sensor.
+
+    The sensor value holds between its updates, so the filtered value at any
+    time follows exactly from the last update, without a timer per filter.
+    """
+
+    def __init__(self, time_constant: float) -> None:
+        """Initialize the filter."""
+        self._time_constant = time_constant
+        self._input: float | None = None
+        self._value = 0.0
+        self._time = 0.0
+
+    def update(self, now: float, value: float) -> None:
+        """Process a sensor value, the first one initializes the filter."""
+        self._value = value if self._input is None else self.value_at(now)
+        self._input = value
+        self._time = now
+
+    def value_at(self, now: float) -> float | None:
+        """Return the filtered value at a time, None before the first value."""
+        if self._input is None or self._time_constant <= 0:
+            return self._input
+        decay = math.exp(-max(0.0, now - self._time) / self._time_constant)
+        return self._input + (self._value - self._input) * decay
+
+
+class DisturbanceSensors:
+    """
+    Filtered disturbance sensors, shared by all thermostats.
+
+    A sensor entity has one state subscription, whatever the number of
+    thermostats that use it, and one filter per lag on it. The filters are
+    reference counted; the subscription goes with the last filter of its
+    sensor.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the shared sensors."""
+        self.hass = hass
+        self._filters: dict[str, dict[float, tuple[LagFilter, int]]] = {}
+        self._unsubscribe: dict[str, CALLBACK_TYPE] = {}
+
+    @callback
+    def async_acquire(self, entity_id: str, time_constant: float) -> LagFilter:
+        """Return the filter of a sensor with a lag, subscribing if needed."""
+        filters = self._filters.setdefault(entity_id, {})
+        if time_constant in filters:
+            lag_filter, users = filters[time_constant]
+            filters[time_constant] = (lag_filter, users + 1)
+            return lag_filter
+        lag_filter = LagFilter(time_constant)
+        filters[time_constant] = (lag_filter, 1)
+        if (state := self.hass.states.get(entity_id)) is not None:
+            self._update(lag_filter, state)
+        if entity_id not in self._unsubscribe:
+            self._unsubscribe[entity_id] = async_track_state_change_event(
+                self.hass, entity_id, self._async_sensor_changed
+            )
+        return lag_filter
+
+    @callback
+    def async_release(self, entity_id: str, time_constant: float) -> None:
+        """Drop a use of a filter, unsubscribing with the last filter."""
+        filters = self._filters[entity_id]
+        lag_filter, users = filters[time_constant]
+        if users > 1:
+            filters[time_constant] = (lag_filter, users - 1)
+            return
+        del filters[time_constant]
+        if not filters:
+            del self._filters[entity_id]
+            self._unsubscribe.pop(entity_id)()
+
+    @callback
+    def _async_sensor_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Feed a sensor update to all filters on it."""
+        if (state := event.data["new_state"]) is None:
+            return
+        for lag_filter, _ in self._filters.get(state.entity_id, {}).values():
+            self._update(lag_filter, state)
+
+    @staticmethod
+    def _update(lag_filter: LagFilter, state: State) -> None:
+        """Feed a state to a filter, skipping states that are not a number."""
+        if state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return
+        try:
+            value = float(state.state)
+        except ValueError:
+            _LOGGER.debug("Disturbance %s is not a number", state.entity_id)
+            return
+        if math.isfinite(value):
+            lag_filter.update(state.last_updated.timestamp(), value)
+
+
+def async_get_disturbances(hass: HomeAssistant) -> DisturbanceSensors:
+    """Return the integration-wide disturbance sensors."""
+    if (sensors := hass.data.get(DATA_DISTURBANCES)) is None:
+        sensors = hass.data[DATA_DISTURBANCES] = DisturbanceSensors(hass)
+    return sensors
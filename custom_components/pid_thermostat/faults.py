@@ -0,0 +1,200 @@
+"""Stuck actuator and sensor mismatch detection of the PID thermostats."""
+
+from __future__ import annotations
+
+import math
+from enum import StrEnum
+from typing import Any
+
+# Output, as a fraction of its range, that counts as driving hard
+HIGH_OUTPUT = 0.8
+# Temperature change in the driven direction over a window of high output, at
+# or below which the temperature stopped moving towards the setpoint
+STALL_RESPONSE = 0.0
+# Least temperature change in the driven direction that clears a stuck actuator
+MIN_RESPONSE = 0.2
+# Correlation below which the temperature moves against the output
+MISMATCH_CORRELATION = -0.5
+# Least standard deviation of the output fraction to judge the correlation
+MIN_EXCITATION = 0.1
+# Windows the regression spans, to see the output both high and low
+REGRESSION_WINDOWS = 12
+
+
+class Fault(StrEnum):
+    """Fault of a thermostat loop."""
+
+    STUCK_ACTUATOR = "stuck_actuator"
+    SENSOR_MISMATCH = "sensor_mismatch"
+
+
+class ResponseStatistics:
+    """
+    Exponentially weighted regression of the temperature rate on the output.
+
+    Means, variances and the covariance are updated per cycle with a weight
+    of one over the memory, so the memory use does not depend on it. The
+    output is lagged by a first-order filter, as the room responds to the
+    output with a delay.
+    """
+
+    def __init__(self, memory: int, lag: int) -> None:
+        """Initialize the statistics, memory and lag in cycles."""
+        self._alpha = 1.0 / memory
+        self._lag = 1.0 / max(1, lag)
+        self.samples = 0
+        self._output: float | None = None
+        self._mean_x = 0.0
+        self._mean_y = 0.0
+        self._var_x = 0.0
+        self._var_y = 0.0
+        self._cov = 0.0
+
+    def update(self, output: float, rate: float) -> None:
+        """Add a cycle with the output fraction and the temperature rate."""
+        if self._output is None:
+            self._output = self._mean_x = output
+            self._mean_y = rate
+        self._output += self._lag * (output - self._output)
+        dx = self._output - self._mean_x
+        dy = rate - self._mean_y
+        self._mean_x += self._alpha * dx
+        self._mean_y += self._alpha * dy
+        # Welford-style exponentially weighted update
+        self._var_x = (1 - self._alpha) * (self._var_x + self._alpha * dx * dx)
+        self._var_y = (1 - self._alpha) * (self._var_y + self._alpha * dy * dy)
+        self._cov = (1 - self._alpha) * (self._cov + self._alpha * dx * dy)
+        self.samples += 1
+
+    @property
+    def excitation(self) -> float:
+        """Return the standard deviation of the lagged output."""
+        return math.sqrt(self._var_x)
+
+    @property
+    def slope(self) -> float:
+        """Return the temperature rate per unit of output fraction."""
+        return self._cov / self._var_x if self._var_x > 0 else 0.0
+
+    @property
+    def correlation(self) -> float:
+        """Return the correlation of the temperature rate with the output."""
+        if self._var_x <= 0 or self._var_y <= 0:
+            return 0.0
+        return self._cov / math.sqrt(self._var_x * self._var_y)
+
+
+class FaultDetector:
+    """
+    Faults of a thermostat loop from streaming statistics.
+
+    A stuck actuator drives the output high over a whole window while the
+    temperature does not move in the driven direction, towards the setpoint,
+    at all: a closed valve, a tripped heater. An undersized heater that is
+    saturated but slowly gains on the setpoint is not stuck. The fault is
+    cleared once a window gains a clear temperature change again.
+
+    A sensor mismatch is a temperature that moves against the output over
+    the window: a sensor in another room, a cooler wired as heater. Only a
+    run counter, the temperature at its start and the regression are kept.
+
+    The output of a split range is signed, negative on its cooling side. A
+    run of high output on either side is judged on the temperature moving
+    in the direction of that side.
+    """
+
+    def __init__(self, window: int, direction: int) -> None:
+        """Initialize the detector, window in cycles."""
+        self._window = window
+        self._direction = direction
+        self._stats = ResponseStatistics(window * REGRESSION_WINDOWS, window // 4)
+        self._last_temperature: float | None = None
+        self._run = 0
+        self._run_start = 0.0
+        self._run_output = 0.0
+        self._run_side = 1.0
+        self.faults: dict[Fault, dict[str, Any]] = {}
+
+    def reset(self) -> None:
+        """Restart the detection, when the loop was off."""
+        self._last_temperature = None
+        self._run = 0
+
+    def update(self, output: float, temperature: float) -> dict[Fault, bool]:
+        """Process a cycle with the output fraction, return the changed faults."""
+        changes: dict[Fault, bool] = {}
+        # Temperatures in the direction the output drives them
+        temperature *= self._direction
+        if self._last_temperature is not None:
+            self._stats.update(output, temperature - self._last_temperature)
+        self._last_temperature = temperature
+        self._check_stuck(output, temperature, changes)
+        self._check_mismatch(changes)
+        return changes
+
+    def _check_stuck(
+        self, output: float, temperature: float, changes: dict[Fault, bool]
+    ) -> None:
+        """Judge a window of high output on the temperature it gained."""
+        if abs(output) < HIGH_OUTPUT:
+            self._run = 0
+            return
+        side = math.copysign(1.0, output)
+        if self._run == 0 or side != self._run_side:
+            self._run = 0
+            self._run_start = temperature
+            self._run_output = 0.0
+            self._run_side = side
+        self._run += 1
+        self._run_output += abs(output)
+        if self._run < self._window:
+            return
+        response = side * (temperature - self._run_start)
+        if response <= STALL_RESPONSE:
+            self._set(
+                Fault.STUCK_ACTUATOR,
+                {
+                    "cycles": self._run,
+                    "mean_output": f"{100 * self._run_output / self._run:.0f}%",
+                    "response": f"{response:+.2f}",
+                },
+                changes,
+            )
+        elif response >= MIN_RESPONSE:
+            self._clear(Fault.STUCK_ACTUATOR, changes)
+        # Judge the next window from here
+        self._run = 0
+
+    def _check_mismatch(self, changes: dict[Fault, bool]) -> None:
+        """Judge the correlation, once the output varied enough."""
+        stats = self._stats
+        if (
+            stats.samples < self._window * REGRESSION_WINDOWS
+            or stats.excitation < MIN_EXCITATION
+        ):
+            return
+        if stats.correlation <= MISMATCH_CORRELATION:
+            self._set(
+                Fault.SENSOR_MISMATCH,
+                {
+                    "correlation": f"{stats.correlation:.2f}",
+                    "slope": f"{stats.slope:+.4f}",
+                    "cycles": self._window * REGRESSION_WINDOWS,
+                },
+                changes,
+            )
+        elif stats.correlation > 0:
+            self._clear(Fault.SENSOR_MISMATCH, changes)
+
+    def _set(
+        self, fault: Fault, evidence: dict[str, Any], changes: dict[Fault, bool]
+    ) -> None:
+        """Raise a fault with its evidence, if it was not raised yet."""
+        if fault not in self.faults:
+            changes[fault] = True
+        self.faults[fault] = evidence
+
+    def _clear(self, fault: Fault, changes: dict[Fault, bool]) -> None:
+        """Clear a fault, if it was raised."""
+        if self.faults.pop(fault, None) is not None:
+            changes[fault] = False
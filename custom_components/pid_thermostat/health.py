@@ -0,0 +1,106 @@
+"""Health tracking with rate-limited logging for the PID thermostats."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_HEALTH: HassKey[FleetHealth] = HassKey(f"{DOMAIN}_health")
+
+SUMMARY_INTERVAL = 900.0
+SUMMARY_MAX_ENTITIES = 5
+
+
+class Health(StrEnum):
+    """Health of a thermostat."""
+
+    OK = "ok"
+    SENSOR_MISSING = "sensor_missing"
+    OUTPUT_MISSING = "output_missing"
+    DEGRADED = "degraded"
+
+
+class FleetHealth:
+    """
+    Health of all thermostats, logged on transitions only.
+
+    A thermostat that stays unhealthy is reported once when it becomes
+    unhealthy and once when it recovers. In between, a single summary of all
+    unhealthy thermostats is logged at most once per summary interval, so a
+    failing gateway does not log a line per thermostat per cycle.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the health tracker."""
+        self._health: dict[str, Health] = {}
+        self._repeats: dict[str, int] = {}
+        self._next_summary = 0.0
+
+    def update(self, entity_id: str, health: Health, reason: str | None) -> bool:
+        """Set the health of a thermostat, return True if it changed."""
+        old = self._health.get(entity_id, Health.OK)
+        if health == old:
+            if health is not Health.OK:
+                self._repeats[entity_id] += 1
+                self._summarize()
+            return False
+        if health is Health.OK:
+            _LOGGER.info(
+                "%s recovered from %s after %d repeated reports",
+                entity_id,
+                old,
+                self._repeats.pop(entity_id, 0),
+            )
+            del self._health[entity_id]
+            return True
+        _LOGGER.warning("%s is %s: %s", entity_id, health, reason)
+        if not self._health:
+            # First summary after one interval of trouble
+            self._next_summary = time.monotonic() + SUMMARY_INTERVAL
+        self._health[entity_id] = health
+        self._repeats[entity_id] = 0
+        return True
+
+    def remove(self, entity_id: str) -> None:
+        """Forget a thermostat that is removed."""
+        self._health.pop(entity_id, None)
+        self._repeats.pop(entity_id, None)
+
+    def _summarize(self) -> None:
+        """Log a summary of the unhealthy thermostats, if one is due."""
+        if (now := time.monotonic()) < self._next_summary:
+            return
+        self._next_summary = now + SUMMARY_INTERVAL
+        by_health: defaultdict[Health, list[str]] = defaultdict(list)
+        for entity_id, health in self._health.items():
+            by_health[health].append(entity_id)
+        _LOGGER.warning(
+            "%d PID thermostats unhealthy: %s",
+            len(self._health),
+            "; ".join(
+                f"{health} {len(entity_ids)}x ("
+                + ", ".join(entity_ids[:SUMMARY_MAX_ENTITIES])
+                + (", ..." if len(entity_ids) > SUMMARY_MAX_ENTITIES else "")
+                + ")"
+                for health, entity_ids in by_health.items()
+            ),
+        )
+
+
+def async_get_health(hass: HomeAssistant) -> FleetHealth:
+    """Return the integration-wide health tracker."""
+    if (health := hass.data.get(DATA_HEALTH)) is None:
+        health = hass.data[DATA_HEALTH] = FleetHealth()
+    return health
@@ -0,0 +1,387 @@
+"""Append-only control journal of the PID thermostats, memory-mapped on disk."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import csv
+import json
+import logging
+import mmap
+import struct
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.file import write_utf8_file
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from homeassistant.core import Event
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_JOURNAL: HassKey[Journal] = HassKey(f"{DOMAIN}_journal")
+
+JOURNAL_DIRECTORY = f"{DOMAIN}_journal"
+ENTITIES_FILE = "entities.json"
+SEGMENT_PATTERN = "segment-*.bin"
+# Size of a segment file and the age after which the next one is started
+SEGMENT_SIZE = 8 * 1024 * 1024
+SEGMENT_AGE = 86400.0
+# Age of the last record after which a segment is deleted
+RETENTION = 28 * 86400.0
+
+# Segment header: magic, version, record size, records written, start time
+HEADER = struct.Struct("<4sHHQd")
+MAGIC = b"PIDJ"
+VERSION = 1
+_COUNT = struct.Struct("<Q")
+_COUNT_OFFSET = 8
+# Record: time, entity index, flags, process value, setpoint, output and the
+# proportional, integral and derivative terms
+RECORD = struct.Struct("<dHHffffff")
+_TIME = struct.Struct("<d")
+
+FLAG_AUTOTUNE = 1
+FLAG_MPC = 2
+FLAG_WRITE_FAILED = 4
+
+EXPORT_CSV = "csv"
+EXPORT_NPY = "npy"
+EXPORT_FORMATS = [EXPORT_CSV, EXPORT_NPY]
+# Exported columns, the entity index is left out of a per-thermostat export
+EXPORT_FIELDS = (
+    ("time", "<f8"),
+    ("flags", "<u2"),
+    ("process_value", "<f4"),
+    ("setpoint", "<f4"),
+    ("output", "<f4"),
+    ("p", "<f4"),
+    ("i", "<f4"),
+    ("d", "<f4"),
+)
+_EXPORT_RECORD = struct.Struct("<dHffffff")
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_NPY_ALIGNMENT = 64
+
+
+class Segment:
+    """
+    Segment file of the journal, memory-mapped for appending records.
+
+    The file is created at its full size, so appending a record is a copy
+    into the mapping and an update of the count in the header, without a
+    system call. Creating and closing a segment does I/O, run those in the
+    executor.
+    """
+
+    def __init__(self, path: Path, size: int = SEGMENT_SIZE) -> None:
+        """Create the segment file and map it."""
+        self.path = path
+        self.start = 0.0
+        self.count = 0
+        self.capacity = (size - HEADER.size) // RECORD.size
+        with path.open("w+b") as file:
+            file.truncate(size)
+            self._map = mmap.mmap(file.fileno(), size)
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, 0, 0.0)
+
+    def activate(self, now: float) -> None:
+        """Start appending to the segment."""
+        self.start = now
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, 0, now)
+
+    def expired(self, now: float) -> bool:
+        """Return True if the segment is full or too old to append to."""
+        return self.count >= self.capacity or now - self.start >= SEGMENT_AGE
+
+    def append(self, record: tuple[float | int, ...]) -> None:
+        """Append a record."""
+        RECORD.pack_into(self._map, HEADER.size + self.count * RECORD.size, *record)
+        self.count += 1
+        # The count follows the record, so a reader never sees a partial one
+        _COUNT.pack_into(self._map, _COUNT_OFFSET, self.count)
+
+    def close(self) -> None:
+        """Flush the segment and cut its file to the records, drop it if empty."""
+        self._map.flush()
+        self._map.close()
+        if not self.count:
+            self.path.unlink(missing_ok=True)
+            return
+        with self.path.open("r+b") as file:
+            file.truncate(HEADER.size + self.count * RECORD.size)
+
+
+class _SegmentTimes:
+    """Record times of a mapped segment, as a sequence to bisect."""
+
+    def __init__(self, data: mmap.mmap, count: int) -> None:
+        self._data = data
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> float:
+        return _TIME.unpack_from(self._data, HEADER.size + index * RECORD.size)[0]
+
+
+class JournalReader:
+    """
+    Records of the journal in a time range, without reading whole segments.
+
+    A segment is skipped on its first and last record time, and the range is
+    found within a segment by bisecting on the record times, so only the pages
+    of the records in the range are read. The segment being appended to can be
+    read along, up to the count in its header.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize the reader of a journal directory."""
+        self.directory = directory
+
+    def entities(self) -> dict[str, int]:
+        """Return the entity indexes of the journal."""
+        try:
+            return json.loads((self.directory / ENTITIES_FILE).read_text())
+        except FileNotFoundError:
+            return {}
+
+    def segments(self) -> list[Path]:
+        """Return the segment files, oldest first."""
+        return sorted(self.directory.glob(SEGMENT_PATTERN))
+
+    def records(
+        self, entity_id: str, start: float, end: float
+    ) -> Iterator[tuple[float | int, ...]]:
+        """Yield the records of a thermostat from start up to and including end."""
+        if (index := self.entities().get(entity_id)) is None:
+            return
+        for path in self.segments():
+            for record in _segment_records(path, start, end):
+                if record[1] == index:
+                    yield record
+
+
+def _segment_records(
+    path: Path, start: float, end: float
+) -> Iterator[tuple[float | int, ...]]:
+    """Yield the records of a segment from start up to and including end."""
+    with path.open("rb") as file:
+        size = path.stat().st_size
+        if size < HEADER.size:
+            return
+        with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as data:
+            magic, version, record_size, count, _ = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                _LOGGER.warning("Skipping journal segment %s of unknown format", path)
+                return
+            times = _SegmentTimes(data, min(count, (size - HEADER.size) // RECORD.size))
+            if not times or times[0] > end or times[len(times) - 1] < start:
+                return
+            low = bisect.bisect_left(times, start)
+            high = bisect.bisect_right(times, end, lo=low)
+            yield from RECORD.iter_unpack(
+                data[HEADER.size + low * RECORD.size : HEADER.size + high * RECORD.size]
+            )
+
+
+def export_records(
+    records: Iterator[tuple[float | int, ...]], path: Path, export_format: str
+) -> int:
+    """Write records as CSV or as a NumPy structured array, return their number."""
+    rows = [(record[0], *record[2:]) for record in records]
+    if export_format == EXPORT_CSV:
+        with path.open("w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow([name for name, _ in EXPORT_FIELDS])
+            writer.writerows(rows)
+        return len(rows)
+    # NumPy .npy version 1.0, written without NumPy
+    header = repr(
+        {"descr": list(EXPORT_FIELDS), "fortran_order": False, "shape": (len(rows),)}
+    )
+    padding = -(len(_NPY_MAGIC) + 2 + len(header) + 1) % _NPY_ALIGNMENT
+    header = f"{header}{' ' * padding}\n".encode("latin1")
+    with path.open("wb") as file:
+        file.write(_NPY_MAGIC + struct.pack("<H", len(header)) + header)
+        for row in rows:
+            file.write(_EXPORT_RECORD.pack(*row))
+    return len(rows)
+
+
+def _last_time(path: Path) -> float | None:
+    """Return the time of the last record of a segment, None if it has none."""
+    with path.open("rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size or not (count := HEADER.unpack(header)[3]):
+            return None
+        file.seek(HEADER.size + (count - 1) * RECORD.size)
+        data = file.read(_TIME.size)
+    return _TIME.unpack(data)[0] if len(data) == _TIME.size else None
+
+
+class Journal:
+    """
+    Journal of the cycles of all thermostats, for post-mortem analysis.
+
+    Every cycle of a thermostat appends a fixed-width record to the active
+    segment, a memory-mapped file, so the event loop never waits for the disk.
+    The next segment is created ahead in the executor; when the active one is
+    full or older than the segment age the journal switches over, and closes
+    the old segment, prunes the segments past retention and creates the next
+    one in the executor. Records that arrive while no segment is ready are
+    counted as dropped.
+    """
+
+    def __init__(self, hass: HomeAssistant, directory: Path) -> None:
+        """Initialize the journal."""
+        self.hass = hass
+        self.directory = directory
+        self.reader = JournalReader(directory)
+        self.dropped = 0
+        self._entities: dict[str, int] = {}
+        self._sequence = 0
+        self._segment: Segment | None = None
+        self._spare: Segment | None = None
+        self._closed = False
+        self._save_lock = asyncio.Lock()
+
+    async def async_open(self) -> None:
+        """Open the journal with a fresh segment."""
+        self._entities = await self.hass.async_add_executor_job(self._open)
+        segment = await self.hass.async_add_executor_job(self._create_segment)
+        if self._closed:
+            await self.hass.async_add_executor_job(segment.close)
+            return
+        segment.activate(time.time())
+        self._segment = segment
+        self._async_prepare()
+
+    def _open(self) -> dict[str, int]:
+        """Create the directory, drop empty segments and load the entities."""
+        self.directory.mkdir(exist_ok=True)
+        for path in self.reader.segments():
+            # Segments a previous run left without records
+            if _last_time(path) is None:
+                path.unlink()
+            else:
+                self._sequence = max(self._sequence, int(path.stem.split("-")[1]))
+        self._prune(time.time())
+        return self.reader.entities()
+
+    def _create_segment(self) -> Segment:
+        """Create the next segment file."""
+        self._sequence += 1
+        return Segment(self.directory / f"segment-{self._sequence:08d}.bin")
+
+    def _prune(self, now: float) -> None:
+        """Delete the segments whose last record is past retention."""
+        active = {segment.path for segment in (self._segment, self._spare) if segment}
+        for path in self.reader.segments():
+            if path in active:
+                continue
+            last = _last_time(path)
+            if last is not None and now - last < RETENTION:
+                continue
+            _LOGGER.debug("Deleting journal segment %s", path)
+            path.unlink()
+
+    def _rotate(self, old: Segment) -> Segment:
+        """Close a segment, prune and create the next one."""
+        old.close()
+        self._prune(time.time())
+        return self._create_segment()
+
+    @callback
+    def _async_prepare(self, old: Segment | None = None) -> None:
+        """Create the next segment in the executor, closing an old one."""
+
+        async def _async_prepare() -> None:
+            if old is None:
+                spare = await self.hass.async_add_executor_job(self._create_segment)
+            else:
+                spare = await self.hass.async_add_executor_job(self._rotate, old)
+            if self._closed:
+                await self.hass.async_add_executor_job(spare.close)
+            else:
+                self._spare = spare
+
+        self.hass.async_create_background_task(
+            _async_prepare(), f"{DOMAIN} journal segment"
+        )
+
+    @callback
+    def async_append(
+        self,
+        entity_id: str,
+        now: float,
+        values: tuple[float, float, float, float, float, float],
+        flags: int,
+    ) -> None:
+        """Append a cycle: process value, setpoint, output and P, I, D terms."""
+        if self._closed:
+            return
+        segment = self._segment
+        if segment is not None and segment.expired(now) and self._spare is not None:
+            self._segment, self._spare = self._spare, None
+            self._segment.activate(now)
+            self._async_prepare(old=segment)
+            segment = self._segment
+        if segment is None or segment.count >= segment.capacity:
+            self.dropped += 1
+            return
+        if (index := self._entities.get(entity_id)) is None:
+            index = self._entities[entity_id] = len(self._entities)
+            self.hass.async_create_background_task(
+                self._async_save_entities(), f"{DOMAIN} journal entities"
+            )
+        segment.append((now, index, flags, *values))
+
+    async def _async_save_entities(self) -> None:
+        """Save the entity indexes, the last save holds the last index."""
+        async with self._save_lock:
+            await self.hass.async_add_executor_job(
+                write_utf8_file,
+                str(self.directory / ENTITIES_FILE),
+                json.dumps(self._entities),
+            )
+
+    async def async_export(
+        self, entity_id: str, start: float, end: float, path: Path, export_format: str
+    ) -> int:
+        """Export the records of a thermostat in a time range, return their number."""
+        return await self.hass.async_add_executor_job(
+            lambda: export_records(
+                self.reader.records(entity_id, start, end), path, export_format
+            )
+        )
+
+    async def async_shutdown(self, _event: Event | None = None) -> None:
+        """Close the segments on shutdown."""
+        # Detached first, so no cycle appends to a map being closed
+        segments = (self._segment, self._spare)
+        self._closed = True
+        self._segment = self._spare = None
+        for segment in segments:
+            if segment is not None:
+                await self.hass.async_add_executor_job(segment.close)
+
+
+def async_get_journal(hass: HomeAssistant) -> Journal:
+    """Return the integration-wide journal, opening it on first use."""
+    if (journal := hass.data.get(DATA_JOURNAL)) is None:
+        journal = hass.data[DATA_JOURNAL] = Journal(
+            hass, Path(hass.config.path(JOURNAL_DIRECTORY))
+        )
+        hass.async_create_background_task(journal.async_open(), f"{DOMAIN} journal")
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, journal.async_shutdown)
+    return journal
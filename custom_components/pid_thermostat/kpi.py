@@ -0,0 +1,235 @@
+"""Incremental control quality KPIs for the PID thermostat."""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import CONF_NAME, CONF_UNIQUE_ID, Platform
+from homeassistant.core import callback
+from homeassistant.helpers.discovery import async_load_platform
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+DATA_KPI: HassKey[dict[str, KpiTracker]] = HassKey(f"{DOMAIN}_kpi")
+DATA_KPI_SENSORS: HassKey[set[str]] = HassKey(f"{DOMAIN}_kpi_sensors")
+
+KPI_IAE = "iae"
+KPI_ISE = "ise"
+KPI_OVERSHOOT = "overshoot"
+KPI_SETTLING_TIME = "settling_time"
+KPI_OUTPUT_VARIATION = "output_variation"
+KPI_ENERGY = "energy"
+KPIS = (
+    KPI_IAE,
+    KPI_ISE,
+    KPI_OVERSHOOT,
+    KPI_SETTLING_TIME,
+    KPI_OUTPUT_VARIATION,
+    KPI_ENERGY,
+)
+
+WINDOW_HOUR = "hour"
+WINDOW_DAY = "day"
+WINDOW_WEEK = "week"
+# Window name: number of buckets, bucket length in seconds
+WINDOWS = {
+    WINDOW_HOUR: (12, 300),
+    WINDOW_DAY: (24, 3600),
+    WINDOW_WEEK: (28, 21600),
+}
+
+SETTLE_BAND_MIN = 0.2
+SETTLE_BAND_FRACTION = 0.05
+SETTLE_HOLD = 600.0
+
+# Fields of a bucket
+_IAE, _ISE, _VARIATION, _ENERGY, _OVERSHOOT, _SETTLE_SUM, _SETTLE_COUNT = range(7)
+_FIELDS = 7
+
+
+class _BucketRing:
+    """Ring of time buckets with aggregates, covering one rolling window."""
+
+    __slots__ = ("_ids", "_length", "_values")
+
+    def __init__(self, count: int, length: float) -> None:
+        """Initialize empty buckets."""
+        self._length = length
+        self._ids = array("q", [-1] * count)
+        self._values = array("d", bytes(8 * _FIELDS * count))
+
+    def current(self, now: float) -> int:
+        """Return the offset of the bucket of a time, resetting it if stale."""
+        bucket_id = int(now // self._length)
+        slot = bucket_id % len(self._ids)
+        offset = slot * _FIELDS
+        if self._ids[slot] != bucket_id:
+            self._ids[slot] = bucket_id
+            for field in range(_FIELDS):
+                self._values[offset + field] = 0.0
+        return offset
+
+    def add(self, now: float, field: int, value: float) -> None:
+        """Add a value to a field of the current bucket."""
+        self._values[self.current(now) + field] += value
+
+    def add_cycle(
+        self,
+        now: float,
+        error: float,
+        time_step: float,
+        variation: float,
+        output: float,
+    ) -> None:
+        """Add the aggregates of a controller cycle to the current bucket."""
+        offset = self.current(now)
+        values = self._values
+        values[offset + _IAE] += abs(error) * time_step
+        values[offset + _ISE] += error * error * time_step
+        values[offset + _VARIATION] += variation
+        values[offset + _ENERGY] += output * time_step
+
+    def maximum(self, now: float, field: int, value: float) -> None:
+        """Raise a field of the current bucket to a value."""
+        offset = self.current(now) + field
+        self._values[offset] = max(self._values[offset], value)
+
+    def totals(self, now: float) -> list[float]:
+        """Return the fields aggregated over the buckets inside the window."""
+        oldest = int(now // self._length) - len(self._ids) + 1
+        totals = [0.0] * _FIELDS
+        for slot, bucket_id in enumerate(self._ids):
+            if bucket_id < oldest:
+                continue
+            offset = slot * _FIELDS
+            for field in range(_FIELDS):
+                value = self._values[offset + field]
+                if field == _OVERSHOOT:
+                    totals[field] = max(totals[field], value)
+                else:
+                    totals[field] += value
+        return totals
+
+
+class KpiTracker:
+    """
+    Control quality KPIs of a thermostat over rolling windows.
+
+    Every cycle adds the integrated absolute and squared error, the change of
+    the output (actuator wear) and the output integrated over time (energy
+    estimate) to the current bucket of each window: O(1) per cycle. After a
+    setpoint change the overshoot beyond the new setpoint is tracked, and the
+    settling time is recorded once the error stays inside a band around the
+    setpoint. Reading a window aggregates its buckets, no raw history is kept.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the windows."""
+        self._rings = {
+            window: _BucketRing(count, length)
+            for window, (count, length) in WINDOWS.items()
+        }
+        self._last_time: float | None = None
+        self._last_output: float | None = None
+        self._setpoint: float | None = None
+        # Setpoint step being followed: direction, start, band, inside since
+        self._step_sign = 0
+        self._step_time = 0.0
+        self._band = SETTLE_BAND_MIN
+        self._inside_since: float | None = None
+
+    def reset_time(self) -> None:
+        """Do not integrate over the time since the last sample."""
+        self._last_time = None
+
+    def record(
+        self, now: float, setpoint: float, process_value: float, output: float
+    ) -> None:
+        """Add a controller cycle."""
+        if self._setpoint is not None and setpoint != self._setpoint:
+            step = setpoint - self._setpoint
+            self._step_sign = 1 if step > 0 else -1
+            self._step_time = now
+            self._band = max(SETTLE_BAND_MIN, SETTLE_BAND_FRACTION * abs(step))
+            self._inside_since = None
+        self._setpoint = setpoint
+        error = setpoint - process_value
+        time_step = 0.0 if self._last_time is None else now - self._last_time
+        variation = (
+            0.0 if self._last_output is None else abs(output - self._last_output)
+        )
+        self._last_time = now
+        self._last_output = output
+        for ring in self._rings.values():
+            ring.add_cycle(now, error, time_step, variation, output)
+        if self._step_sign:
+            self._track_step(now, error)
+
+    def _track_step(self, now: float, error: float) -> None:
+        """Track the overshoot and settling after a setpoint change."""
+        if (overshoot := -self._step_sign * error) > 0:
+            for ring in self._rings.values():
+                ring.maximum(now, _OVERSHOOT, overshoot)
+        if abs(error) > self._band:
+            self._inside_since = None
+            return
+        if self._inside_since is None:
+            self._inside_since = now
+        elif now - self._inside_since >= SETTLE_HOLD:
+            for ring in self._rings.values():
+                ring.add(now, _SETTLE_SUM, self._inside_since - self._step_time)
+                ring.add(now, _SETTLE_COUNT, 1)
+            self._step_sign = 0
+
+    def window(self, window: str, now: float) -> dict[str, float | None]:
+        """Return the KPIs of a rolling window."""
+        totals = self._rings[window].totals(now)
+        return {
+            # Error integrals in degree hours, energy in output hours
+            KPI_IAE: round(totals[_IAE] / 3600, 3),
+            KPI_ISE: round(totals[_ISE] / 3600, 3),
+            KPI_OVERSHOOT: round(totals[_OVERSHOOT], 2),
+            KPI_SETTLING_TIME: (
+                round(totals[_SETTLE_SUM] / totals[_SETTLE_COUNT])
+                if totals[_SETTLE_COUNT]
+                else None
+            ),
+            KPI_OUTPUT_VARIATION: round(totals[_VARIATION], 2),
+            KPI_ENERGY: round(totals[_ENERGY] / 3600, 2),
+        }
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the KPIs of all windows."""
+        return {window: self.window(window, now) for window in self._rings}
+
+
+def async_get_kpi_tracker(hass: HomeAssistant, unique_id: str) -> KpiTracker:
+    """Return the KPI tracker of a thermostat, shared with its sensors."""
+    trackers = hass.data.setdefault(DATA_KPI, {})
+    if (tracker := trackers.get(unique_id)) is None:
+        tracker = trackers[unique_id] = KpiTracker()
+    return tracker
+
+
+@callback
+def async_load_kpi_sensors(hass: HomeAssistant, unique_id: str, name: str) -> None:
+    """Set up the KPI sensors of a YAML thermostat, once per unique id."""
+    loaded = hass.data.setdefault(DATA_KPI_SENSORS, set())
+    if unique_id in loaded:
+        # Rebuilt by a reload, the sensors read the same tracker
+        return
+    loaded.add(unique_id)
+    hass.async_create_task(
+        async_load_platform(
+            hass,
+            Platform.SENSOR,
+            DOMAIN,
+            {CONF_UNIQUE_ID: unique_id, CONF_NAME: name},
+            {},
+        )
+    )
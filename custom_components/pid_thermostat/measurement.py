@@ -0,0 +1,59 @@
+"""Timestamped process value tracking for the PID thermostat."""
+
+from __future__ import annotations
+
+
+class Measurement:
+    """
+    Last two samples of the process value with their sensor timestamps.
+
+    The samples are taken at the `last_updated` time of the sensor state, not
+    at the time the controller computes. That gives a slope in real time units
+    for the derivative term, and an estimate of the value at the compute
+    instant. The trajectory is extrapolated for at most one sample interval,
+    after that the last value is held and the slope is zero.
+    """
+
+    __slots__ = ("t0", "t1", "v0", "v1")
+
+    def __init__(self) -> None:
+        """Initialize without samples."""
+        self.t0: float | None = None
+        self.v0: float | None = None
+        self.t1: float | None = None
+        self.v1: float | None = None
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a sample, timestamp in seconds."""
+        if self.t1 is not None and timestamp <= self.t1:
+            # Out of order or duplicate, only keep the newest value
+            self.v1 = value
+            return
+        self.t0, self.v0 = self.t1, self.v1
+        self.t1, self.v1 = timestamp, value
+
+    def _interval(self) -> float | None:
+        """Return the time between the last two samples."""
+        if self.t0 is None or self.t1 is None:
+            return None
+        return self.t1 - self.t0
+
+    def slope_at(self, timestamp: float) -> float:
+        """Return the rate of change per second at a time."""
+        if (interval := self._interval()) is None or timestamp - self.t1 > interval:
+            return 0.0
+        return (self.v1 - self.v0) / interval
+
+    def value_at(self, timestamp: float) -> float | None:
+        """Return the value at a time, interpolated between samples."""
+        if self.t1 is None:
+            return None
+        if (interval := self._interval()) is None:
+            return self.v1
+        if timestamp <= self.t0:
+            return self.v0
+        if timestamp - self.t1 > interval:
+            # Stale, like the slope: hold the last value
+            return self.v1
+        # Linear inside the last interval, extrapolated for one interval after it
+        return self.v0 + (self.v1 - self.v0) * (timestamp - self.t0) / interval
@@ -0,0 +1,218 @@
+"""Integration-wide aggregate metrics for the PID thermostat."""
+
+from __future__ import annotations
+
+import time
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+DATA_METRICS: HassKey[FleetMetrics] = HassKey(f"{DOMAIN}_metrics")
+
+METRICS_URL = f"/api/{DOMAIN}/metrics"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+RATE_WINDOW = 60.0
+LATENESS_SMOOTHING = 0.2
+WORST_OFFENDERS = 5
+# Worst offenders that did not start a cycle for this long are dropped
+WORST_WINDOW = 900.0
+
+STATUS_ACTIVE = "active"
+STATUS_IDLE = "idle"
+STATUS_OFF = "off"
+STATUSES = (STATUS_ACTIVE, STATUS_IDLE, STATUS_OFF)
+
+
+class FleetMetrics:
+    """
+    Aggregate counters of all PID thermostats.
+
+    The counters are updated in O(1) from the cycle and output paths, so a
+    scrape never has to walk all entities. The worst offenders are kept in a
+    small table of smoothed cycle lateness that is updated while cycling.
+    Entries of thermostats that stopped cycling expire after a window, and
+    those of removed thermostats are dropped right away; a thermostat that
+    recovered is replaced by a later one on its next cycle.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.computes = 0
+        self.set_value_calls = 0
+        self.suppressed_writes = 0
+        self.failed_writes = 0
+        self.lateness_sum = 0.0
+        self.lateness_count = 0
+        self.status_counts = dict.fromkeys(STATUSES, 0)
+        self._status: dict[str, str] = {}
+        self._lateness: dict[str, float] = {}
+        self.worst: dict[str, float] = {}
+        # Time of the last cycle of the worst offenders
+        self._worst_seen: dict[str, float] = {}
+        self._window_start = time.monotonic()
+        self._window_computes = 0
+        self.computes_per_second = 0.0
+
+    def _roll_window(self, now: float) -> None:
+        """Update the compute rate once per rate window."""
+        if (elapsed := now - self._window_start) >= RATE_WINDOW:
+            self.computes_per_second = (self.computes - self._window_computes) / elapsed
+            self._window_start = now
+            self._window_computes = self.computes
+
+    def record_compute(self) -> None:
+        """Count a PID computation."""
+        self.computes += 1
+        self._roll_window(time.monotonic())
+
+    def record_lateness(self, entity_id: str, lateness: float) -> None:
+        """Count how late a cycle started, in seconds."""
+        self.lateness_sum += lateness
+        self.lateness_count += 1
+        smoothed = self._lateness.get(entity_id, lateness)
+        smoothed += LATENESS_SMOOTHING * (lateness - smoothed)
+        self._lateness[entity_id] = smoothed
+        now = time.monotonic()
+        self._expire_worst(now)
+        if entity_id not in self.worst and len(self.worst) >= WORST_OFFENDERS:
+            best = min(self.worst, key=self.worst.__getitem__)
+            if smoothed <= self.worst[best]:
+                return
+            self._drop_worst(best)
+        self.worst[entity_id] = smoothed
+        self._worst_seen[entity_id] = now
+
+    def _expire_worst(self, now: float) -> None:
+        """Drop the worst offenders that stopped cycling."""
+        for entity_id in [
+            entity_id
+            for entity_id, seen in self._worst_seen.items()
+            if now - seen > WORST_WINDOW
+        ]:
+            self._drop_worst(entity_id)
+
+    def _drop_worst(self, entity_id: str) -> None:
+        """Drop a thermostat from the worst offenders."""
+        self.worst.pop(entity_id, None)
+        self._worst_seen.pop(entity_id, None)
+
+    def record_status(self, entity_id: str, status: str) -> None:
+        """Track the active, idle or off status of a thermostat."""
+        if (old := self._status.get(entity_id)) == status:
+            return
+        if old is not None:
+            self.status_counts[old] -= 1
+        self.status_counts[status] += 1
+        self._status[entity_id] = status
+
+    def remove(self, entity_id: str) -> None:
+        """Forget a thermostat that is removed."""
+        if (old := self._status.pop(entity_id, None)) is not None:
+            self.status_counts[old] -= 1
+        self._lateness.pop(entity_id, None)
+        self._drop_worst(entity_id)
+
+    def prometheus(self) -> str:
+        """Return the metrics in Prometheus text format."""
+        now = time.monotonic()
+        self._roll_window(now)
+        self._expire_worst(now)
+        mean = self.lateness_sum / self.lateness_count if self.lateness_count else 0
+        lines = [
+            *_metric("computes_total", "counter", "PID computations.", self.computes),
+            *_metric(
+                "computes_per_second",
+                "gauge",
+                f"PID computations per second over the last {RATE_WINDOW:.0f}s.",
+                self.computes_per_second,
+            ),
+            *_metric(
+                "set_value_calls_total",
+                "counter",
+                "Values written to output entities.",
+                self.set_value_calls,
+            ),
+            *_metric(
+                "suppressed_writes_total",
+                "counter",
+                "Output writes suppressed because the value did not change.",
+                self.suppressed_writes,
+            ),
+            *_metric(
+                "failed_writes_total",
+                "counter",
+                "Output writes that failed.",
+                self.failed_writes,
+            ),
+            f"# HELP {DOMAIN}_thermostats Thermostats per status.",
+            f"# TYPE {DOMAIN}_thermostats gauge",
+            *(
+                f'{DOMAIN}_thermostats{{status="{status}"}} {count}'
+                for status, count in self.status_counts.items()
+            ),
+            f"# HELP {DOMAIN}_cycle_lateness_seconds Delay of cycle starts.",
+            f"# TYPE {DOMAIN}_cycle_lateness_seconds summary",
+            f"{DOMAIN}_cycle_lateness_seconds_sum {self.lateness_sum}",
+            f"{DOMAIN}_cycle_lateness_seconds_count {self.lateness_count}",
+            *_metric(
+                "cycle_lateness_mean_seconds",
+                "gauge",
+                "Mean delay of cycle starts.",
+                mean,
+            ),
+            f"# HELP {DOMAIN}_worst_cycle_lateness_seconds "
+            "Smoothed cycle delay of the worst offenders.",
+            f"# TYPE {DOMAIN}_worst_cycle_lateness_seconds gauge",
+            *(
+                f'{DOMAIN}_worst_cycle_lateness_seconds{{entity_id="{entity_id}"}} '
+                f"{lateness}"
+                for entity_id, lateness in sorted(
+                    self.worst.items(), key=lambda item: item[1], reverse=True
+                )
+            ),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _metric(name: str, kind: str, description: str, value: float) -> list[str]:
+    """Return the lines of a single Prometheus metric."""
+    return [
+        f"# HELP {DOMAIN}_{name} {description}",
+        f"# TYPE {DOMAIN}_{name} {kind}",
+        f"{DOMAIN}_{name} {value}",
+    ]
+
+
+def async_get_metrics(hass: HomeAssistant) -> FleetMetrics:
+    """Return the integration-wide metrics."""
+    if (metrics := hass.data.get(DATA_METRICS)) is None:
+        metrics = hass.data[DATA_METRICS] = FleetMetrics()
+    return metrics
+
+
+class PidThermostatMetricsView(HomeAssistantView):
+    """Serve the aggregate metrics in Prometheus text format."""
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+
+    def __init__(self, metrics: FleetMetrics) -> None:
+        """Initialize the view."""
+        self.metrics = metrics
+
+    async def get(self, request: web.Request) -> web.Response:  # noqa: ARG002
+        """Return the metrics."""
+        return web.Response(
+            body=self.metrics.prometheus().encode(),
+            status=HTTPStatus.OK,
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+        )
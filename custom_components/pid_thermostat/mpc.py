@@ -0,0 +1,163 @@
+"""Explicit model predictive control of the PID thermostat."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from itertools import product
+from typing import Any
+
+# Output moves over the horizon, spread evenly over it (move blocking)
+MPC_MOVES = 4
+# Half width of the error axis of the table, larger errors are clamped
+MPC_ERROR_RANGE = 5.0
+SOLVER_ITERATIONS = 500
+SOLVER_TOLERANCE = 1e-9
+_TABLE_AXES = 3
+
+
+class ControlLaw:
+    """
+    Explicit MPC law, tabulated over a grid of controller states.
+
+    The state is the control error, the change of the temperature over the
+    last cycle and the previous output. The law is piecewise affine in the
+    state, affine where no output limit is active, so interpolating between
+    the grid points is exact within those regions and only rounds the kinks
+    where a limit becomes active.
+    """
+
+    def __init__(
+        self, axes: tuple[tuple[float, float, int], ...], values: array
+    ) -> None:
+        """Initialize the law from its axes (start, step, count) and values."""
+        self._axes = axes
+        self._values = values
+        # Index strides of the axes in the flat table
+        self._strides = (axes[1][2] * axes[2][2], axes[2][2], 1)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory of the table."""
+        return self._values.itemsize * len(self._values)
+
+    def output(self, error: float, rate: float, previous: float) -> float:
+        """Return the output of a state, interpolated between the grid points."""
+        base = 0
+        fractions = []
+        for (start, step, count), stride, value in zip(
+            self._axes, self._strides, (error, rate, previous), strict=True
+        ):
+            position = min(max((value - start) / step, 0.0), count - 1.0)
+            index = min(int(position), count - 2)
+            base += index * stride
+            fractions.append((stride, position - index))
+        (s0, f0), (s1, f1), (s2, f2) = fractions
+        values = self._values
+        result = 0.0
+        for d0, w0 in ((0, 1.0 - f0), (s0, f0)):
+            for d1, w1 in ((0, 1.0 - f1), (s1, f1)):
+                corner = base + d0 + d1
+                result += (
+                    w0 * w1 * ((1.0 - f2) * values[corner] + f2 * values[corner + s2])
+                )
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the size of the table."""
+        return {"grid": [count for _, _, count in self._axes], "bytes": self.nbytes}
+
+
+def design_control_law(  # noqa: PLR0913
+    gain: float,
+    time_constant: float,
+    cycle_time: float,
+    low: float,
+    high: float,
+    *,
+    horizon: float,
+    move_suppression: float,
+    memory: int,
+) -> ControlLaw:
+    """
+    Precompute the MPC law of a first-order model within a memory budget.
+
+    The model is the dead time free part of the Smith predictor model, in
+    velocity form, so the controller has integral action without an estimate
+    of the heat loss. Every cycle the controller minimizes the mean squared
+    predicted error over the horizon plus the weighted squared output moves,
+    with the outputs within their limits. This box constrained quadratic
+    program is solved here for every grid point by coordinate descent; the
+    thermostat only looks the solution up. This is slow, run it in the
+    executor.
+    """
+    pole = math.exp(-cycle_time / time_constant) if time_constant > 0 else 0.0
+    input_gain = gain * (1 - pole)
+    steps = max(1, round(horizon / cycle_time))
+    moves = min(MPC_MOVES, steps)
+    move_steps = [move * steps // moves for move in range(moves)]
+
+    # Sums of the powers of the pole, for the step responses of the model
+    powers = [0.0]
+    for i in range(steps):
+        powers.append(powers[-1] + pole**i)
+    # Predicted error: error - rate * free[j] - sum(forced[j][l] * move[l])
+    free = [pole * powers[j + 1] for j in range(steps)]
+    forced = [
+        [
+            input_gain * powers[j + 1 - start] if j >= start else 0.0
+            for start in move_steps
+        ]
+        for j in range(steps)
+    ]
+    # Effect of the outputs, each move is the difference with the output before
+    effect = [
+        [row[m] - (row[m + 1] if m + 1 < moves else 0.0) for m in range(moves)]
+        for row in forced
+    ]
+    weight = move_suppression / (high - low) ** 2
+    hessian = [
+        [
+            sum(row[m] * row[n] for row in effect) / steps
+            + weight * (2 if m == n else -1 if abs(m - n) == 1 else 0)
+            - (weight if m == n == moves - 1 else 0)
+            for n in range(moves)
+        ]
+        for m in range(moves)
+    ]
+    # Linear term of the cost per state variable: error, rate, previous output
+    linear = [
+        (
+            -sum(row[m] for row in effect) / steps,
+            sum(row[m] * free[j] for j, row in enumerate(effect)) / steps,
+            -sum(row[m] * forced[j][0] for j, row in enumerate(effect)) / steps
+            - (weight if m == 0 else 0.0),
+        )
+        for m in range(moves)
+    ]
+
+    count = max(2, int((memory // 8) ** (1 / _TABLE_AXES) + 1e-9))
+    rate_range = max(abs(input_gain) * (high - low), 1e-6)
+    axes = (
+        (-MPC_ERROR_RANGE, 2 * MPC_ERROR_RANGE / (count - 1), count),
+        (-rate_range, 2 * rate_range / (count - 1), count),
+        (low, (high - low) / (count - 1), count),
+    )
+    values = array("d", bytes(8 * count**_TABLE_AXES))
+    outputs = [low] * moves
+    for index, point in enumerate(
+        product(*[[start + i * step for i in range(n)] for start, step, n in axes])
+    ):
+        # The solution of the previous point is a close starting point
+        q = [sum(p * x for p, x in zip(row, point, strict=True)) for row in linear]
+        for _ in range(SOLVER_ITERATIONS):
+            change = 0.0
+            for m, row in enumerate(hessian):
+                gradient = q[m] + sum(h * v for h, v in zip(row, outputs, strict=True))
+                value = min(max(outputs[m] - gradient / row[m], low), high)
+                change = max(change, abs(value - outputs[m]))
+                outputs[m] = value
+            if change < SOLVER_TOLERANCE * (high - low):
+                break
+        values[index] = outputs[0]
+    return ControlLaw(axes, values)
@@ -0,0 +1,342 @@
+"""Output writers for the PID thermostat."""
+
+from __future__ import annotations
+
+import logging
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.components.input_number import DOMAIN as INPUT_NUMBER_DOMAIN
+from homeassistant.components.number import ATTR_VALUE, SERVICE_SET_VALUE
+from homeassistant.components.number import DOMAIN as NUMBER_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import split_entity_id
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_component import DATA_INSTANCES
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant, State
+    from homeassistant.helpers.entity import Entity
+
+    from .pwm import PwmOutput
+
+_LOGGER = logging.getLogger(__name__)
+
+DIRECT_OUTPUT_DOMAINS = (NUMBER_DOMAIN, INPUT_NUMBER_DOMAIN)
+
+
+class WriteResult(StrEnum):
+    """Result of an output write."""
+
+    WRITTEN = "written"
+    SUPPRESSED = "suppressed"
+    FAILED = "failed"
+
+
+def _state_value(state: State) -> float | None:
+    """Return the numeric value of an output state."""
+    try:
+        return float(state.state)
+    except ValueError:
+        return None
+
+
+def _check_range(state: State, value: float) -> None:
+    """Raise if a value is outside the range of an output, as its service does."""
+    minimum = state.attributes.get("min")
+    maximum = state.attributes.get("max")
+    if (minimum is not None and value < minimum) or (
+        maximum is not None and value > maximum
+    ):
+        msg = f"Invalid value {value} for {state.entity_id} ({minimum} - {maximum})"
+        raise vol.Invalid(msg)
+
+
+class OutputWriter:
+    """
+    Write values to a number or input_number output entity.
+
+    By default every write is a `set_value` service call. When `direct` is
+    set, the output entity object is looked up once through its entity
+    component and its value is set in-process, skipping the service registry,
+    schema validation and the call event. The value is still checked against
+    the range of the entity. Anything that cannot be written directly falls
+    back to the service call.
+
+    Failures are not logged as errors here; the reason of the last failure is
+    kept for the health tracking of the thermostat.
+    """
+
+    def __init__(self, hass: HomeAssistant, entity_id: str, *, direct: bool) -> None:
+        """Initialize the output writer."""
+        self.hass = hass
+        self.entity_id = entity_id
+        self.domain = split_entity_id(entity_id)[0]
+        self.direct = direct and self.domain in DIRECT_OUTPUT_DOMAINS
+        self._component: Any = None
+        self._entity: Entity | None = None
+        self.last_value: float | None = None
+        self.last_error: str | None = None
+
+    def unchanged(self, state: State, value: float) -> bool:
+        """Return True if the value was written and the entity still has it."""
+        return value == self.last_value and _state_value(state) == value
+
+    def _resolve_entity(self) -> Entity | None:
+        """Return the output entity object, resolving it on first use."""
+        if self._component is None:
+            self._component = self.hass.data.get(DATA_INSTANCES, {}).get(self.domain)
+            if self._component is None:
+                return None
+        # Identity check is a single dict lookup; it catches entities that
+        # were re-created by a reload of the output integration.
+        entity = self._component.get_entity(self.entity_id)
+        if entity is not self._entity:
+            _LOGGER.debug("Resolved direct output entity %s", self.entity_id)
+            self._entity = entity
+        return entity
+
+    async def _async_set_direct(self, state: State, value: float) -> WriteResult | None:
+        """Set the value on the entity object, return None if not possible."""
+        if (entity := self._resolve_entity()) is None:
+            return None
+        try:
+            # The range the service schema validates on the service path
+            _check_range(state, value)
+            if self.domain == NUMBER_DOMAIN:
+                await entity.async_set_native_value(
+                    entity.convert_to_native_value(value)
+                )
+            else:
+                await entity.async_set_value(value)
+        except (HomeAssistantError, vol.Invalid) as ex:
+            _LOGGER.debug("Could not write %s to %s: %s", value, self.entity_id, ex)
+            self.last_error = str(ex)
+            self.last_value = None
+            return WriteResult.FAILED
+        except (AttributeError, TypeError, ValueError) as ex:
+            _LOGGER.debug(
+                "Direct write to %s failed, using service call: %s",
+                self.entity_id,
+                ex,
+            )
+            self._component = None
+            self._entity = None
+            return None
+        self.last_value = value
+        return WriteResult.WRITTEN
+
+    async def async_set_value(self, value: float) -> WriteResult:
+        """Write a value to the output entity."""
+        state = self.hass.states.get(self.entity_id)
+        if not state:
+            self.last_error = "output entity not found"
+            return WriteResult.FAILED
+        if self.unchanged(state, value):
+            return WriteResult.SUPPRESSED
+        if (
+            self.direct
+            and (result := await self._async_set_direct(state, value)) is not None
+        ):
+            return result
+        # Make output as type-agnostic as possible by picking the
+        # domain and calling set_value service
+        try:
+            await self.hass.services.async_call(
+                state.domain,
+                SERVICE_SET_VALUE,
+                {ATTR_ENTITY_ID: self.entity_id, ATTR_VALUE: value},
+                blocking=False,
+            )
+        except (HomeAssistantError, vol.Invalid) as ex:
+            _LOGGER.debug("Could not write %s to %s: %s", value, self.entity_id, ex)
+            self.last_error = str(ex)
+            self.last_value = None
+            return WriteResult.FAILED
+        self.last_value = value
+        return WriteResult.WRITTEN
+
+
+class OutputMapping:
+    """Map the controller output to the value of one output of a zone."""
+
+    __slots__ = ("maximum", "minimum", "offset", "scale", "writer")
+
+    def __init__(
+        self,
+        writer: OutputWriter,
+        scale: float,
+        offset: float,
+        minimum: float | None,
+        maximum: float | None,
+    ) -> None:
+        """Initialize the mapping."""
+        self.writer = writer
+        self.scale = scale
+        self.offset = offset
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def value(self, output: float, state: State) -> float:
+        """Return the value of the output, limited and quantized to its step."""
+        value = self.offset + self.scale * output
+        minimum = state.attributes.get("min") if self.minimum is None else self.minimum
+        maximum = state.attributes.get("max") if self.maximum is None else self.maximum
+        if minimum is not None:
+            value = max(value, minimum)
+        if maximum is not None:
+            value = min(value, maximum)
+        if step := state.attributes.get("step"):
+            value = round(value / step) * step
+        return value
+
+
+class MultiOutputWriter:
+    """
+    Write one controller output to all outputs of a zone.
+
+    Every output gets its own scale, offset and limits, and is quantized to
+    its own step. Outputs that already have their value are skipped. The
+    others are written in one pass: direct outputs in-process, and the rest
+    with one `set_value` service call per domain and value.
+    """
+
+    def __init__(self, hass: HomeAssistant, outputs: list[OutputMapping]) -> None:
+        """Initialize the output writer."""
+        self.hass = hass
+        self.outputs = outputs
+        self.last_output: float | None = None
+        self.last_error: str | None = None
+
+    def output(self, state: State) -> float:
+        """Return the controller output, from the state of the first output."""
+        if self.last_output is not None:
+            return self.last_output
+        # Not written since the start, map the first output back
+        first = self.outputs[0]
+        if not first.scale:
+            msg = f"Output {first.writer.entity_id} does not follow the controller"
+            raise ValueError(msg)
+        return (float(state.state) - first.offset) / first.scale
+
+    async def async_set_value(self, value: float) -> WriteResult:
+        """Write a controller output to all outputs."""
+        self.last_output = value
+        results: list[WriteResult] = []
+        errors: list[str] = []
+        calls: dict[tuple[str, float], list[OutputWriter]] = {}
+        for output in self.outputs:
+            writer = output.writer
+            if not (state := self.hass.states.get(writer.entity_id)):
+                errors.append(f"output entity {writer.entity_id} not found")
+                continue
+            output_value = output.value(value, state)
+            if writer.unchanged(state, output_value):
+                results.append(WriteResult.SUPPRESSED)
+            elif writer.direct:
+                if (result := await writer.async_set_value(output_value)) is (
+                    WriteResult.FAILED
+                ):
+                    errors.append(writer.last_error)
+                results.append(result)
+            else:
+                calls.setdefault((state.domain, output_value), []).append(writer)
+        for (domain, output_value), writers in calls.items():
+            try:
+                await self.hass.services.async_call(
+                    domain,
+                    SERVICE_SET_VALUE,
+                    {
+                        ATTR_ENTITY_ID: [writer.entity_id for writer in writers],
+                        ATTR_VALUE: output_value,
+                    },
+                    blocking=False,
+                )
+            except (HomeAssistantError, vol.Invalid) as ex:
+                _LOGGER.debug("Could not write %s to %s: %s", output_value, domain, ex)
+                errors.append(str(ex))
+                output_value = None  # noqa: PLW2901
+            else:
+                results.append(WriteResult.WRITTEN)
+            for writer in writers:
+                writer.last_value = output_value
+        self.last_error = errors[0] if errors else None
+        if errors:
+            return WriteResult.FAILED
+        if WriteResult.WRITTEN in results:
+            return WriteResult.WRITTEN
+        return WriteResult.SUPPRESSED
+
+
+class SplitRangeWriter:
+    """
+    Write a signed controller output to a heating and a cooling output.
+
+    Outputs above the neutral deadband drive the heater, outputs below minus
+    the deadband drive the cooler, by their distance to the band, on top of
+    the minimum of the output. Within the band both outputs are at their
+    minimum. The output that goes idle is written first, so the heater and
+    the cooler never run together.
+    """
+
+    def __init__(
+        self,
+        heater: OutputWriter | MultiOutputWriter | PwmOutput,
+        cooler: OutputWriter | PwmOutput,
+        deadband: float,
+    ) -> None:
+        """Initialize the output writer."""
+        self.heater = heater
+        self.cooler = cooler
+        self.deadband = deadband
+        self.heat_minimum = 0.0
+        self.cool_minimum = 0.0
+        self.last_error: str | None = None
+
+    def set_ranges(
+        self, heat: tuple[float, float], cool: tuple[float, float]
+    ) -> tuple[float, float]:
+        """Set the ranges of the outputs, return the range of the signed output."""
+        self.heat_minimum = heat[0]
+        self.cool_minimum = cool[0]
+        return (
+            -(cool[1] - cool[0] + self.deadband),
+            heat[1] - heat[0] + self.deadband,
+        )
+
+    def split(self, value: float) -> tuple[float, float]:
+        """Return the heater and the cooler value of a signed output."""
+        return (
+            self.heat_minimum + max(0.0, value - self.deadband),
+            self.cool_minimum + max(0.0, -value - self.deadband),
+        )
+
+    def output(self, heat: float, cool: float) -> float:
+        """Return the signed output that a heater and a cooler value split from."""
+        if (heat := heat - self.heat_minimum) > 0:
+            return heat + self.deadband
+        if (cool := cool - self.cool_minimum) > 0:
+            return -(cool + self.deadband)
+        return 0.0
+
+    async def async_set_value(self, value: float) -> WriteResult:
+        """Write a signed controller output to the heater and the cooler."""
+        heat, cool = self.split(value)
+        writes = [(self.cooler, cool), (self.heater, heat)]
+        if value < 0:
+            writes.reverse()
+        results = []
+        errors = []
+        for writer, output_value in writes:
+            if (result := await writer.async_set_value(output_value)) is (
+                WriteResult.FAILED
+            ):
+                errors.append(writer.last_error)
+            results.append(result)
+        self.last_error = errors[0] if errors else None
+        if errors:
+            return WriteResult.FAILED
+        if WriteResult.WRITTEN in results:
+            return WriteResult.WRITTEN
+        return WriteResult.SUPPRESSED
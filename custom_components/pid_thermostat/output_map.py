@@ -0,0 +1,129 @@
+"""Learned steady-state output of the PID thermostat."""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+# Cell size of the map along the setpoint and the outdoor temperature
+SETPOINT_STEP = 1.0
+OUTDOOR_STEP = 5.0
+# Largest error and shortest time the loop must hold to count as settled
+SETTLED_ERROR = 0.2
+SETTLE_TIME = 1800.0
+# Time over which the output is averaged into one sample
+SAMPLE_INTERVAL = 600.0
+# Weight of a cell after which new samples are averaged in exponentially
+MAX_WEIGHT = 20.0
+
+
+class OutputMap:
+    """
+    Steady-state output against setpoint and outdoor temperature.
+
+    Only the cells that were ever learned are kept, as the mean output and
+    the weight of the samples in them. A sample is spread over the four cells
+    around its setpoint and outdoor temperature with bilinear weights, and a
+    lookup interpolates with the same weights, over the cells that are known.
+    The mean of a cell follows the samples exponentially once its weight
+    reaches the maximum, so the map keeps adapting to the seasons.
+
+    The loop is settled once the error stayed small, and the output within
+    its limits, for the settle time. From then on the output is averaged and
+    learned every sample interval, until the loop leaves the settled band.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty map."""
+        self._cells: dict[tuple[int, int], list[float]] = {}
+        self._settled_since: float | None = None
+        self._sample_start: float | None = None
+        self._output_sum = 0.0
+        self._output_count = 0
+
+    def __len__(self) -> int:
+        """Return the number of learned cells."""
+        return len(self._cells)
+
+    @staticmethod
+    def _neighbours(
+        setpoint: float, outdoor: float
+    ) -> list[tuple[tuple[int, int], float]]:
+        """Return the cells around a point with their bilinear weights."""
+        position = setpoint / SETPOINT_STEP
+        row = math.floor(position)
+        setpoint_fraction = position - row
+        position = outdoor / OUTDOOR_STEP
+        column = math.floor(position)
+        outdoor_fraction = position - column
+        return [
+            ((row + dr, column + dc), ws * wo)
+            for dr, ws in ((0, 1.0 - setpoint_fraction), (1, setpoint_fraction))
+            for dc, wo in ((0, 1.0 - outdoor_fraction), (1, outdoor_fraction))
+            if ws * wo > 0
+        ]
+
+    def reset(self) -> None:
+        """Restart the settle detection, after a setpoint change."""
+        self._settled_since = None
+        self._sample_start = None
+
+    def learn(  # noqa: PLR0913
+        self,
+        now: float,
+        setpoint: float,
+        outdoor: float,
+        error: float,
+        output: float,
+        *,
+        saturated: bool,
+    ) -> bool:
+        """Process a cycle of the loop, return True if the map was changed."""
+        if abs(error) > SETTLED_ERROR or saturated:
+            self.reset()
+            return False
+        if self._settled_since is None:
+            self._settled_since = now
+        if now - self._settled_since < SETTLE_TIME:
+            return False
+        if self._sample_start is None:
+            self._sample_start = now
+            self._output_sum = 0.0
+            self._output_count = 0
+        self._output_sum += output
+        self._output_count += 1
+        if now - self._sample_start < SAMPLE_INTERVAL:
+            return False
+        sample = self._output_sum / self._output_count
+        self._sample_start = None
+        for cell, weight in self._neighbours(setpoint, outdoor):
+            mean, total = self._cells.setdefault(cell, [sample, 0.0])
+            total = min(total + weight, MAX_WEIGHT)
+            self._cells[cell] = [mean + weight / total * (sample - mean), total]
+        return True
+
+    def lookup(self, setpoint: float, outdoor: float) -> float | None:
+        """Return the learned output of a point, None if nothing is known near."""
+        total = 0.0
+        value = 0.0
+        for cell, weight in self._neighbours(setpoint, outdoor):
+            if (known := self._cells.get(cell)) is not None:
+                total += weight
+                value += weight * known[0]
+        return value / total if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the map for persistence."""
+        return {
+            "cells": [
+                [row, column, round(mean, 4), round(weight, 3)]
+                for (row, column), (mean, weight) in self._cells.items()
+            ]
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore a persisted map."""
+        self._cells = {
+            (int(row), int(column)): [float(mean), float(weight)]
+            for row, column, mean, weight in data["cells"]
+        }
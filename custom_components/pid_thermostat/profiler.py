@@ -0,0 +1,213 @@
+"""On-demand profiler for the PID thermostat code paths."""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar
+
+from .const import PROFILE_MODE_DETERMINISTIC, PROFILE_MODE_SAMPLING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine, Generator
+    from types import FrameType
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+SAMPLE_INTERVAL = 0.001
+SAMPLE_MAX_DEPTH = 64
+
+
+class IntegrationProfiler:
+    """
+    Profile only the code paths decorated with `profiled`.
+
+    Profiling is process wide (cProfile hooks the interpreter), so a single
+    instance is shared by all thermostats. While inactive the decorated paths
+    only pay for one attribute check.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profiler."""
+        self.active = False
+        self.busy = False
+        self.mode = PROFILE_MODE_DETERMINISTIC
+        self._depth = 0
+        self._profile: cProfile.Profile | None = None
+        self._samples: Counter[tuple[str, ...]] = Counter()
+        self._sampler: threading.Thread | None = None
+        self._thread_id = 0
+        self._stop = threading.Event()
+
+    def start(self, mode: str) -> None:
+        """Start collecting profiling data."""
+        self.busy = True
+        self.mode = mode
+        self._depth = 0
+        self._samples = Counter()
+        self._thread_id = threading.get_ident()
+        self._profile = None
+        if mode == PROFILE_MODE_SAMPLING:
+            self._stop.clear()
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name="pid_thermostat_profiler", daemon=True
+            )
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+        self.active = True
+
+    def stop(self) -> None:
+        """Stop collecting profiling data."""
+        self.active = False
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        if self._profile is not None and self._depth:
+            self._profile.disable()
+        self._depth = 0
+
+    def enter(self) -> None:
+        """Enter a profiled code path."""
+        self._depth += 1
+        if self._depth == 1 and self._profile is not None:
+            self._profile.enable()
+
+    def leave(self) -> None:
+        """Leave a profiled code path."""
+        if not self._depth:
+            # Entered before the profiler was stopped
+            return
+        self._depth -= 1
+        if self._depth == 0 and self._profile is not None:
+            self._profile.disable()
+
+    def _sample_loop(self) -> None:
+        """Sample the event loop thread while it is in a profiled path."""
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            if not self._depth:
+                continue
+            frame = sys._current_frames().get(self._thread_id)  # noqa: SLF001
+            if frame is not None:
+                self._samples[_frame_stack(frame)] += 1
+
+    def write_stats(self, path: str) -> None:
+        """Write the collected data to a file, blocking I/O."""
+        if self._profile is not None:
+            self._profile.dump_stats(path)
+            return
+        # Collapsed stacks, readable by flamegraph tooling
+        with open(path, "w", encoding="utf-8") as file:  # noqa: PTH123
+            for stack, count in self._samples.items():
+                file.write(f"{';'.join(reversed(stack))} {count}\n")
+
+    def hotspots(self, count: int) -> list[dict[str, Any]]:
+        """Return a summary of the top hotspots."""
+        if self._profile is not None:
+            stats = pstats.Stats(self._profile, stream=io.StringIO())
+            rows = sorted(
+                stats.stats.items(),  # type: ignore[attr-defined]
+                key=lambda item: item[1][2],
+                reverse=True,
+            )
+            return [
+                {
+                    "function": _function_name(*func),
+                    "calls": calls,
+                    "total_time": round(total_time, 6),
+                    "cumulative_time": round(cum_time, 6),
+                }
+                for func, (_, calls, total_time, cum_time, _) in rows[:count]
+            ]
+        total = sum(self._samples.values()) or 1
+        own: Counter[str] = Counter()
+        for stack, samples in self._samples.items():
+            own[stack[0]] += samples
+        return [
+            {
+                "function": function,
+                "samples": samples,
+                "percentage": round(samples / total * 100, 1),
+            }
+            for function, samples in own.most_common(count)
+        ]
+
+    def reset(self) -> None:
+        """Release the collected data."""
+        self._profile = None
+        self._samples = Counter()
+        self.busy = False
+
+
+def _function_name(filename: str, line: int, name: str) -> str:
+    """Return a readable function name."""
+    return f"{filename}:{line}({name})"
+
+
+def _frame_stack(frame: FrameType | None) -> tuple[str, ...]:
+    """Return the stack of a frame, innermost first."""
+    stack = []
+    while frame is not None and len(stack) < SAMPLE_MAX_DEPTH:
+        code = frame.f_code
+        stack.append(_function_name(code.co_filename, frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    return tuple(stack)
+
+
+PROFILER = IntegrationProfiler()
+
+
+class _ProfiledSteps:
+    """
+    Await a coroutine, profiling its steps but not its suspensions.
+
+    While the coroutine waits on an await, the event loop runs unrelated
+    work; that time is left out, so it is not attributed to the path.
+    """
+
+    __slots__ = ("_coro",)
+
+    def __init__(self, coro: Coroutine[Any, Any, _R]) -> None:
+        self._coro = coro
+
+    def __await__(self) -> Generator[Any, Any, _R]:
+        coro = self._coro
+        value: Any = None
+        error: BaseException | None = None
+        while True:
+            # A step that runs after the profiler was stopped is not profiled
+            if profiling := PROFILER.active:
+                PROFILER.enter()
+            try:
+                future = coro.send(value) if error is None else coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if profiling:
+                    PROFILER.leave()
+            try:
+                value, error = (yield future), None
+            except BaseException as ex:  # noqa: BLE001
+                # Cancellation and errors of the awaited future go to the coroutine
+                value, error = None, ex
+
+
+def profiled(
+    func: Callable[_P, Coroutine[Any, Any, _R]],
+) -> Callable[_P, Coroutine[Any, Any, _R]]:
+    """Profile the steps of a coroutine function while the profiler is active."""
+
+    @functools.wraps(func)
+    async def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+        if not PROFILER.active:
+            return await func(*args, **kwargs)
+        return await _ProfiledSteps(func(*args, **kwargs))
+
+    return wrapper
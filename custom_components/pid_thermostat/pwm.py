@@ -0,0 +1,221 @@
+"""Time-proportioning output for switch heaters."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.components.input_boolean import DOMAIN as INPUT_BOOLEAN_DOMAIN
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    EVENT_HOMEASSISTANT_STOP,
+    SERVICE_TURN_OFF,
+    SERVICE_TURN_ON,
+    STATE_ON,
+)
+from homeassistant.core import HomeAssistant, callback, split_entity_id
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .output import WriteResult
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from homeassistant.core import Event
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_EDGE_SCHEDULER: HassKey[EdgeScheduler] = HassKey(f"{DOMAIN}_edges")
+
+PWM_OUTPUT_DOMAINS = (SWITCH_DOMAIN, INPUT_BOOLEAN_DOMAIN)
+
+
+def is_pwm_output(entity_id: str) -> bool:
+    """Return True if an output entity is switched with time-proportioning."""
+    return split_entity_id(entity_id)[0] in PWM_OUTPUT_DOMAINS
+
+
+class EdgeScheduler:
+    """
+    Switching edges of all time-proportioning outputs, on one timer.
+
+    The edges are kept in a heap ordered by time, with a single loop timer
+    armed for the earliest one, instead of a timer per heater. An output that
+    recomputes its edges invalidates its pending ones by its generation, so
+    they are skipped when they come due instead of being searched for.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._heap: list[tuple[float, int, PwmOutput, int, bool]] = []
+        self._sequence = itertools.count()
+        self._handle: asyncio.TimerHandle | None = None
+        self._armed_at: float | None = None
+
+    @callback
+    def async_schedule(
+        self, when: float, output: PwmOutput, generation: int, *, turn_on: bool
+    ) -> None:
+        """Schedule an edge of an output, at a time of the event loop clock."""
+        heapq.heappush(
+            self._heap, (when, next(self._sequence), output, generation, turn_on)
+        )
+        self._arm()
+
+    @callback
+    def async_remove(self, output: PwmOutput) -> None:
+        """Drop the pending edges of a removed output."""
+        self._heap = [edge for edge in self._heap if edge[2] is not output]
+        heapq.heapify(self._heap)
+        self._arm()
+
+    @callback
+    def _arm(self) -> None:
+        """Arm the timer for the earliest edge."""
+        if not self._heap:
+            self._cancel()
+            return
+        when = self._heap[0][0]
+        if self._armed_at is not None and self._armed_at <= when:
+            return
+        self._cancel()
+        self._armed_at = when
+        self._handle = self.hass.loop.call_at(when, self._fire)
+
+    @callback
+    def _cancel(self) -> None:
+        """Cancel the timer."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            self._armed_at = None
+
+    @callback
+    def _fire(self) -> None:
+        """Switch the outputs whose edges are due."""
+        due = self._armed_at
+        self._handle = None
+        self._armed_at = None
+        while self._heap and self._heap[0][0] <= due:
+            _, _, output, generation, turn_on = heapq.heappop(self._heap)
+            output.async_edge(generation, turn_on=turn_on)
+        self._arm()
+
+    @callback
+    def async_shutdown(self, _event: Event | None = None) -> None:
+        """Stop switching on shutdown."""
+        self._heap.clear()
+        self._cancel()
+
+
+def async_get_edge_scheduler(hass: HomeAssistant) -> EdgeScheduler:
+    """Return the integration-wide edge scheduler."""
+    if (scheduler := hass.data.get(DATA_EDGE_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_EDGE_SCHEDULER] = EdgeScheduler(hass)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, scheduler.async_shutdown)
+    return scheduler
+
+
+class PwmOutput:
+    """
+    Switch a heater on for a part of every cycle, proportional to the output.
+
+    The output is a duty cycle in percent. Every cycle the switch is turned on
+    at the start and turned off after the on time by the edge scheduler. An
+    on time shorter than the minimum on time is skipped, an off time shorter
+    than the minimum off time keeps the switch on for the whole cycle, to
+    limit relay wear. The switch is only called on real edges, so a heater
+    that stays on or off over cycles is not switched at all.
+
+    Failures are not logged as errors here; the reason of the last failure is
+    kept for the health tracking of the thermostat.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_id: str,
+        period: float,
+        min_on_time: float,
+        min_off_time: float,
+    ) -> None:
+        """Initialize the output."""
+        self.hass = hass
+        self.entity_id = entity_id
+        self._scheduler = async_get_edge_scheduler(hass)
+        self._period = period
+        self._min_on_time = min_on_time
+        self._min_off_time = min_off_time
+        self._generation = 0
+        self.duty: float | None = None
+        self.last_error: str | None = None
+
+    def on_time(self, value: float) -> float:
+        """Return the on time within a cycle of a duty cycle in percent."""
+        on_time = min(max(value, 0.0), 100.0) / 100.0 * self._period
+        if on_time < self._min_on_time:
+            return 0.0
+        if self._period - on_time < self._min_off_time:
+            return self._period
+        return on_time
+
+    async def async_set_value(self, value: float) -> WriteResult:
+        """Start a cycle with a duty cycle in percent."""
+        state = self.hass.states.get(self.entity_id)
+        if not state:
+            self.last_error = "output entity not found"
+            return WriteResult.FAILED
+        self.duty = value
+        # Edges of the previous cycle are no longer valid
+        self._generation += 1
+        on_time = self.on_time(value)
+        result = await self._async_switch(turn_on=on_time > 0)
+        if 0 < on_time < self._period:
+            self._scheduler.async_schedule(
+                self.hass.loop.time() + on_time,
+                self,
+                self._generation,
+                turn_on=False,
+            )
+        return result
+
+    @callback
+    def async_edge(self, generation: int, *, turn_on: bool) -> None:
+        """Switch on an edge from the scheduler, unless it was invalidated."""
+        if generation == self._generation:
+            self.hass.async_create_task(
+                self._async_switch(turn_on=turn_on), eager_start=True
+            )
+
+    @callback
+    def async_remove(self) -> None:
+        """Drop the pending edges when the thermostat is removed."""
+        self._generation += 1
+        self._scheduler.async_remove(self)
+
+    async def _async_switch(self, *, turn_on: bool) -> WriteResult:
+        """Switch the heater, if it is not in that state already."""
+        if (state := self.hass.states.get(self.entity_id)) is None:
+            self.last_error = "output entity not found"
+            return WriteResult.FAILED
+        if (state.state == STATE_ON) == turn_on:
+            return WriteResult.SUPPRESSED
+        try:
+            await self.hass.services.async_call(
+                state.domain,
+                SERVICE_TURN_ON if turn_on else SERVICE_TURN_OFF,
+                {ATTR_ENTITY_ID: self.entity_id},
+                blocking=False,
+            )
+        except (HomeAssistantError, vol.Invalid) as ex:
+            _LOGGER.debug("Could not switch %s: %s", self.entity_id, ex)
+            self.last_error = str(ex)
+            return WriteResult.FAILED
+        return WriteResult.WRITTEN
@@ -0,0 +1,71 @@
+"""On-demand refresh of polled sensors before a PID thermostat cycle."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_REFRESHER: HassKey[SensorRefresher] = HassKey(f"{DOMAIN}_refresher")
+
+HOMEASSISTANT_DOMAIN = "homeassistant"
+SERVICE_UPDATE_ENTITY = "update_entity"
+
+
+class SensorRefresher:
+    """
+    Refresh requests of sensors, shared by all thermostats.
+
+    A sensor has at most one `homeassistant.update_entity` call in flight;
+    thermostats that ask for a sensor that is already being refreshed wait
+    for that call. A thermostat bounds its wait with its own timeout; the call
+    itself runs on, so a slow poll delays no cycle beyond that timeout and
+    its value still arrives with the state change.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the refresher."""
+        self.hass = hass
+        self._pending: dict[str, asyncio.Task[bool]] = {}
+
+    async def async_refresh(self, entity_id: str) -> bool:
+        """Refresh a sensor, return True if it was refreshed."""
+        if (task := self._pending.get(entity_id)) is None:
+            task = self._pending[entity_id] = self.hass.async_create_background_task(
+                self._async_update(entity_id), f"{DOMAIN} refresh of {entity_id}"
+            )
+            task.add_done_callback(lambda _: self._pending.pop(entity_id, None))
+        # A waiter that times out leaves the call running for the others
+        return await asyncio.shield(task)
+
+    async def _async_update(self, entity_id: str) -> bool:
+        """Request an update of a sensor and wait for it."""
+        try:
+            await self.hass.services.async_call(
+                HOMEASSISTANT_DOMAIN,
+                SERVICE_UPDATE_ENTITY,
+                {ATTR_ENTITY_ID: entity_id},
+                blocking=True,
+            )
+        except HomeAssistantError as ex:
+            _LOGGER.debug("Refresh of %s failed: %s", entity_id, ex)
+            return False
+        return True
+
+
+def async_get_refresher(hass: HomeAssistant) -> SensorRefresher:
+    """Return the integration-wide sensor refresher."""
+    if (refresher := hass.data.get(DATA_REFRESHER)) is None:
+        refresher = hass.data[DATA_REFRESHER] = SensorRefresher(hass)
+    return refresher
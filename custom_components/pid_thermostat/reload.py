@@ -0,0 +1,115 @@
+"""Incremental reload of the YAML configured PID thermostats."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.const import CONF_UNIQUE_ID, Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_per_platform
+from homeassistant.helpers.reload import (
+    async_integration_yaml_config,
+    async_reload_integration_platforms,
+)
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, PLATFORMS
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+    from homeassistant.helpers.typing import ConfigType
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_YAML_THERMOSTATS: HassKey[YamlThermostats] = HassKey(f"{DOMAIN}_yaml")
+
+
+class YamlThermostats:
+    """
+    Running YAML configured thermostats with the config they were built from.
+
+    On a reload the new platform configs are matched to the running
+    thermostats by unique id. Only thermostats that were added, removed or
+    changed are built or removed; the others keep running, with their
+    integrator and cycle phase. Thermostats without a unique id cannot be
+    matched and are always rebuilt.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self._entities: dict[str, tuple[ConfigType, Entity]] = {}
+        self._anonymous: list[Entity] = []
+        self._add_entities: AddEntitiesCallback | None = None
+
+    @callback
+    def async_add(
+        self,
+        config: ConfigType,
+        entities: list[Entity],
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        """Track thermostats added by a YAML platform."""
+        self._add_entities = async_add_entities
+        for entity in entities:
+            if (unique_id := config.get(CONF_UNIQUE_ID)) is None:
+                self._anonymous.append(entity)
+            else:
+                self._entities[unique_id] = (config, entity)
+
+    async def async_reload(
+        self, hass: HomeAssistant, factory: Callable[[ConfigType], Entity]
+    ) -> None:
+        """Apply the current YAML configuration."""
+        if (
+            conf := await async_integration_yaml_config(hass, Platform.CLIMATE)
+        ) is None:
+            # Invalid configuration, the error is already logged
+            return
+        if self._add_entities is None:
+            # No platform to add to yet, let the platforms be set up
+            await async_reload_integration_platforms(hass, DOMAIN, PLATFORMS)
+            return
+
+        configs: dict[str, ConfigType] = {}
+        anonymous: list[ConfigType] = []
+        for p_type, p_config in config_per_platform(conf, Platform.CLIMATE):
+            if p_type != DOMAIN:
+                continue
+            if (unique_id := p_config.get(CONF_UNIQUE_ID)) is None:
+                anonymous.append(p_config)
+            else:
+                configs[unique_id] = p_config
+
+        removed = [
+            unique_id
+            for unique_id, (config, _) in self._entities.items()
+            if configs.get(unique_id) != config
+        ]
+        added = [
+            config
+            for unique_id, config in configs.items()
+            if unique_id in removed or unique_id not in self._entities
+        ]
+        await asyncio.gather(
+            *(self._entities.pop(unique_id)[1].async_remove() for unique_id in removed),
+            *(entity.async_remove() for entity in self._anonymous),
+        )
+        self._anonymous = []
+        _LOGGER.debug(
+            "Reload: %d thermostats removed or changed, %d built, %d unchanged",
+            len(removed),
+            len(added) + len(anonymous),
+            len(self._entities),
+        )
+        entities = []
+        for config in (*added, *anonymous):
+            entity = factory(config)
+            self.async_add(config, [entity], self._add_entities)
+            entities.append(entity)
+        if entities:
+            self._add_entities(entities)
@@ -0,0 +1,165 @@
+"""Thermostats of the rooms of a config entry."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.const import CONF_NAME
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    AC_MODE_COOL,
+    AC_MODE_HEAT,
+    CONF_AC_MODE,
+    CONF_DIRECT_OUTPUT,
+    CONF_HEATER,
+    CONF_INTERPOLATE,
+    CONF_PID_KD,
+    CONF_PID_KI,
+    CONF_PID_KP,
+    CONF_ROOMS,
+    CONF_SENSOR,
+    DOMAIN,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import Platform
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+_LOGGER = logging.getLogger(__name__)
+
+ROOM_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required(CONF_HEATER): cv.entity_id,
+        vol.Required(CONF_SENSOR): cv.entity_id,
+        vol.Optional(CONF_AC_MODE): vol.In([AC_MODE_HEAT, AC_MODE_COOL]),
+        vol.Optional(CONF_PID_KP): vol.Coerce(float),
+        vol.Optional(CONF_PID_KI): vol.Coerce(float),
+        vol.Optional(CONF_PID_KD): vol.Coerce(float),
+        vol.Optional(CONF_DIRECT_OUTPUT): cv.boolean,
+        vol.Optional(CONF_INTERPOLATE): cv.boolean,
+    }
+)
+
+ROOMS_SCHEMA = vol.Schema({cv.slug: ROOM_SCHEMA})
+
+
+def thermostat_configs(entry: ConfigEntry) -> dict[str, Mapping[str, Any]]:
+    """Return the configs of the thermostats of a config entry by unique id."""
+    base = {key: value for key, value in entry.options.items() if key != CONF_ROOMS}
+    configs: dict[str, Mapping[str, Any]] = {entry.entry_id: base}
+    # A room overrides the options of the entry it is in
+    for room_id, room in entry.options.get(CONF_ROOMS, {}).items():
+        configs[f"{entry.entry_id}_{room_id}"] = {**base, **room}
+    return configs
+
+
+def thermostat_options(
+    entry: ConfigEntry, unique_id: str, changes: Mapping[str, Any]
+) -> dict[str, Any]:
+    """Return the options of a config entry with those of one thermostat changed."""
+    if unique_id == entry.entry_id:
+        return {**entry.options, **changes}
+    room_id = unique_id.removeprefix(f"{entry.entry_id}_")
+    rooms = dict(entry.options[CONF_ROOMS])
+    rooms[room_id] = {**rooms[room_id], **changes}
+    return {**entry.options, CONF_ROOMS: rooms}
+
+
+class EntryThermostats:
+    """
+    Running thermostats of a config entry with the config they were built from.
+
+    A config entry hosts its own thermostat and one for each room in its
+    rooms table. Every platform adds the entities of all thermostats in one
+    call. When the options change, only the entities of the thermostats that
+    were added, removed or changed are built or removed; the other rooms keep
+    running.
+    """
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        """Initialize the tracker."""
+        self.configs = thermostat_configs(entry)
+        self._platforms: dict[
+            Platform,
+            tuple[
+                AddEntitiesCallback,
+                Callable[[str, Mapping[str, Any]], list[Entity]],
+                dict[str, list[Entity]],
+            ],
+        ] = {}
+
+    @callback
+    def async_setup_platform(
+        self,
+        platform: Platform,
+        async_add_entities: AddEntitiesCallback,
+        factory: Callable[[str, Mapping[str, Any]], list[Entity]],
+    ) -> None:
+        """Add the entities of all thermostats of a platform."""
+        entities = {
+            unique_id: factory(unique_id, config)
+            for unique_id, config in self.configs.items()
+        }
+        self._platforms[platform] = (async_add_entities, factory, entities)
+        async_add_entities([entity for group in entities.values() for entity in group])
+
+    async def async_update(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Apply the current options of the config entry."""
+        configs = thermostat_configs(entry)
+        removed = [unique_id for unique_id in self.configs if unique_id not in configs]
+        changed = [
+            unique_id
+            for unique_id, config in self.configs.items()
+            if unique_id in configs and configs[unique_id] != config
+        ]
+        added = [unique_id for unique_id in configs if unique_id not in self.configs]
+        self.configs = configs
+        _LOGGER.debug(
+            "%s: %d thermostats removed, %d changed, %d added",
+            entry.title,
+            len(removed),
+            len(changed),
+            len(added),
+        )
+
+        registry = er.async_get(hass)
+        removals = []
+        for platform, (_, _, entities) in self._platforms.items():
+            for unique_id in (*changed, *removed):
+                group = (
+                    entities.pop(unique_id)
+                    if unique_id in removed
+                    else entities[unique_id]
+                )
+                for entity in group:
+                    if unique_id in removed and (
+                        entity_id := registry.async_get_entity_id(
+                            platform, DOMAIN, entity.unique_id
+                        )
+                    ):
+                        # Gone for good, removing the registry entry removes it
+                        registry.async_remove(entity_id)
+                    elif entity.hass is not None:
+                        # Disabled entities were never added
+                        removals.append(entity.async_remove())
+        await asyncio.gather(*removals)
+
+        for async_add_entities, factory, entities in self._platforms.values():
+            new_entities = []
+            for unique_id in (*changed, *added):
+                entities[unique_id] = factory(unique_id, configs[unique_id])
+                new_entities.extend(entities[unique_id])
+            if new_entities:
+                async_add_entities(new_entities)
@@ -0,0 +1,267 @@
+"""Weekly setpoint schedules for the PID thermostat."""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Protocol
+
+import homeassistant.util.dt as dt_util
+from homeassistant.const import ATTR_TEMPERATURE, WEEKDAYS
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util.hass_dict import HassKey
+
+from .const import ATTR_TIME, DOMAIN
+from .storage import SECTION_SCHEDULE
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from homeassistant.core import Event
+
+    from .storage import ThermostatStore
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SCHEDULER: HassKey[ScheduleEngine] = HassKey(f"{DOMAIN}_scheduler")
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+class ScheduledThermostat(Protocol):
+    """Thermostat that can follow a schedule."""
+
+    entity_id: str
+
+    def apply_scheduled_setpoint(self, temperature: float) -> None:
+        """Apply a scheduled setpoint without writing the state."""
+
+    def async_write_ha_state(self) -> None:
+        """Write the state."""
+
+
+class WeekSchedule:
+    """
+    Weekly setpoint profile compiled into sorted transition arrays.
+
+    Transitions are stored as minute of the week (Monday 00:00 is 0) with the
+    setpoint that starts at that minute. The last transition of the week stays
+    active until the first transition of the next week.
+    """
+
+    __slots__ = ("minutes", "setpoints")
+
+    def __init__(self, transitions: Iterable[tuple[int, float]]) -> None:
+        """Compile the transitions."""
+        ordered = sorted(dict(transitions).items())
+        self.minutes = array("H", (minute for minute, _ in ordered))
+        self.setpoints = array("f", (setpoint for _, setpoint in ordered))
+
+    @classmethod
+    def from_days(cls, days: Mapping[str, Iterable[Mapping[str, Any]]]) -> WeekSchedule:
+        """Compile a schedule from a mapping of weekday to setpoint changes."""
+        return cls(
+            (
+                WEEKDAYS.index(day) * MINUTES_PER_DAY
+                + change[ATTR_TIME].hour * 60
+                + change[ATTR_TIME].minute,
+                change[ATTR_TEMPERATURE],
+            )
+            for day, changes in days.items()
+            for change in changes
+        )
+
+    @classmethod
+    def from_flat(cls, flat: list[float]) -> WeekSchedule:
+        """Restore a schedule from its stored form."""
+        return cls(zip(map(int, flat[0::2]), flat[1::2], strict=True))
+
+    def as_flat(self) -> list[float]:
+        """Return the compact stored form: minute, setpoint, minute, ..."""
+        return [
+            value
+            for minute, setpoint in zip(self.minutes, self.setpoints, strict=True)
+            for value in (minute, round(setpoint, 2))
+        ]
+
+    def __bool__(self) -> bool:
+        """Return True if the schedule has transitions."""
+        return bool(self.minutes)
+
+    def setpoint_at(self, minute: int) -> float:
+        """Return the setpoint active at a minute of the week."""
+        # Index -1 wraps around to the last transition of the previous week
+        return round(self.setpoints[bisect_right(self.minutes, minute) - 1], 2)
+
+    def previous_transition(self, minute: int) -> tuple[int, float]:
+        """Return minutes since the last transition and its setpoint."""
+        index = bisect_right(self.minutes, minute) - 1
+        if index < 0:
+            # The last transition of the previous week
+            return (
+                minute + MINUTES_PER_WEEK - self.minutes[-1],
+                round(self.setpoints[-1], 2),
+            )
+        return minute - self.minutes[index], round(self.setpoints[index], 2)
+
+    def next_transition(self, minute: int) -> tuple[int, float]:
+        """Return minutes until the next transition and its setpoint."""
+        index = bisect_right(self.minutes, minute)
+        if index == len(self.minutes):
+            return (
+                self.minutes[0] + MINUTES_PER_WEEK - minute,
+                round(self.setpoints[0], 2),
+            )
+        return self.minutes[index] - minute, round(self.setpoints[index], 2)
+
+
+def _minute_of_week(now: datetime) -> int:
+    """Return the minute of the week of a local time."""
+    return now.weekday() * MINUTES_PER_DAY + now.hour * 60 + now.minute
+
+
+class ScheduleEngine:
+    """
+    Run the schedules of all thermostats from a single timer.
+
+    The next transition of every scheduled thermostat is kept in a heap. One
+    timer fires at the earliest transition and applies all due changes in a
+    batch, followed by one state write per changed thermostat.
+    """
+
+    def __init__(self, hass: HomeAssistant, store: ThermostatStore) -> None:
+        """Initialize the schedule engine."""
+        self.hass = hass
+        self._store = store
+        self._schedules: dict[str, WeekSchedule] = {}
+        self._entities: dict[str, ScheduledThermostat] = {}
+        # (utc timestamp, entity_id, generation)
+        self._heap: list[tuple[float, str, int]] = []
+        self._generation: dict[str, int] = {}
+        self._timer_at: float | None = None
+        self._unsub_timer: Any = None
+
+    def get_schedule(self, entity_id: str) -> WeekSchedule | None:
+        """Return the schedule of a thermostat."""
+        return self._schedules.get(entity_id)
+
+    @callback
+    def async_register(
+        self, entity: ScheduledThermostat, last_seen: datetime | None = None
+    ) -> None:
+        """
+        Start following the schedule of a thermostat, if it has one.
+
+        The last transition is applied if the thermostat did not see it: it
+        happened after the last state of the thermostat, or there is none. A
+        setpoint set by hand after the transition is kept.
+        """
+        self._entities[entity.entity_id] = entity
+        # Compiled from the store, which follows renames and removals
+        if flat := self._store.get(entity.entity_id, SECTION_SCHEDULE):
+            self._schedules[entity.entity_id] = WeekSchedule.from_flat(flat)
+        now = dt_util.now()
+        if schedule := self._schedules.get(entity.entity_id):
+            minutes, setpoint = schedule.previous_transition(_minute_of_week(now))
+            when = now.replace(second=0, microsecond=0) - timedelta(minutes=minutes)
+            if last_seen is None or last_seen < when:
+                entity.apply_scheduled_setpoint(setpoint)
+        self._push(entity.entity_id, now)
+        self._reschedule()
+
+    @callback
+    def async_unregister(self, entity_id: str) -> None:
+        """Stop following the schedule of a thermostat."""
+        self._entities.pop(entity_id, None)
+        self._schedules.pop(entity_id, None)
+        # Invalidates the heap entry, it is dropped when it comes up
+        self._generation[entity_id] = self._generation.get(entity_id, 0) + 1
+        self._reschedule()
+
+    @callback
+    def async_set_schedule(
+        self, entity_id: str, schedule: WeekSchedule | None
+    ) -> float | None:
+        """Replace the schedule of a thermostat, return the current setpoint."""
+        now = dt_util.now()
+        if schedule:
+            self._schedules[entity_id] = schedule
+            self._store.async_set(entity_id, SECTION_SCHEDULE, schedule.as_flat())
+        else:
+            self._schedules.pop(entity_id, None)
+            self._store.async_remove(entity_id, SECTION_SCHEDULE)
+        self._generation[entity_id] = self._generation.get(entity_id, 0) + 1
+        self._push(entity_id, now)
+        self._reschedule()
+        return schedule.setpoint_at(_minute_of_week(now)) if schedule else None
+
+    def _push(self, entity_id: str, now: datetime) -> None:
+        """Add the next transition of a thermostat to the heap."""
+        if entity_id not in self._entities or not (
+            schedule := self._schedules.get(entity_id)
+        ):
+            return
+        minutes, _ = schedule.next_transition(_minute_of_week(now))
+        when = now.replace(second=0, microsecond=0) + timedelta(minutes=minutes)
+        heapq.heappush(
+            self._heap,
+            (when.timestamp(), entity_id, self._generation.get(entity_id, 0)),
+        )
+
+    def _is_stale(self, entry: tuple[float, str, int]) -> bool:
+        """Return True if a heap entry was invalidated."""
+        _, entity_id, generation = entry
+        return entity_id not in self._entities or generation != self._generation.get(
+            entity_id, 0
+        )
+
+    def _reschedule(self) -> None:
+        """Point the single timer at the earliest pending transition."""
+        while self._heap and self._is_stale(self._heap[0]):
+            heapq.heappop(self._heap)
+        next_at = self._heap[0][0] if self._heap else None
+        if next_at == self._timer_at:
+            return
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_at = next_at
+        if next_at is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self.hass, self._async_fire, dt_util.utc_from_timestamp(next_at)
+            )
+
+    @callback
+    def _async_fire(self, _now: datetime) -> None:
+        """Apply all due transitions in one batch."""
+        self._unsub_timer = None
+        self._timer_at = None
+        now = dt_util.now()
+        due: list[ScheduledThermostat] = []
+        while self._heap and self._heap[0][0] <= now.timestamp():
+            entry = heapq.heappop(self._heap)
+            if self._is_stale(entry):
+                continue
+            entity = self._entities[entry[1]]
+            entity.apply_scheduled_setpoint(
+                self._schedules[entry[1]].setpoint_at(_minute_of_week(now))
+            )
+            due.append(entity)
+            self._push(entry[1], now)
+        for entity in due:
+            entity.async_write_ha_state()
+        _LOGGER.debug("Applied %d scheduled setpoint changes", len(due))
+        self._reschedule()
+
+    @callback
+    def async_shutdown(self, _event: Event | None = None) -> None:
+        """Cancel the timer."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_at = None
@@ -0,0 +1,152 @@
+"""Control quality KPI sensors of the PID thermostats."""
+
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    CONF_NAME,
+    CONF_UNIQUE_ID,
+    EntityCategory,
+    Platform,
+    UnitOfTime,
+)
+
+from .kpi import (
+    KPI_ENERGY,
+    KPI_IAE,
+    KPI_ISE,
+    KPI_OUTPUT_VARIATION,
+    KPI_OVERSHOOT,
+    KPI_SETTLING_TIME,
+    WINDOWS,
+    KpiTracker,
+    async_get_kpi_tracker,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+    from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+
+SCAN_INTERVAL = timedelta(minutes=1)
+
+KPI_SENSORS = (
+    SensorEntityDescription(
+        key=KPI_IAE,
+        name="integrated absolute error",
+        native_unit_of_measurement="K·h",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key=KPI_ISE,
+        name="integrated squared error",
+        native_unit_of_measurement="K²·h",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key=KPI_OVERSHOOT,
+        name="maximum overshoot",
+        native_unit_of_measurement="K",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key=KPI_SETTLING_TIME,
+        name="settling time",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key=KPI_OUTPUT_VARIATION,
+        name="output variation",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key=KPI_ENERGY,
+        name="output energy",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+)
+
+
+def _kpi_sensors(
+    tracker: KpiTracker, thermostat_name: str, thermostat_unique_id: str
+) -> list[KpiSensor]:
+    """Return the KPI sensors of a thermostat."""
+    return [
+        KpiSensor(tracker, description, window, thermostat_name, thermostat_unique_id)
+        for window in WINDOWS
+        for description in KPI_SENSORS
+    ]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Initialize the KPI sensors of the thermostats of a config entry."""
+    config_entry.runtime_data.async_setup_platform(
+        Platform.SENSOR,
+        async_add_entities,
+        lambda unique_id, config: _kpi_sensors(
+            async_get_kpi_tracker(hass, unique_id), config[CONF_NAME], unique_id
+        ),
+    )
+
+
+# pylint: disable=unused-argument
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: ConfigType,  # noqa: ARG001
+    async_add_entities: AddEntitiesCallback,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> None:
+    """Set up the KPI sensors of a YAML thermostat, discovered by the thermostat."""
+    if discovery_info is None:
+        return
+    async_add_entities(
+        _kpi_sensors(
+            async_get_kpi_tracker(hass, discovery_info[CONF_UNIQUE_ID]),
+            discovery_info[CONF_NAME],
+            discovery_info[CONF_UNIQUE_ID],
+        )
+    )
+
+
+class KpiSensor(SensorEntity):
+    """Control quality KPI of a thermostat over a rolling window."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        tracker: KpiTracker,
+        description: SensorEntityDescription,
+        window: str,
+        thermostat_name: str,
+        thermostat_unique_id: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._tracker = tracker
+        self._window = window
+        self._attr_name = f"{thermostat_name} {description.name} ({window})"
+        self._attr_unique_id = f"{thermostat_unique_id}_{description.key}_{window}"
+
+    async def async_update(self) -> None:
+        """Read the KPI from the tracker."""
+        self._attr_native_value = self._tracker.window(self._window, time.time())[
+            self.entity_description.key
+        ]
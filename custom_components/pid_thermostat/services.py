@@ -0,0 +1,343 @@
+"""Services for the PID thermostat integration."""
+
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+import voluptuous as vol
+from homeassistant.components.climate import (
+    ATTR_HVAC_MODE,
+    ATTR_PRESET_MODE,
+    HVACMode,
+)
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    ATTR_TEMPERATURE,
+    CONF_UNIQUE_ID,
+    SERVICE_RELOAD,
+    WEEKDAYS,
+)
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import (
+    ServiceValidationError,
+    Unauthorized,
+    UnknownUser,
+)
+from homeassistant.helpers.entity_component import DATA_INSTANCES
+from homeassistant.helpers.service import async_register_admin_service
+
+from .autotune import TuningRule
+from .climate import PidThermostat
+from .const import (
+    ATTR_APPLY,
+    ATTR_COMPUTE,
+    ATTR_DURATION,
+    ATTR_END,
+    ATTR_FORMAT,
+    ATTR_HOTSPOTS,
+    ATTR_HYSTERESIS,
+    ATTR_MAX_DEVIATION,
+    ATTR_MODE,
+    ATTR_RULE,
+    ATTR_SCHEDULE,
+    ATTR_START,
+    ATTR_THERMOSTATS,
+    ATTR_TIME,
+    ATTR_TIMEOUT,
+    DEFAULT_AUTOTUNE_HYSTERESIS,
+    DEFAULT_AUTOTUNE_MAX_DEVIATION,
+    DEFAULT_AUTOTUNE_TIMEOUT,
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_PROFILE_HOTSPOTS,
+    DOMAIN,
+    PROFILE_MODE_DETERMINISTIC,
+    PROFILE_MODE_SAMPLING,
+    PROFILE_MODES,
+    SERVICE_AUTOTUNE,
+    SERVICE_BULK_SET,
+    SERVICE_EXPORT_JOURNAL,
+    SERVICE_PROFILE,
+    SERVICE_SET_SCHEDULE,
+)
+from .journal import DATA_JOURNAL, EXPORT_CSV, EXPORT_FORMATS
+from .profiler import PROFILER
+from .reload import DATA_YAML_THERMOSTATS
+from .schedule import DATA_SCHEDULER, WeekSchedule
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Mapping
+    from typing import Any
+
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+
+_THERMOSTAT_SETTINGS = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+            vol.Optional(ATTR_HVAC_MODE): vol.Coerce(HVACMode),
+            vol.Optional(ATTR_PRESET_MODE): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_HVAC_MODE, ATTR_PRESET_MODE),
+)
+
+BULK_SET_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_THERMOSTATS): vol.Schema(
+            {
+                cv.entity_domain(CLIMATE_DOMAIN): vol.Any(
+                    # A plain number is a shorthand for the setpoint
+                    vol.All(vol.Coerce(float), lambda t: {ATTR_TEMPERATURE: t}),
+                    _THERMOSTAT_SETTINGS,
+                )
+            }
+        ),
+        vol.Optional(ATTR_COMPUTE, default=False): cv.boolean,
+    }
+)
+
+SET_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_SCHEDULE, default={}): vol.Schema(
+            {
+                vol.Optional(day): [
+                    vol.Schema(
+                        {
+                            vol.Required(ATTR_TIME): cv.time,
+                            vol.Required(ATTR_TEMPERATURE): vol.Coerce(float),
+                        }
+                    )
+                ]
+                for day in WEEKDAYS
+            }
+        ),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_MODE, default=PROFILE_MODE_DETERMINISTIC): vol.In(
+            PROFILE_MODES
+        ),
+        vol.Optional(ATTR_HOTSPOTS, default=DEFAULT_PROFILE_HOTSPOTS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+AUTOTUNE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_RULE, default=TuningRule.TYREUS_LUYBEN): vol.Coerce(
+            TuningRule
+        ),
+        vol.Optional(ATTR_HYSTERESIS, default=DEFAULT_AUTOTUNE_HYSTERESIS): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(
+            ATTR_MAX_DEVIATION, default=DEFAULT_AUTOTUNE_MAX_DEVIATION
+        ): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+        vol.Optional(ATTR_TIMEOUT, default=DEFAULT_AUTOTUNE_TIMEOUT): vol.All(
+            cv.time_period, cv.positive_timedelta
+        ),
+        vol.Optional(ATTR_APPLY, default=False): cv.boolean,
+    }
+)
+
+EXPORT_JOURNAL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_CSV): vol.In(EXPORT_FORMATS),
+    }
+)
+
+_STATS_EXTENSION = {
+    PROFILE_MODE_DETERMINISTIC: "prof",
+    PROFILE_MODE_SAMPLING: "txt",
+}
+
+
+def _get_thermostat(hass: HomeAssistant, entity_id: str) -> PidThermostat:
+    """Return the PID thermostat entity object of an entity id."""
+    component = hass.data.get(DATA_INSTANCES, {}).get(CLIMATE_DOMAIN)
+    entity = component.get_entity(entity_id) if component else None
+    if not isinstance(entity, PidThermostat):
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="not_a_pid_thermostat",
+            translation_placeholders={"entity_id": entity_id},
+        )
+    return entity
+
+
+def _validate_bulk_settings(entity: PidThermostat, settings: Mapping[str, Any]) -> None:
+    """Raise if the settings are not supported by the thermostat."""
+    hvac_mode = settings.get(ATTR_HVAC_MODE)
+    preset_mode = settings.get(ATTR_PRESET_MODE)
+    if (hvac_mode is not None and hvac_mode not in entity.hvac_modes) or (
+        preset_mode is not None and preset_mode not in (entity.preset_modes or [])
+    ):
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="unsupported_bulk_settings",
+            translation_placeholders={
+                "entity_id": entity.entity_id,
+                "settings": str(dict(settings)),
+            },
+        )
+
+
+async def _async_export_journal(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Export the journal of a thermostat over a time range to a file."""
+    if (journal := hass.data.get(DATA_JOURNAL)) is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN, translation_key="journal_unavailable"
+        )
+    entity_id = call.data[ATTR_ENTITY_ID]
+    path = hass.config.path(
+        f"{DOMAIN}_journal.{entity_id}.{dt_util.utcnow():%Y%m%d%H%M%S}"
+        f".{call.data[ATTR_FORMAT]}"
+    )
+    records = await journal.async_export(
+        entity_id,
+        dt_util.as_utc(call.data[ATTR_START]).timestamp(),
+        dt_util.as_utc(call.data.get(ATTR_END, dt_util.utcnow())).timestamp(),
+        Path(path),
+        call.data[ATTR_FORMAT],
+    )
+    return {"file": path, "records": records}
+
+
+def _async_register_admin_response_service(
+    hass: HomeAssistant,
+    service: str,
+    service_func: Callable[[ServiceCall], Awaitable[ServiceResponse]],
+    schema: vol.Schema,
+) -> None:
+    """Register a service that returns a response and requires admin access."""
+
+    # async_register_admin_service does not pass the response on
+    async def _async_admin_handler(call: ServiceCall) -> ServiceResponse:
+        """Run the service for an admin user."""
+        if call.context.user_id:
+            user = await hass.auth.async_get_user(call.context.user_id)
+            if user is None:
+                raise UnknownUser(context=call.context)
+            if not user.is_admin:
+                raise Unauthorized(context=call.context)
+        return await service_func(call)
+
+    hass.services.async_register(
+        DOMAIN,
+        service,
+        _async_admin_handler,
+        schema=schema,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _async_bulk_set(call: ServiceCall) -> None:
+        """Apply setpoints and modes of many thermostats with one state flush."""
+        targets: list[tuple[PidThermostat, Mapping[str, Any]]] = []
+        # Validate everything first, so a bad entry does not leave the
+        # fleet half updated
+        for entity_id, settings in call.data[ATTR_THERMOSTATS].items():
+            entity = _get_thermostat(hass, entity_id)
+            _validate_bulk_settings(entity, settings)
+            targets.append((entity, settings))
+
+        for entity, settings in targets:
+            await entity.async_apply_bulk(settings, compute=call.data[ATTR_COMPUTE])
+        # Flush all states in one go, without a task per entity
+        for entity, _ in targets:
+            entity.async_write_ha_state()
+
+    async def _async_set_schedule(call: ServiceCall) -> None:
+        """Replace the weekly setpoint schedule of thermostats."""
+        entities = [_get_thermostat(hass, eid) for eid in call.data[ATTR_ENTITY_ID]]
+        schedule = WeekSchedule.from_days(call.data[ATTR_SCHEDULE])
+        scheduler = hass.data[DATA_SCHEDULER]
+        for entity in entities:
+            setpoint = scheduler.async_set_schedule(entity.entity_id, schedule)
+            if setpoint is not None:
+                entity.apply_scheduled_setpoint(setpoint)
+        for entity in entities:
+            entity.async_write_ha_state()
+
+    async def _async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the cycle, sensor and output code paths for a duration."""
+        if PROFILER.busy:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="profiler_busy"
+            )
+        mode = call.data[ATTR_MODE]
+        PROFILER.start(mode)
+        # Released however the call ends, also when it is cancelled
+        try:
+            try:
+                await asyncio.sleep(call.data[ATTR_DURATION])
+            finally:
+                PROFILER.stop()
+            path = hass.config.path(
+                f"{DOMAIN}_profile.{dt_util.utcnow():%Y%m%d%H%M%S}"
+                f".{_STATS_EXTENSION[mode]}"
+            )
+            await hass.async_add_executor_job(PROFILER.write_stats, path)
+            hotspots = PROFILER.hotspots(call.data[ATTR_HOTSPOTS])
+        finally:
+            PROFILER.reset()
+        return {"file": path, "mode": mode, "hotspots": hotspots}
+
+    async def _async_autotune(call: ServiceCall) -> None:
+        """Start a relay autotune of a thermostat."""
+        _get_thermostat(hass, call.data[ATTR_ENTITY_ID]).async_start_autotune(
+            call.data[ATTR_RULE],
+            hysteresis=call.data[ATTR_HYSTERESIS],
+            max_deviation=call.data[ATTR_MAX_DEVIATION],
+            timeout=call.data[ATTR_TIMEOUT].total_seconds(),
+            apply=call.data[ATTR_APPLY],
+        )
+
+    async def _async_reload(call: ServiceCall) -> None:  # noqa: ARG001
+        """Reload the YAML configured thermostats that were changed."""
+        await hass.data[DATA_YAML_THERMOSTATS].async_reload(
+            hass, lambda config: PidThermostat(hass, config, config.get(CONF_UNIQUE_ID))
+        )
+
+    async_register_admin_service(hass, DOMAIN, SERVICE_RELOAD, _async_reload)
+    hass.services.async_register(
+        DOMAIN, SERVICE_BULK_SET, _async_bulk_set, schema=BULK_SET_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_SCHEDULE, _async_set_schedule, schema=SET_SCHEDULE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_AUTOTUNE, _async_autotune, schema=AUTOTUNE_SCHEMA
+    )
+    # Both write files into the configuration directory
+    _async_register_admin_response_service(
+        hass,
+        SERVICE_EXPORT_JOURNAL,
+        partial(_async_export_journal, hass),
+        EXPORT_JOURNAL_SCHEMA,
+    )
+    _async_register_admin_response_service(
+        hass, SERVICE_PROFILE, _async_profile, PROFILE_SCHEMA
+    )
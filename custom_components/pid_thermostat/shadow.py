@@ -0,0 +1,102 @@
+"""Shadow controllers to evaluate candidate gains on live data."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class ShadowController:
+    """
+    PID controller that computes on live data but never drives the output.
+
+    The shadow gets the same process value, setpoint, slope and time step as
+    the live controller every cycle. Its would-be output is compared with the
+    live output in running totals: the control effort (total variation of
+    the output), the mean output and the mean absolute difference with the
+    live output. All state is a handful of floats, so several shadows per
+    thermostat cost a few arithmetic operations per cycle.
+    """
+
+    __slots__ = (
+        "_difference_sum",
+        "_direction",
+        "_i_term",
+        "_last_live",
+        "_live_effort",
+        "_live_sum",
+        "effort",
+        "kd",
+        "ki",
+        "kp",
+        "name",
+        "output",
+        "output_sum",
+        "samples",
+    )
+
+    def __init__(
+        self, name: str, kp: float, ki: float, kd: float, direction: int
+    ) -> None:
+        """Initialize the shadow controller."""
+        self.name = name
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self._direction = direction
+        self._i_term: float | None = None
+        self.output: float | None = None
+        self._last_live: float | None = None
+        self.samples = 0
+        self.effort = 0.0
+        self.output_sum = 0.0
+        self._live_effort = 0.0
+        self._live_sum = 0.0
+        self._difference_sum = 0.0
+
+    def compute(  # noqa: PLR0913
+        self,
+        setpoint: float,
+        process_value: float,
+        slope: float,
+        time_step: float,
+        live_output: float,
+        limits: tuple[float, float],
+    ) -> float:
+        """Compute the would-be output and update the comparison."""
+        low, high = limits
+        error = self._direction * (setpoint - process_value)
+        if self._i_term is None:
+            # Start bumpless from the live output
+            self._i_term = live_output
+        else:
+            self._i_term += self.ki * error * time_step
+        self._i_term = min(max(self._i_term, low), high)
+        output = min(
+            max(
+                self.kp * error + self._i_term - self._direction * self.kd * slope,
+                low,
+            ),
+            high,
+        )
+        if self.output is not None:
+            self.effort += abs(output - self.output)
+            self._live_effort += abs(live_output - self._last_live)
+        self.output = output
+        self._last_live = live_output
+        self.samples += 1
+        self.output_sum += output
+        self._live_sum += live_output
+        self._difference_sum += abs(output - live_output)
+        return output
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the would-be output and the comparison with the live output."""
+        samples = self.samples or 1
+        return {
+            "output": None if self.output is None else round(self.output, 2),
+            "effort": round(self.effort, 2),
+            "live_effort": round(self._live_effort, 2),
+            "mean_output": round(self.output_sum / samples, 2),
+            "live_mean_output": round(self._live_sum / samples, 2),
+            "mean_difference": round(self._difference_sum / samples, 2),
+        }
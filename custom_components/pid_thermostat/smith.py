@@ -0,0 +1,76 @@
+"""Smith predictor dead-time compensation for the PID thermostat."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Any
+
+
+class SmithPredictor:
+    """
+    Smith predictor with a first-order-plus-dead-time (FOPDT) plant model.
+
+    The model gives the temperature effect of the output, with and without
+    the dead time. The controller acts on the measured temperature plus the
+    predicted effect that has not shown up in the measurement yet, so it can
+    be tuned as if the plant had no dead time.
+
+    The model runs once per cycle. Its delay line is a fixed-size ring buffer
+    indexed by cycle, holding the undelayed model output of the last
+    `dead time / cycle time` cycles.
+    """
+
+    def __init__(
+        self,
+        gain: float,
+        time_constant: float,
+        dead_time: float,
+        cycle_time: float,
+        direction: int,
+    ) -> None:
+        """Initialize the model."""
+        self._cycle_time = cycle_time
+        self._pole = math.exp(-cycle_time / time_constant) if time_constant > 0 else 0
+        self._input_gain = direction * gain * (1 - self._pole)
+        self.delay_cycles = max(0, round(dead_time / cycle_time))
+        self._buffer = array("d", bytes(8 * (self.delay_cycles + 1)))
+        self._index = 0
+        self.undelayed = 0.0
+        # Change of the correction per second over the last cycle
+        self.slope = 0.0
+
+    @property
+    def delayed(self) -> float:
+        """Return the model output delayed by the dead time."""
+        # The oldest entry of the ring is `delay_cycles` cycles old
+        return self._buffer[(self._index + 1) % len(self._buffer)]
+
+    def correct(self, measured: float) -> float:
+        """Return the measurement plus the effect still in the dead time."""
+        return measured + self.undelayed - self.delayed
+
+    def update(self, output: float) -> None:
+        """Advance the model one cycle with the applied output."""
+        correction = self.undelayed - self.delayed
+        self.undelayed = self._pole * self.undelayed + self._input_gain * output
+        self._index = (self._index + 1) % len(self._buffer)
+        self._buffer[self._index] = self.undelayed
+        self.slope = (self.undelayed - self.delayed - correction) / self._cycle_time
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the model state for persistence."""
+        return {
+            "buffer": self._buffer.tolist(),
+            "index": self._index,
+            "undelayed": self.undelayed,
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore the model state, unless the delay line has changed size."""
+        buffer = data.get("buffer", [])
+        if len(buffer) != len(self._buffer):
+            return
+        self._buffer = array("d", buffer)
+        self._index = int(data["index"]) % len(self._buffer)
+        self.undelayed = float(data["undelayed"])
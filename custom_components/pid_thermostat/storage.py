@@ -0,0 +1,151 @@
+"""Integration-wide persistent state of the PID thermostats."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.json import json_bytes
+from homeassistant.helpers.storage import Store
+from homeassistant.util.hass_dict import HassKey
+from orjson import Fragment
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import Event
+
+
+DATA_STORE: HassKey[ThermostatStore] = HassKey(f"{DOMAIN}_store")
+
+STORAGE_KEY = f"{DOMAIN}.state"
+STORAGE_VERSION = 1
+STORAGE_MINOR_VERSION = 1
+SAVE_DELAY = 60
+
+SECTION_SCHEDULE = "schedule"
+SECTION_OUTPUT_MAP = "output_map"
+
+
+class ThermostatStore:
+    """
+    Persistent state of all thermostats in a single storage document.
+
+    The document holds one entry per thermostat, with a section per kind of
+    state (schedule, model state, ...). Changes mark the entry dirty and
+    schedule a single delayed write; further changes before the write are
+    coalesced into it. On the write only the dirty entries are encoded again,
+    the others are reused as pre-encoded JSON fragments.
+
+    The entries follow the entity registry: they move along when a thermostat
+    is renamed and are dropped when it is removed. Entries of thermostats
+    that were removed from the configuration while Home Assistant was not
+    running are dropped once it has started.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            STORAGE_VERSION,
+            STORAGE_KEY,
+            minor_version=STORAGE_MINOR_VERSION,
+        )
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._encoded: dict[str, Fragment] = {}
+        self._dirty: set[str] = set()
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Load the stored state."""
+        if (data := await self._store.async_load()) is not None:
+            self._entries = data.get("thermostats", {})
+            self._dirty.update(self._entries)
+        self.hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            self._async_registry_updated,
+            event_filter=self._is_tracked,
+        )
+        if self.hass.state is not CoreState.running:
+            # All thermostats are set up by then
+            self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STARTED, self._async_prune
+            )
+
+    @callback
+    def _is_tracked(self, data: er.EventEntityRegistryUpdatedData) -> bool:
+        """Return True if a registry change concerns a stored thermostat."""
+        if data["action"] == "remove":
+            return data["entity_id"] in self._entries
+        return data["action"] == "update" and data.get("old_entity_id") in self._entries
+
+    @callback
+    def _async_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Move the entry of a renamed thermostat, drop that of a removed one."""
+        entity_id = event.data["entity_id"]
+        if event.data["action"] == "remove":
+            del self._entries[entity_id]
+            self._async_mark_dirty(entity_id)
+            return
+        old_entity_id = event.data["old_entity_id"]
+        self._entries[entity_id] = self._entries.pop(old_entity_id)
+        self._async_mark_dirty(old_entity_id)
+        self._async_mark_dirty(entity_id)
+
+    @callback
+    def _async_prune(self, _event: Event | None = None) -> None:
+        """Drop the entries of thermostats that no longer exist."""
+        registry = er.async_get(self.hass)
+        for entity_id in [
+            entity_id
+            for entity_id in self._entries
+            if registry.async_get(entity_id) is None
+            and self.hass.states.get(entity_id) is None
+        ]:
+            del self._entries[entity_id]
+            self._async_mark_dirty(entity_id)
+
+    def get(self, entity_id: str, section: str) -> Any:
+        """Return a section of the state of a thermostat."""
+        return self._entries.get(entity_id, {}).get(section)
+
+    @callback
+    def async_set(self, entity_id: str, section: str, value: Any) -> None:
+        """Set a section of the state of a thermostat."""
+        self._entries.setdefault(entity_id, {})[section] = value
+        self._async_mark_dirty(entity_id)
+
+    @callback
+    def async_remove(self, entity_id: str, section: str) -> None:
+        """Remove a section of the state of a thermostat."""
+        if (entry := self._entries.get(entity_id)) is None or section not in entry:
+            return
+        del entry[section]
+        if not entry:
+            del self._entries[entity_id]
+        self._async_mark_dirty(entity_id)
+
+    def _async_mark_dirty(self, entity_id: str) -> None:
+        """Mark an entry changed and make sure a write is scheduled."""
+        self._dirty.add(entity_id)
+        if not self._save_pending:
+            # Do not reschedule a pending write, that would postpone it for
+            # as long as changes keep coming in
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the data to store, encoding only the changed entries."""
+        self._save_pending = False
+        for entity_id in self._dirty:
+            if (entry := self._entries.get(entity_id)) is None:
+                self._encoded.pop(entity_id, None)
+            else:
+                self._encoded[entity_id] = Fragment(json_bytes(entry))
+        self._dirty.clear()
+        return {"thermostats": dict(self._encoded)}
@@ -0,0 +1,190 @@
+"""Client of the out-of-process PID compute worker."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.hass_dict import HassKey
+from homeassistant.util.json import json_loads
+
+from .compute_worker import HEADER
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import Event
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_WORKER: HassKey[ComputeWorker] = HassKey(f"{DOMAIN}_worker")
+
+WORKER_SCRIPT = Path(__file__).with_name("compute_worker.py")
+BATCH_WINDOW = 0.02
+EXCHANGE_TIMEOUT = 5.0
+EXCHANGE_ATTEMPTS = 2
+
+_WORKER_ERRORS = (
+    OSError,
+    EOFError,
+    ValueError,
+    TimeoutError,
+    asyncio.IncompleteReadError,
+)
+
+
+class ComputeWorker:
+    """
+    Compute the controllers of many thermostats in a separate process.
+
+    Compute requests that arrive within a short batch window are sent to the
+    worker process in one message over its stdin, and the outputs come back
+    in one message over its stdout. The worker holds the controller state;
+    every reply hands the state back to the thermostat. When the worker dies
+    or hangs it is restarted, and the thermostats' copies of the state are
+    sent along with their next request.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the worker client."""
+        self.hass = hass
+        self._process: asyncio.subprocess.Process | None = None
+        # Thermostats whose state the running worker process holds
+        self._known: set[str] = set()
+        self._removed: list[str] = []
+        self._pending: dict[
+            str, tuple[dict[str, Any], dict[str, Any] | None, asyncio.Future]
+        ] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_compute(
+        self, key: str, request: dict[str, Any], state: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        """Compute a controller in the next batch, state is the last copy."""
+        if (pending := self._pending.get(key)) is not None:
+            # Computed twice in one batch window, the last request wins
+            self._pending[key] = (request, state, pending[2])
+            return await asyncio.shield(pending[2])
+        future = self.hass.loop.create_future()
+        self._pending[key] = (request, state, future)
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(BATCH_WINDOW, self._flush)
+        return await asyncio.shield(future)
+
+    @callback
+    def async_forget(self, key: str) -> None:
+        """Send the thermostat's copy of the state with its next request."""
+        self._known.discard(key)
+
+    @callback
+    def async_remove(self, key: str) -> None:
+        """Drop the state of a removed thermostat from the worker."""
+        self._known.discard(key)
+        self._removed.append(key)
+
+    @callback
+    def _flush(self) -> None:
+        """Send the pending requests as one batch."""
+        self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        self.hass.async_create_background_task(
+            self._async_exchange(batch), f"{DOMAIN} compute worker batch"
+        )
+
+    async def _async_exchange(
+        self,
+        batch: dict[str, tuple[dict[str, Any], dict[str, Any] | None, asyncio.Future]],
+    ) -> None:
+        """Exchange a batch with the worker, restarting it if it failed."""
+        async with self._lock:
+            for _ in range(EXCHANGE_ATTEMPTS):
+                try:
+                    replies = await self._async_send(batch)
+                except _WORKER_ERRORS as ex:
+                    _LOGGER.warning("Compute worker failed, restarting it: %r", ex)
+                    await self._async_stop()
+                    continue
+                for key, (_, _, future) in batch.items():
+                    if future.done():
+                        continue
+                    if (reply := replies.get(key)) is None:
+                        # Resend the state, the worker may not hold it
+                        self._known.discard(key)
+                        future.set_exception(
+                            HomeAssistantError(f"No compute worker reply for {key}")
+                        )
+                    else:
+                        future.set_result(reply)
+                return
+        for _, _, future in batch.values():
+            if not future.done():
+                future.set_exception(HomeAssistantError("Compute worker unavailable"))
+
+    async def _async_send(
+        self,
+        batch: dict[str, tuple[dict[str, Any], dict[str, Any] | None, asyncio.Future]],
+    ) -> dict[str, Any]:
+        """Send a batch to the worker and return its replies."""
+        if self._process is None or self._process.returncode is not None:
+            await self._async_start()
+        compute = {}
+        for key, (request, state, _) in batch.items():
+            if key not in self._known and state is not None:
+                # Hand the state to a restarted worker
+                request = {**request, "state": state}  # noqa: PLW2901
+            compute[key] = request
+        data = json_bytes({"compute": compute, "remove": self._removed})
+        async with asyncio.timeout(EXCHANGE_TIMEOUT):
+            self._process.stdin.write(HEADER.pack(len(data)) + data)
+            await self._process.stdin.drain()
+            (length,) = HEADER.unpack(
+                await self._process.stdout.readexactly(HEADER.size)
+            )
+            replies = json_loads(await self._process.stdout.readexactly(length))
+        self._removed = []
+        self._known.update(compute)
+        return replies
+
+    async def _async_start(self) -> None:
+        """Start the worker process."""
+        self._known.clear()
+        self._process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        _LOGGER.debug("Started compute worker process %s", self._process.pid)
+
+    async def _async_stop(self) -> None:
+        """Stop the worker process."""
+        if (process := self._process) is None:
+            return
+        self._process = None
+        self._known.clear()
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+    async def async_shutdown(self, _event: Event | None = None) -> None:
+        """Stop the worker on shutdown."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        async with self._lock:
+            await self._async_stop()
+
+
+def async_get_worker(hass: HomeAssistant) -> ComputeWorker:
+    """Return the integration-wide compute worker."""
+    if (worker := hass.data.get(DATA_WORKER)) is None:
+        worker = hass.data[DATA_WORKER] = ComputeWorker(hass)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, worker.async_shutdown)
+    return worker
@@ -0,0 +1,94 @@
+"""The tests for the relay autotune."""
+
+import math
+from collections import deque
+
+import pytest
+
+from custom_components.pid_thermostat.autotune import (
+    AutotuneState,
+    RelayAutotune,
+    TuningRule,
+    tuning_gains,
+)
+
+SETPOINT = 20.0
+TIME_STEP = 10.0
+DEAD_TIME = 300.0
+# Temperature rise per second and percent of output, of an integrating room
+PROCESS_GAIN = 0.00005
+
+
+def _tuner(**kwargs: float) -> RelayAutotune:
+    """Return a relay experiment heating between 0 and 100%."""
+    options = {
+        "direction": 1,
+        "hysteresis": 0.1,
+        "max_deviation": 2.0,
+        "timeout": 86400.0,
+        "cycles": 3,
+        "start": 0.0,
+    }
+    return RelayAutotune(SETPOINT, 0.0, 100.0, **{**options, **kwargs})
+
+
+def test_tuning_gains() -> None:
+    """Test the tuning rules."""
+    kp, ki, kd = tuning_gains(TuningRule.ZIEGLER_NICHOLS, 10.0, 1000.0)
+    assert kp == pytest.approx(6.0)
+    assert ki == pytest.approx(6.0 / 500.0)
+    assert kd == pytest.approx(6.0 * 125.0)
+    kp, ki, kd = tuning_gains(TuningRule.TYREUS_LUYBEN, 10.0, 1000.0)
+    assert kp == pytest.approx(10.0 / 2.2)
+    assert ki == pytest.approx(kp / 2200.0)
+    assert kd == pytest.approx(kp * 1000.0 / 6.3)
+    kp, ki, kd = tuning_gains(TuningRule.SIMC, 10.0, 1000.0)
+    assert kp == pytest.approx(10.0 / math.pi)
+    assert ki == pytest.approx(kp / 2000.0)
+    assert kd == 0
+
+
+def test_relay_experiment() -> None:
+    """Test the experiment on an integrating process with dead time."""
+    tuner = _tuner()
+    temperature = SETPOINT - 0.5
+    heat_loss = 0.002
+    pending = deque([0.0] * int(DEAD_TIME / TIME_STEP))
+    now = 0.0
+    while tuner.state is AutotuneState.RUNNING:
+        pending.append(tuner.update(now, temperature))
+        temperature += (PROCESS_GAIN * pending.popleft() - heat_loss) * TIME_STEP
+        now += TIME_STEP
+        assert now < 86400.0  # noqa: PLR2004
+
+    assert tuner.state is AutotuneState.DONE
+    # The relay period of an integrating process is four dead times
+    assert tuner.ultimate_period == pytest.approx(4 * DEAD_TIME, rel=0.25)
+    # The mean output makes up for the heat loss
+    assert tuner.mean_output == pytest.approx(heat_loss / PROCESS_GAIN, rel=0.1)
+    kp, ki, _ = tuner.gains(TuningRule.SIMC)
+    assert kp > 0
+    assert ki > 0
+    assert tuner.as_dict()["state"] == AutotuneState.DONE
+
+
+def test_abort() -> None:
+    """Test the experiment aborts out of the band and on the timeout."""
+    tuner = _tuner()
+    assert tuner.update(0.0, SETPOINT - 0.5) == 100.0  # noqa: PLR2004
+    tuner.update(10.0, SETPOINT + 2.5)
+    assert tuner.state is AutotuneState.ABORTED
+    assert "band" in tuner.as_dict()["reason"]
+
+    tuner = _tuner(timeout=60.0)
+    tuner.update(0.0, SETPOINT)
+    tuner.update(61.0, SETPOINT)
+    assert tuner.state is AutotuneState.ABORTED
+    assert tuner.reason == "timeout"
+
+
+def test_cooling() -> None:
+    """Test a reverse acting experiment switches to the high output when warm."""
+    tuner = _tuner(direction=-1)
+    assert tuner.update(0.0, SETPOINT + 0.5) == 100.0  # noqa: PLR2004
+    assert tuner.update(10.0, SETPOINT - 0.5) == 0.0
@@ -7,6 +7,7 @@ import pytest
 import voluptuous as vol
 from homeassistant.components.climate import (
     ATTR_CURRENT_TEMPERATURE,
+    ATTR_HVAC_ACTION,
     ATTR_HVAC_MODE,
     ATTR_HVAC_MODES,
     ATTR_MAX_TEMP,
@@ -17,37 +18,64 @@ from homeassistant.components.climate import (
     DEFAULT_MIN_TEMP,
     SERVICE_SET_HVAC_MODE,
     SERVICE_SET_TEMPERATURE,
+    HVACAction,
     HVACMode,
 )
 from homeassistant.components.input_number import CONF_MAX, CONF_MIN, CONF_STEP
 from homeassistant.const import (
     ATTR_ENTITY_ID,
     ATTR_TEMPERATURE,
+    CONF_ENTITY_ID,
+    CONF_MAXIMUM,
     CONF_NAME,
+    CONF_OFFSET,
     CONF_PLATFORM,
     SERVICE_TURN_OFF,
     SERVICE_TURN_ON,
+    STATE_UNAVAILABLE,
     Platform,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, State
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.setup import async_setup_component
 from homeassistant.util.unit_system import METRIC_SYSTEM
+from pytest_homeassistant_custom_component.common import mock_restore_cache
 
 from custom_components.pid_thermostat.const import (
     AC_MODE_COOL,
     AC_MODE_HEAT,
+    AC_MODE_HEAT_COOL,
+    ATTR_COMPUTE,
+    ATTR_HEALTH,
+    ATTR_PREDICTED_TEMPERATURE,
+    ATTR_THERMOSTATS,
     CONF_AC_MODE,
+    CONF_COOLER,
     CONF_CYCLE_TIME,
+    CONF_DEAD_TIME,
+    CONF_DEADBAND,
+    CONF_DIRECT_OUTPUT,
+    CONF_FEEDFORWARD,
+    CONF_GAIN,
     CONF_HEATER,
+    CONF_INITIAL_HVAC_MODE,
+    CONF_MODEL_GAIN,
+    CONF_MPC,
     CONF_PID_KD,
     CONF_PID_KI,
     CONF_PID_KP,
+    CONF_REFERENCE,
+    CONF_SCALE,
     CONF_SENSOR,
+    CONF_SMITH_PREDICTOR,
+    CONF_TABLE_MEMORY,
+    CONF_TIME_CONSTANT,
     DEFAULT_NAME,
     DEFAULT_TARGET_TEMPERATURE,
     DOMAIN,
+    SERVICE_BULK_SET,
 )
+from custom_components.pid_thermostat.health import Health
 
 LOGGER = logging.getLogger(__name__)
 
@@ -55,6 +83,9 @@ LOGGER = logging.getLogger(__name__)
 ENTITY_CLIMATE = "climate.pid_thermostat"
 ENTITY_SENSOR = "sensor.temperature"
 ENTITY_HEATER = "input_number.heater"
+ENTITY_VALVE = "input_number.valve"
+ENTITY_COOLER = "input_number.cooler"
+ENTITY_OUTDOOR = "sensor.outdoor_temperature"
 CYCLE_TIME = 0.01
 
 
@@ -77,7 +108,19 @@ NUMBER_CONFIG = {
             CONF_MIN: 0,
             CONF_MAX: 100,
             CONF_STEP: 1,
-        }
+        },
+        "valve": {
+            CONF_NAME: "Valve",
+            CONF_MIN: 0,
+            CONF_MAX: 50,
+            CONF_STEP: 5,
+        },
+        "cooler": {
+            CONF_NAME: "Chiller",
+            CONF_MIN: 0,
+            CONF_MAX: 100,
+            CONF_STEP: 1,
+        },
     }
 }
 
@@ -373,3 +416,475 @@ async def test_enable_heater_kd(hass: HomeAssistant) -> None:
     state = hass.states.get(ENTITY_CLIMATE)
     assert state.state == HVACMode.OFF
     assert hass.states.get(ENTITY_HEATER).state == "0.0"
+
+
+async def test_enable_heater_direct_output(hass: HomeAssistant) -> None:
+    """Test if the heater is controlled through the direct output path."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_PID_KP: 1.0,
+            CONF_PID_KI: 0.0,
+            CONF_PID_KD: 0.0,
+            CONF_AC_MODE: AC_MODE_HEAT,
+            CONF_DIRECT_OUTPUT: True,
+        }
+    }
+
+    await _setup_pid_climate(hass, cl)
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    # Sleep some cyles.
+    await asyncio.sleep(CYCLE_TIME * 3)
+    # Input 10 degC, target 19 degC and Kp 1, so output should be 9.
+    assert hass.states.get(ENTITY_HEATER).state == "9.0"
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    # Sleep some cyles. Set all off and to 0 to prevent from lingering errors.
+    await asyncio.sleep(CYCLE_TIME * 10)
+    assert hass.states.get(ENTITY_HEATER).state == "0.0"
+
+
+async def test_enable_heater_zone(hass: HomeAssistant) -> None:
+    """Test if one controller drives all outputs of a zone."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_HEATER: [
+                {CONF_ENTITY_ID: ENTITY_HEATER},
+                {
+                    CONF_ENTITY_ID: ENTITY_VALVE,
+                    CONF_SCALE: 2.0,
+                    CONF_OFFSET: 1.0,
+                    CONF_MAXIMUM: 30.0,
+                },
+            ],
+            CONF_PID_KP: 1.0,
+            CONF_PID_KI: 0.0,
+            CONF_PID_KD: 0.0,
+        }
+    }
+
+    await _setup_pid_climate(hass, cl)
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    await asyncio.sleep(CYCLE_TIME * 3)
+    # Output 9: the valve gets 1 + 2 * 9 = 19, quantized to its step of 5
+    assert hass.states.get(ENTITY_HEATER).state == "9.0"
+    assert hass.states.get(ENTITY_VALVE).state == "20.0"
+
+    # A lower temperature is limited to the maximum of the valve
+    hass.states.async_set(ENTITY_SENSOR, 0.0)
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_HEATER).state == "19.0"
+    assert hass.states.get(ENTITY_VALVE).state == "30.0"
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+    # The offset of 1 is quantized away
+    assert hass.states.get(ENTITY_VALVE).state == "0.0"
+
+
+async def test_direct_output_out_of_range(hass: HomeAssistant) -> None:
+    """Test if a direct write outside the range of an output fails the cycle."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_HEATER: [
+                {CONF_ENTITY_ID: ENTITY_HEATER},
+                # Limited above the maximum of 50 of the valve
+                {CONF_ENTITY_ID: ENTITY_VALVE, CONF_SCALE: 10.0, CONF_MAXIMUM: 100.0},
+            ],
+            CONF_PID_KP: 1.0,
+            CONF_PID_KI: 0.0,
+            CONF_PID_KD: 0.0,
+            CONF_DIRECT_OUTPUT: True,
+        }
+    }
+
+    await _setup_pid_climate(hass, cl)
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    await asyncio.sleep(CYCLE_TIME * 3)
+    # The valve refuses 90, the heater gets its 9 and the cycles go on
+    assert hass.states.get(ENTITY_HEATER).state == "9.0"
+    assert hass.states.get(ENTITY_VALVE).state == "0.0"
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes[ATTR_HEALTH] == Health.DEGRADED
+
+    hass.states.async_set(ENTITY_SENSOR, 15.0)
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_HEATER).state == "4.0"
+    assert hass.states.get(ENTITY_VALVE).state == "40.0"
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes[ATTR_HEALTH] == Health.OK
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+
+
+async def test_enable_heat_cool(hass: HomeAssistant) -> None:
+    """Test if one controller drives a heater and a cooler with a deadband."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_AC_MODE: AC_MODE_HEAT_COOL,
+            CONF_COOLER: ENTITY_COOLER,
+            CONF_DEADBAND: 2.0,
+            CONF_PID_KP: 1.0,
+            CONF_PID_KI: 0.0,
+            CONF_PID_KD: 0.0,
+        }
+    }
+
+    await _setup_pid_climate(hass, cl)
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes.get(ATTR_HVAC_MODES) == [HVACMode.OFF, HVACMode.HEAT_COOL]
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT_COOL},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    await asyncio.sleep(CYCLE_TIME * 3)
+    # Output 9, beyond the deadband of 2 it heats
+    assert hass.states.get(ENTITY_HEATER).state == "7.0"
+    assert hass.states.get(ENTITY_COOLER).state == "0.0"
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.state == HVACMode.HEAT_COOL
+    assert state.attributes.get(ATTR_HVAC_ACTION) == HVACAction.HEATING
+
+    # Output -6 cools
+    hass.states.async_set(ENTITY_SENSOR, 25.0)
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_HEATER).state == "0.0"
+    assert hass.states.get(ENTITY_COOLER).state == "4.0"
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes.get(ATTR_HVAC_ACTION) == HVACAction.COOLING
+
+    # Output -1 is within the deadband
+    hass.states.async_set(ENTITY_SENSOR, 20.0)
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_HEATER).state == "0.0"
+    assert hass.states.get(ENTITY_COOLER).state == "0.0"
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes.get(ATTR_HVAC_ACTION) == HVACAction.IDLE
+
+    hass.states.async_set(ENTITY_SENSOR, 30.0)
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+    # Off is the middle of the range: neither heating nor cooling
+    assert hass.states.get(ENTITY_HEATER).state == "0.0"
+    assert hass.states.get(ENTITY_COOLER).state == "0.0"
+
+
+async def test_unsupported_hvac_mode(hass: HomeAssistant) -> None:
+    """Test if a mode of another ac_mode falls back to the own mode."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_INITIAL_HVAC_MODE: HVACMode.HEAT_COOL,
+        }
+    }
+    await _setup_pid_climate(hass, cl)
+    assert hass.states.get(ENTITY_CLIMATE).state == HVACMode.HEAT
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+
+
+async def test_restore_heat_as_heat_cool(hass: HomeAssistant) -> None:
+    """Test if a restored heat mode runs a heat_cool thermostat in heat_cool."""
+    mock_restore_cache(
+        hass, (State(ENTITY_CLIMATE, HVACMode.HEAT, {ATTR_TEMPERATURE: 20.0}),)
+    )
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_AC_MODE: AC_MODE_HEAT_COOL,
+            CONF_COOLER: ENTITY_COOLER,
+        }
+    }
+    await _setup_pid_climate(hass, cl)
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.state == HVACMode.HEAT_COOL
+    assert state.attributes[ATTR_TEMPERATURE] == 20.0  # noqa: PLR2004
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+
+
+async def test_heat_cool_heater_unavailable(hass: HomeAssistant) -> None:
+    """Test if a heat_cool thermostat cools with the heater unavailable at start."""
+    hass.states.async_set(ENTITY_SENSOR, 30.0)
+    hass.states.async_set(ENTITY_HEATER, STATE_UNAVAILABLE)
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_AC_MODE: AC_MODE_HEAT_COOL,
+            CONF_COOLER: ENTITY_COOLER,
+            CONF_PID_KP: 1.0,
+            CONF_PID_KI: 0.0,
+            CONF_PID_KD: 0.0,
+        }
+    }
+
+    await _setup_pid_climate(hass, cl)
+    hass.states.async_set(ENTITY_HEATER, 0.0)
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT_COOL},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.async_block_till_done()
+    # Output -11 cools
+    assert hass.states.get(ENTITY_COOLER).state == "11.0"
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+
+
+async def test_heat_cool_cooler_missing(hass: HomeAssistant) -> None:
+    """Test if a missing cooler is reported by the health."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_AC_MODE: AC_MODE_HEAT_COOL,
+            CONF_COOLER: "input_number.missing",
+            CONF_INITIAL_HVAC_MODE: HVACMode.HEAT_COOL,
+        }
+    }
+
+    await _setup_pid_climate(hass, cl)
+    await asyncio.sleep(CYCLE_TIME * 3)
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes[ATTR_HEALTH] == Health.OUTPUT_MISSING
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+
+
+async def test_heat_cool_requires_cooler(hass: HomeAssistant) -> None:
+    """Test if the heat_cool mode is refused without a cooler."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_AC_MODE: AC_MODE_HEAT_COOL,
+        }
+    }
+    await _setup_pid_climate(hass, cl)
+    assert hass.states.get(ENTITY_CLIMATE) is None
+
+
+async def test_enable_heater_feedforward(hass: HomeAssistant) -> None:
+    """Test if the feedforward of the outdoor temperature is added to the output."""
+    hass.states.async_set(ENTITY_OUTDOOR, 0.0)
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_PID_KP: 1.0,
+            CONF_PID_KI: 0.0,
+            CONF_PID_KD: 0.0,
+            CONF_FEEDFORWARD: [
+                {CONF_ENTITY_ID: ENTITY_OUTDOOR, CONF_GAIN: -2.0, CONF_REFERENCE: 15.0}
+            ],
+        }
+    }
+
+    await _setup_pid_climate(hass, cl)
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    await asyncio.sleep(CYCLE_TIME * 3)
+    # Output 9 of the controller, plus -2 * (0 - 15) of the feedforward
+    assert hass.states.get(ENTITY_HEATER).state == "39.0"
+
+    hass.states.async_set(ENTITY_OUTDOOR, 10.0)
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_HEATER).state == "19.0"
+
+    # The combined output is limited to the range of the heater
+    hass.states.async_set(ENTITY_OUTDOOR, -40.0)
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_HEATER).state == "100.0"
+
+
+async def test_smith_predictor_before_sensor(hass: HomeAssistant) -> None:
+    """Test if cycles before the first temperature leave the model untouched."""
+    hass.states.async_remove(ENTITY_SENSOR)
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_PID_KP: 1.0,
+            CONF_PID_KI: 0.0,
+            CONF_PID_KD: 0.0,
+            CONF_INITIAL_HVAC_MODE: HVACMode.HEAT,
+            CONF_SMITH_PREDICTOR: {
+                CONF_MODEL_GAIN: 0.1,
+                CONF_TIME_CONSTANT: {"seconds": CYCLE_TIME * 10},
+                CONF_DEAD_TIME: {"seconds": CYCLE_TIME * 3},
+            },
+        }
+    }
+
+    await _setup_pid_climate(hass, cl)
+    await asyncio.sleep(CYCLE_TIME * 10)
+    assert hass.states.get(ENTITY_HEATER).state == "0.0"
+
+    hass.states.async_set(ENTITY_SENSOR, 10.0)
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 3)
+    await hass.async_block_till_done()
+    # The model only holds written outputs, so the output stays a number
+    assert 0.0 < float(hass.states.get(ENTITY_HEATER).state) <= 100.0  # noqa: PLR2004
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes[ATTR_PREDICTED_TEMPERATURE] >= 10.0  # noqa: PLR2004
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+
+
+async def test_smith_predictor_bulk_compute(hass: HomeAssistant) -> None:
+    """Test if the outputs of a bulk compute advance the model."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            # No cycle runs during the test, only the bulk computes
+            CONF_CYCLE_TIME: {"hours": 1},
+            CONF_PID_KP: 1.0,
+            CONF_PID_KI: 0.0,
+            CONF_PID_KD: 0.0,
+            CONF_INITIAL_HVAC_MODE: HVACMode.HEAT,
+            CONF_SMITH_PREDICTOR: {
+                CONF_MODEL_GAIN: 0.1,
+                CONF_TIME_CONSTANT: {"hours": 10},
+                CONF_DEAD_TIME: {"hours": 3},
+            },
+        }
+    }
+    await _setup_pid_climate(hass, cl)
+
+    for _ in range(2):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_BULK_SET,
+            {ATTR_THERMOSTATS: {ENTITY_CLIMATE: 20.0}, ATTR_COMPUTE: True},
+            blocking=True,
+        )
+    # The second compute predicts the effect of the output of the first
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes[ATTR_PREDICTED_TEMPERATURE] > 10.0  # noqa: PLR2004
+
+
+async def test_mpc_table_memory_limit(hass: HomeAssistant) -> None:
+    """Test if a table too large to solve at startup is refused."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_SMITH_PREDICTOR: {
+                CONF_MODEL_GAIN: 0.1,
+                CONF_TIME_CONSTANT: {"minutes": 10},
+                CONF_DEAD_TIME: {"minutes": 1},
+            },
+            CONF_MPC: {CONF_TABLE_MEMORY: 1024 * 1024},
+        }
+    }
+    await _setup_pid_climate(hass, cl)
+    assert hass.states.get(ENTITY_CLIMATE) is None
+
+
+async def test_feedforward_excludes_mpc(hass: HomeAssistant) -> None:
+    """Test if the feedforward is refused together with the MPC controller."""
+    cl = {
+        Platform.CLIMATE: {
+            **CLIMATE_CONFIG[Platform.CLIMATE],
+            CONF_SMITH_PREDICTOR: {
+                CONF_MODEL_GAIN: 0.1,
+                CONF_TIME_CONSTANT: {"minutes": 10},
+                CONF_DEAD_TIME: {"minutes": 1},
+            },
+            CONF_MPC: {},
+            CONF_FEEDFORWARD: [{CONF_ENTITY_ID: ENTITY_OUTDOOR, CONF_GAIN: -2.0}],
+        }
+    }
+    await _setup_pid_climate(hass, cl)
+    assert hass.states.get(ENTITY_CLIMATE) is None
@@ -13,13 +13,17 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 from custom_components.pid_thermostat.const import (
     CONF_AC_MODE,
     CONF_CYCLE_TIME,
+    CONF_DIRECT_OUTPUT,
     CONF_HEATER,
+    CONF_INTERPOLATE,
     CONF_PID_KD,
     CONF_PID_KI,
     CONF_PID_KP,
     CONF_SENSOR,
     DEFAULT_AC_MODE,
     DEFAULT_CYCLE_TIME,
+    DEFAULT_DIRECT_OUTPUT,
+    DEFAULT_INTERPOLATE,
     DEFAULT_PID_KD,
     DEFAULT_PID_KI,
     DEFAULT_PID_KP,
@@ -62,6 +66,8 @@ async def test_config_flow(hass: HomeAssistant, platform: str) -> None:  # noqa:
         CONF_PID_KI: DEFAULT_PID_KI,
         CONF_PID_KD: DEFAULT_PID_KD,
         CONF_AC_MODE: DEFAULT_AC_MODE,
+        CONF_DIRECT_OUTPUT: DEFAULT_DIRECT_OUTPUT,
+        CONF_INTERPOLATE: DEFAULT_INTERPOLATE,
     }
 
     assert result["options"] == expected_config
@@ -131,6 +137,8 @@ async def test_options(hass: HomeAssistant, platform: str) -> None:
         CONF_PID_KI: DEFAULT_PID_KI,
         CONF_PID_KD: DEFAULT_PID_KD,
         CONF_AC_MODE: DEFAULT_AC_MODE,
+        CONF_DIRECT_OUTPUT: DEFAULT_DIRECT_OUTPUT,
+        CONF_INTERPOLATE: DEFAULT_INTERPOLATE,
     }
     assert config_entry.data == {}
     assert config_entry.options == {
@@ -142,6 +150,8 @@ async def test_options(hass: HomeAssistant, platform: str) -> None:
         CONF_PID_KI: DEFAULT_PID_KI,
         CONF_PID_KD: DEFAULT_PID_KD,
         CONF_AC_MODE: DEFAULT_AC_MODE,
+        CONF_DIRECT_OUTPUT: DEFAULT_DIRECT_OUTPUT,
+        CONF_INTERPOLATE: DEFAULT_INTERPOLATE,
     }
     assert config_entry.title == "My PID Thermostat"
 
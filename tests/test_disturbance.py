@@ -0,0 +1,58 @@
+"""The tests for the shared disturbance sensors."""
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.pid_thermostat.disturbance import (
+    LagFilter,
+    async_get_disturbances,
+)
+
+ENTITY_OUTDOOR = "sensor.outdoor_temperature"
+
+
+def test_lag_filter() -> None:
+    """Test the first-order lag of a sensor that holds between updates."""
+    lag_filter = LagFilter(100.0)
+    assert lag_filter.value_at(0.0) is None
+    lag_filter.update(0.0, 10.0)
+    assert lag_filter.value_at(50.0) == 10.0  # noqa: PLR2004
+    lag_filter.update(100.0, 0.0)
+    # One time constant after the step, 63% of the way
+    assert lag_filter.value_at(200.0) == pytest.approx(10.0 / 2.718281828)
+    assert lag_filter.value_at(10000.0) == pytest.approx(0.0)
+
+    # Without a lag the filter follows the sensor
+    lag_filter = LagFilter(0.0)
+    lag_filter.update(0.0, 10.0)
+    assert lag_filter.value_at(0.0) == 10.0  # noqa: PLR2004
+
+
+async def test_shared_subscription(hass: HomeAssistant) -> None:
+    """Test the thermostats on a sensor share one filter and subscription."""
+    hass.states.async_set(ENTITY_OUTDOOR, 5.0)
+    sensors = async_get_disturbances(hass)
+    first = sensors.async_acquire(ENTITY_OUTDOOR, 0.0)
+    assert sensors.async_acquire(ENTITY_OUTDOOR, 0.0) is first
+    lagged = sensors.async_acquire(ENTITY_OUTDOOR, 3600.0)
+    assert lagged is not first
+    assert first.value_at(0.0) == 5.0  # noqa: PLR2004
+
+    hass.states.async_set(ENTITY_OUTDOOR, 3.0)
+    await hass.async_block_till_done()
+    assert first.value_at(0.0) == 3.0  # noqa: PLR2004
+    # Not a number, the last value holds
+    hass.states.async_set(ENTITY_OUTDOOR, "unavailable")
+    await hass.async_block_till_done()
+    assert first.value_at(0.0) == 3.0  # noqa: PLR2004
+
+    sensors.async_release(ENTITY_OUTDOOR, 0.0)
+    sensors.async_release(ENTITY_OUTDOOR, 3600.0)
+    hass.states.async_set(ENTITY_OUTDOOR, 1.0)
+    await hass.async_block_till_done()
+    # Still in use by one thermostat
+    assert first.value_at(0.0) == 1.0
+    sensors.async_release(ENTITY_OUTDOOR, 0.0)
+    hass.states.async_set(ENTITY_OUTDOOR, 2.0)
+    await hass.async_block_till_done()
+    assert first.value_at(0.0) == 1.0
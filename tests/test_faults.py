@@ -0,0 +1,90 @@
+"""The tests for the stuck actuator and sensor mismatch detection."""
+
+from custom_components.pid_thermostat.faults import (
+    REGRESSION_WINDOWS,
+    Fault,
+    FaultDetector,
+)
+
+WINDOW = 20
+
+
+def test_stuck_actuator() -> None:
+    """Test a window of high output without temperature rise is a fault."""
+    detector = FaultDetector(WINDOW, 1)
+    changes = {}
+    for _ in range(WINDOW):
+        changes = detector.update(1.0, 18.0)
+    assert changes == {Fault.STUCK_ACTUATOR: True}
+    assert detector.faults[Fault.STUCK_ACTUATOR]["cycles"] == WINDOW
+    assert detector.faults[Fault.STUCK_ACTUATOR]["mean_output"] == "100%"
+
+    # The heater works again
+    for cycle in range(WINDOW):
+        changes = detector.update(0.9, 18.0 + 0.05 * cycle)
+    assert changes == {Fault.STUCK_ACTUATOR: False}
+    assert not detector.faults
+
+
+def test_undersized_heater() -> None:
+    """Test a saturated heater that slowly warms the room is not stuck."""
+    detector = FaultDetector(WINDOW, 1)
+    for cycle in range(WINDOW * 3):
+        assert not detector.update(1.0, 18.0 + 0.002 * cycle)
+    assert not detector.faults
+
+    # Once stuck, a small gain does not clear the fault yet
+    for _ in range(WINDOW):
+        detector.update(1.0, 18.2)
+    for cycle in range(WINDOW):
+        assert not detector.update(1.0, 18.2 + 0.002 * cycle)
+    assert Fault.STUCK_ACTUATOR in detector.faults
+
+
+def test_stuck_actuator_cooling() -> None:
+    """Test a cooler that cools is not stuck, and a low output is not judged."""
+    detector = FaultDetector(WINDOW, -1)
+    for cycle in range(WINDOW * 2):
+        assert not detector.update(1.0, 25.0 - 0.05 * cycle)
+    for _ in range(WINDOW * 2):
+        assert not detector.update(0.5, 25.0)
+    assert not detector.faults
+
+
+def test_stuck_actuator_split_range() -> None:
+    """Test each side of a split range is judged in its own direction."""
+    detector = FaultDetector(WINDOW, 1)
+    # The heating side warms, the cooling side does not cool
+    for cycle in range(WINDOW):
+        assert not detector.update(1.0, 20.0 + 0.05 * cycle)
+    changes = {}
+    for _ in range(WINDOW):
+        changes = detector.update(-1.0, 21.0)
+    assert changes == {Fault.STUCK_ACTUATOR: True}
+
+    # The chiller works again
+    for cycle in range(WINDOW):
+        changes = detector.update(-0.9, 21.0 - 0.05 * cycle)
+    assert changes == {Fault.STUCK_ACTUATOR: False}
+
+
+def _run(detector: FaultDetector, effect: float) -> dict[Fault, bool]:
+    """Drive the output between high and low, return all changes."""
+    changes = {}
+    temperature = 20.0
+    for cycle in range(WINDOW * REGRESSION_WINDOWS * 2):
+        output = 0.7 if (cycle // WINDOW) % 2 else 0.1
+        temperature += effect * (output - 0.4)
+        changes.update(detector.update(output, temperature))
+    return changes
+
+
+def test_sensor_mismatch() -> None:
+    """Test a temperature that moves against the output is a fault."""
+    detector = FaultDetector(WINDOW, 1)
+    assert _run(detector, -0.05) == {Fault.SENSOR_MISMATCH: True}
+    assert float(detector.faults[Fault.SENSOR_MISMATCH]["correlation"]) < -0.5  # noqa: PLR2004
+
+    assert not _run(FaultDetector(WINDOW, 1), 0.05)
+    # A cooler cools on a high output
+    assert not _run(FaultDetector(WINDOW, -1), -0.05)
@@ -0,0 +1,42 @@
+"""The tests for the PID thermostat health tracking."""
+
+import logging
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+
+from custom_components.pid_thermostat.health import (
+    SUMMARY_INTERVAL,
+    FleetHealth,
+    Health,
+)
+
+ENTITY_CLIMATE = "climate.pid_thermostat"
+ENTITY_OTHER = "climate.other_thermostat"
+
+
+def test_log_transitions_only(
+    caplog: pytest.LogCaptureFixture, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that repeated reports are not logged until a summary is due."""
+    caplog.set_level(logging.INFO)
+    health = FleetHealth()
+    assert not health.update(ENTITY_CLIMATE, Health.OK, None)
+    assert health.update(ENTITY_CLIMATE, Health.SENSOR_MISSING, "sensor is unknown")
+    assert health.update(ENTITY_OTHER, Health.OUTPUT_MISSING, "output unavailable")
+    for _ in range(100):
+        assert not health.update(ENTITY_CLIMATE, Health.SENSOR_MISSING, None)
+        assert not health.update(ENTITY_OTHER, Health.OUTPUT_MISSING, None)
+    assert len(caplog.records) == 2  # noqa: PLR2004
+
+    caplog.clear()
+    freezer.tick(timedelta(seconds=SUMMARY_INTERVAL))
+    health.update(ENTITY_CLIMATE, Health.SENSOR_MISSING, None)
+    health.update(ENTITY_OTHER, Health.OUTPUT_MISSING, None)
+    assert len(caplog.records) == 1
+    assert "2 PID thermostats unhealthy" in caplog.text
+
+    caplog.clear()
+    assert health.update(ENTITY_CLIMATE, Health.OK, None)
+    assert "recovered from sensor_missing after 101 repeated reports" in caplog.text
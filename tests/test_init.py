@@ -1,16 +1,31 @@
 """Test the PID thermostat integration."""
+
+from unittest.mock import patch
+
 import pytest
-from homeassistant.const import CONF_NAME
+from homeassistant.const import (
+    CONF_NAME,
+    CONF_PLATFORM,
+    CONF_UNIQUE_ID,
+    SERVICE_RELOAD,
+    Platform,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_component import DATA_INSTANCES
+from homeassistant.setup import async_setup_component
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.pid_thermostat.const import (
     CONF_HEATER,
+    CONF_PID_KP,
+    CONF_ROOMS,
     CONF_SENSOR,
     DOMAIN,
 )
 
+_ROOM_ENTITIES = {CONF_HEATER: "number.output", CONF_SENSOR: "sensor.input"}
+
 
 @pytest.mark.parametrize("platform", ["climate"])
 async def test_setup_and_remove_config_entry(
@@ -53,3 +68,98 @@ async def test_setup_and_remove_config_entry(
     # Check the state and entity registry entry are removed
     assert hass.states.get(pid_thermostat_entity_id) is None
     assert registry.async_get(pid_thermostat_entity_id) is None
+
+
+def _yaml_thermostat(name: str, **config: float) -> dict:
+    """Return the YAML config of a thermostat with a unique id."""
+    return {
+        CONF_PLATFORM: DOMAIN,
+        CONF_NAME: name,
+        CONF_UNIQUE_ID: name,
+        CONF_SENSOR: "sensor.input",
+        CONF_HEATER: "number.output",
+        **config,
+    }
+
+
+async def test_incremental_reload(hass: HomeAssistant) -> None:
+    """Test that a reload only rebuilds added and changed thermostats."""
+    assert await async_setup_component(
+        hass,
+        Platform.CLIMATE,
+        {Platform.CLIMATE: [_yaml_thermostat("kept"), _yaml_thermostat("changed")]},
+    )
+    await hass.async_block_till_done()
+    component = hass.data[DATA_INSTANCES][Platform.CLIMATE]
+    kept = component.get_entity("climate.kept")
+    changed = component.get_entity("climate.changed")
+
+    new_config = {
+        Platform.CLIMATE: [
+            _yaml_thermostat("kept"),
+            _yaml_thermostat("changed", **{CONF_PID_KP: 50.0}),
+            _yaml_thermostat("added"),
+        ]
+    }
+    with patch("homeassistant.config.load_yaml_config_file", return_value=new_config):
+        await hass.services.async_call(DOMAIN, SERVICE_RELOAD, blocking=True)
+    await hass.async_block_till_done()
+
+    assert component.get_entity("climate.kept") is kept
+    assert component.get_entity("climate.changed") is not changed
+    assert component.get_entity("climate.changed") is not None
+    assert hass.states.get("climate.added") is not None
+
+    with patch(
+        "homeassistant.config.load_yaml_config_file",
+        return_value={Platform.CLIMATE: [_yaml_thermostat("kept")]},
+    ):
+        await hass.services.async_call(DOMAIN, SERVICE_RELOAD, blocking=True)
+    await hass.async_block_till_done()
+
+    assert component.get_entity("climate.kept") is kept
+    assert hass.states.get("climate.changed") is None
+    assert hass.states.get("climate.added") is None
+
+
+async def test_config_entry_rooms(hass: HomeAssistant) -> None:
+    """Test that a config entry hosts its rooms and only rebuilds changed rooms."""
+    rooms = {
+        "kitchen": {CONF_NAME: "Kitchen", **_ROOM_ENTITIES},
+        "bathroom": {CONF_NAME: "Bathroom", **_ROOM_ENTITIES},
+    }
+    config_entry = MockConfigEntry(
+        data={},
+        domain=DOMAIN,
+        options={CONF_NAME: "Building", **_ROOM_ENTITIES, CONF_ROOMS: rooms},
+        title="Building",
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    component = hass.data[DATA_INSTANCES][Platform.CLIMATE]
+    building = component.get_entity("climate.building")
+    kitchen = component.get_entity("climate.kitchen")
+    bathroom = component.get_entity("climate.bathroom")
+    assert None not in (building, kitchen, bathroom)
+    assert kitchen.unique_id == f"{config_entry.entry_id}_kitchen"
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            **config_entry.options,
+            CONF_ROOMS: {
+                "kitchen": {**rooms["kitchen"], CONF_PID_KP: 50.0},
+                "hall": {CONF_NAME: "Hall", **_ROOM_ENTITIES},
+            },
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert component.get_entity("climate.building") is building
+    assert component.get_entity("climate.kitchen") is not kitchen
+    assert component.get_entity("climate.kitchen") is not None
+    assert hass.states.get("climate.hall") is not None
+    assert hass.states.get("climate.bathroom") is None
+    assert er.async_get(hass).async_get("climate.bathroom") is None
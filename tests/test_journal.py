@@ -0,0 +1,225 @@
+"""The tests for the control journal."""
+
+import ast
+import asyncio
+import csv
+import json
+import struct
+from pathlib import Path
+
+import pytest
+from homeassistant.components.climate import (
+    ATTR_HVAC_MODE,
+    SERVICE_SET_HVAC_MODE,
+    HVACMode,
+)
+from homeassistant.components.input_number import CONF_MAX, CONF_MIN, CONF_STEP
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_NAME,
+    CONF_PLATFORM,
+    Platform,
+)
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import Unauthorized
+from homeassistant.setup import async_setup_component
+from homeassistant.util.unit_system import METRIC_SYSTEM
+from pytest_homeassistant_custom_component.common import MockUser
+
+from custom_components.pid_thermostat.const import (
+    ATTR_FORMAT,
+    ATTR_START,
+    CONF_CYCLE_TIME,
+    CONF_HEATER,
+    CONF_JOURNAL,
+    CONF_SENSOR,
+    DEFAULT_NAME,
+    DOMAIN,
+    SERVICE_EXPORT_JOURNAL,
+)
+from custom_components.pid_thermostat.journal import (
+    ENTITIES_FILE,
+    EXPORT_CSV,
+    EXPORT_FIELDS,
+    EXPORT_NPY,
+    FLAG_AUTOTUNE,
+    HEADER,
+    RECORD,
+    Journal,
+    JournalReader,
+    Segment,
+    export_records,
+)
+
+ENTITY_CLIMATE = "climate.pid_thermostat"
+ENTITY_OTHER = "climate.other"
+ENTITY_SENSOR = "sensor.temperature"
+ENTITY_HEATER = "input_number.heater"
+CYCLE_TIME = 0.01
+RECORDS = 1000
+
+
+def _write_journal(directory: Path) -> None:
+    """Write two segments with the cycles of two thermostats."""
+    (directory / ENTITIES_FILE).write_text(
+        json.dumps({ENTITY_CLIMATE: 0, ENTITY_OTHER: 1})
+    )
+    for number, first in ((1, 0), (2, RECORDS)):
+        segment = Segment(directory / f"segment-{number:08d}.bin", 64 * 1024)
+        segment.activate(float(first))
+        for cycle in range(first, first + RECORDS):
+            segment.append((float(cycle), cycle % 2, 0, 20.0, 21.0, 50.0, 1, 2, 3))
+        segment.close()
+
+
+def test_segment(tmp_path: Path) -> None:
+    """Test a segment is cut to its records when closed, or dropped if empty."""
+    segment = Segment(tmp_path / "segment-00000001.bin", 4096)
+    assert segment.capacity == (4096 - HEADER.size) // RECORD.size
+    segment.activate(100.0)
+    assert not segment.expired(100.0)
+    assert segment.expired(100.0 + 86400)
+    for cycle in range(segment.capacity):
+        segment.append((100.0 + cycle, 0, 0, 20.0, 21.0, 50.0, 1, 2, 3))
+    assert segment.expired(100.0)
+    segment.close()
+    assert segment.path.stat().st_size == HEADER.size + segment.capacity * RECORD.size
+
+    empty = Segment(tmp_path / "segment-00000002.bin", 4096)
+    empty.close()
+    assert not empty.path.exists()
+
+
+def test_reader_range(tmp_path: Path) -> None:
+    """Test reading the records of one thermostat in a time range."""
+    _write_journal(tmp_path)
+    reader = JournalReader(tmp_path)
+    assert len(reader.segments()) == 2  # noqa: PLR2004
+
+    # A range across both segments, bounds included
+    records = list(reader.records(ENTITY_CLIMATE, 900.0, 1100.0))
+    assert [record[0] for record in records] == list(range(900, 1101, 2))
+    assert all(record[1] == 0 for record in records)
+    # A range within one segment and a range outside the journal
+    assert len(list(reader.records(ENTITY_OTHER, 10.0, 19.0))) == 5  # noqa: PLR2004
+    assert not list(reader.records(ENTITY_CLIMATE, 5000.0, 6000.0))
+    assert not list(reader.records("climate.unknown", 0.0, 6000.0))
+
+
+def test_export(tmp_path: Path) -> None:
+    """Test exporting records as CSV and as a NumPy array."""
+    _write_journal(tmp_path)
+    reader = JournalReader(tmp_path)
+
+    path = tmp_path / "export.csv"
+    assert export_records(reader.records(ENTITY_CLIMATE, 0, 9), path, EXPORT_CSV) == 5  # noqa: PLR2004
+    with path.open() as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == [name for name, _ in EXPORT_FIELDS]
+    assert rows[1] == ["0.0", "0", "20.0", "21.0", "50.0", "1.0", "2.0", "3.0"]
+
+    path = tmp_path / "export.npy"
+    records = reader.records(ENTITY_OTHER, 0, 9)
+    assert export_records(records, path, EXPORT_NPY) == 5  # noqa: PLR2004
+    data = path.read_bytes()
+    (length,) = struct.unpack_from("<H", data, 8)
+    header = ast.literal_eval(data[10 : 10 + length].decode("latin1"))
+    assert header["shape"] == (5,)
+    assert (10 + length) % 64 == 0
+    assert len(data) == 10 + length + 5 * 34
+    assert struct.unpack_from("<d", data, 10 + length)[0] == 1.0
+
+
+async def test_export_journal(hass: HomeAssistant) -> None:
+    """Test a thermostat appends its cycles to the journal and exporting them."""
+    hass.config.units = METRIC_SYSTEM
+    hass.states.async_set(ENTITY_SENSOR, 10.0)
+    assert await async_setup_component(
+        hass,
+        "input_number",
+        {"input_number": {"heater": {CONF_MIN: 0, CONF_MAX: 100, CONF_STEP: 1}}},
+    )
+    assert await async_setup_component(
+        hass,
+        Platform.CLIMATE,
+        {
+            Platform.CLIMATE: {
+                CONF_PLATFORM: DOMAIN,
+                CONF_NAME: DEFAULT_NAME,
+                CONF_SENSOR: ENTITY_SENSOR,
+                CONF_HEATER: ENTITY_HEATER,
+                CONF_CYCLE_TIME: {"seconds": CYCLE_TIME},
+                CONF_JOURNAL: True,
+            }
+        },
+    )
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+    await asyncio.sleep(CYCLE_TIME * 10)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_JOURNAL,
+        {
+            ATTR_ENTITY_ID: ENTITY_CLIMATE,
+            ATTR_START: "2000-01-01 00:00:00",
+            ATTR_FORMAT: EXPORT_CSV,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response["records"] > 0
+    export = Path(response["file"])
+    rows = list(csv.DictReader(export.read_text().splitlines()))
+    assert len(rows) == response["records"]
+    assert float(rows[-1]["process_value"]) == 10.0  # noqa: PLR2004
+    assert int(rows[-1]["flags"]) & FLAG_AUTOTUNE == 0
+    export.unlink()
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+
+
+async def test_export_journal_admin_only(
+    hass: HomeAssistant, hass_read_only_user: MockUser
+) -> None:
+    """Test that only an admin can export the journal."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT_JOURNAL,
+            {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_START: "2000-01-01 00:00:00"},
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+            return_response=True,
+        )
+
+
+async def test_append_during_shutdown(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test cycles during the shutdown are not appended to closing segments."""
+    journal = Journal(hass, tmp_path)
+    await journal.async_open()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    journal.async_append(ENTITY_CLIMATE, 100.0, (20.0, 21.0, 50.0, 1, 2, 3), 0)
+
+    shutdown = hass.async_create_task(journal.async_shutdown())
+    # Let the shutdown run up to closing the segments in the executor
+    await asyncio.sleep(0)
+    journal.async_append(ENTITY_CLIMATE, 101.0, (20.0, 21.0, 50.0, 1, 2, 3), 0)
+    await shutdown
+    journal.async_append(ENTITY_CLIMATE, 102.0, (20.0, 21.0, 50.0, 1, 2, 3), 0)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    records = list(JournalReader(tmp_path).records(ENTITY_CLIMATE, 0.0, 1000.0))
+    assert [record[0] for record in records] == [100.0]
+    assert journal.dropped == 0
@@ -0,0 +1,49 @@
+"""The tests for the control quality KPIs."""
+
+import pytest
+
+from custom_components.pid_thermostat.kpi import (
+    KPI_ENERGY,
+    KPI_IAE,
+    KPI_OUTPUT_VARIATION,
+    KPI_OVERSHOOT,
+    KPI_SETTLING_TIME,
+    WINDOW_DAY,
+    WINDOW_HOUR,
+    KpiTracker,
+)
+
+CYCLE = 60.0
+
+
+def test_error_and_output_integrals() -> None:
+    """Test the error and output aggregates over a rolling window."""
+    tracker = KpiTracker()
+    for cycle in range(61):
+        tracker.record(cycle * CYCLE, 20.0, 19.0, 50.0 if cycle % 2 else 40.0)
+    day = tracker.window(WINDOW_DAY, 60 * CYCLE)
+    assert day[KPI_IAE] == pytest.approx(1.0)
+    assert day[KPI_ENERGY] == pytest.approx(45.0)
+    assert day[KPI_OUTPUT_VARIATION] == pytest.approx(600.0)
+    assert day[KPI_SETTLING_TIME] is None
+    # The hour window has moved past the first five minute bucket
+    assert tracker.window(WINDOW_HOUR, 60 * CYCLE)[KPI_IAE] == pytest.approx(
+        56 / 60, abs=1e-3
+    )
+    # Older buckets drop out of the hour window, not out of the day window
+    later = 3 * 3600.0
+    assert tracker.window(WINDOW_HOUR, later)[KPI_IAE] == 0
+    assert tracker.window(WINDOW_DAY, later)[KPI_IAE] == pytest.approx(1.0)
+
+
+def test_overshoot_and_settling() -> None:
+    """Test the overshoot and settling time after a setpoint change."""
+    tracker = KpiTracker()
+    tracker.record(0.0, 19.0, 19.0, 0.0)
+    # Setpoint step up at 600 s, inside the band from 3600 s on
+    temperatures = [19.0, 19.5, 20.3, 20.8, 20.4, 20.1, 20.0, 20.0, 20.0, 20.0]
+    for cycle, temperature in enumerate(temperatures, start=1):
+        tracker.record(cycle * 600.0, 20.0, temperature, 50.0)
+    day = tracker.window(WINDOW_DAY, 6000.0)
+    assert day[KPI_OVERSHOOT] == pytest.approx(0.8)
+    assert day[KPI_SETTLING_TIME] == 3000  # noqa: PLR2004
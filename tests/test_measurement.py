@@ -0,0 +1,46 @@
+"""The tests for the timestamped process value tracking."""
+
+import pytest
+
+from custom_components.pid_thermostat.measurement import Measurement
+
+
+def test_single_sample() -> None:
+    """Test that a single sample is held without a slope."""
+    measurement = Measurement()
+    assert measurement.value_at(0.0) is None
+    measurement.add(100.0, 20.0)
+    assert measurement.value_at(200.0) == 20.0  # noqa: PLR2004
+    assert measurement.slope_at(200.0) == 0.0
+
+
+def test_slope_from_sample_timestamps() -> None:
+    """Test the slope is based on sensor timestamps, not compute times."""
+    measurement = Measurement()
+    measurement.add(100.0, 20.0)
+    measurement.add(160.0, 21.0)
+    assert measurement.slope_at(170.0) == pytest.approx(1 / 60)
+    # Stale after one sample interval without a new sample
+    assert measurement.slope_at(221.0) == 0.0
+
+
+def test_interpolation() -> None:
+    """Test interpolation and bounded extrapolation."""
+    measurement = Measurement()
+    measurement.add(100.0, 20.0)
+    measurement.add(160.0, 21.0)
+    assert measurement.value_at(130.0) == pytest.approx(20.5)
+    assert measurement.value_at(190.0) == pytest.approx(21.5)
+    assert measurement.value_at(220.0) == pytest.approx(22.0)
+    # After one sample interval without a new sample the last value is held
+    assert measurement.value_at(221.0) == 21.0  # noqa: PLR2004
+    assert measurement.value_at(1000.0) == 21.0  # noqa: PLR2004
+
+
+def test_out_of_order_sample() -> None:
+    """Test an older sample only updates the newest value."""
+    measurement = Measurement()
+    measurement.add(100.0, 20.0)
+    measurement.add(160.0, 21.0)
+    measurement.add(150.0, 22.0)
+    assert measurement.value_at(160.0) == 22.0  # noqa: PLR2004
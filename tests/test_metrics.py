@@ -0,0 +1,148 @@
+"""The tests for the PID thermostat aggregate metrics."""
+
+import asyncio
+from http import HTTPStatus
+from unittest.mock import patch
+
+from homeassistant.components.climate import (
+    ATTR_HVAC_MODE,
+    SERVICE_SET_HVAC_MODE,
+    HVACMode,
+)
+from homeassistant.components.input_number import CONF_MAX, CONF_MIN, CONF_STEP
+from homeassistant.const import ATTR_ENTITY_ID, CONF_NAME, CONF_PLATFORM, Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from homeassistant.util.unit_system import METRIC_SYSTEM
+from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
+
+from custom_components.pid_thermostat.const import (
+    CONF_CYCLE_TIME,
+    CONF_HEATER,
+    CONF_PID_KI,
+    CONF_PID_KP,
+    CONF_SENSOR,
+    DEFAULT_NAME,
+    DOMAIN,
+)
+from custom_components.pid_thermostat.metrics import (
+    METRICS_URL,
+    WORST_WINDOW,
+    FleetMetrics,
+)
+
+ENTITY_CLIMATE = "climate.pid_thermostat"
+ENTITY_SENSOR = "sensor.temperature"
+ENTITY_HEATER = "input_number.heater"
+CYCLE_TIME = 0.01
+
+
+def _value(body: str, name: str) -> float:
+    """Return the value of a metric line."""
+    for line in body.splitlines():
+        if line.startswith(f"{name} "):
+            return float(line.split()[1])
+    msg = f"Metric {name} not found"
+    raise KeyError(msg)
+
+
+async def test_metrics_view(
+    hass: HomeAssistant, hass_client: ClientSessionGenerator
+) -> None:
+    """Test the aggregate metrics in Prometheus format."""
+    hass.config.units = METRIC_SYSTEM
+    hass.states.async_set(ENTITY_SENSOR, 10.0)
+    assert await async_setup_component(
+        hass,
+        "input_number",
+        {
+            "input_number": {
+                "heater": {
+                    CONF_NAME: "Heater",
+                    CONF_MIN: 0,
+                    CONF_MAX: 100,
+                    CONF_STEP: 1,
+                }
+            }
+        },
+    )
+    assert await async_setup_component(
+        hass,
+        Platform.CLIMATE,
+        {
+            Platform.CLIMATE: {
+                CONF_PLATFORM: DOMAIN,
+                CONF_NAME: DEFAULT_NAME,
+                CONF_SENSOR: ENTITY_SENSOR,
+                CONF_HEATER: ENTITY_HEATER,
+                CONF_CYCLE_TIME: {"seconds": CYCLE_TIME},
+                CONF_PID_KP: 1.0,
+                CONF_PID_KI: 0.0,
+            }
+        },
+    )
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+    # Sleep some cyles.
+    await asyncio.sleep(CYCLE_TIME * 10)
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+    response = await client.get(METRICS_URL)
+    assert response.status == HTTPStatus.OK
+    body = await response.text()
+    assert _value(body, f"{DOMAIN}_computes_total") > 0
+    # Output stays at 9, so all writes but the first are suppressed
+    assert _value(body, f"{DOMAIN}_set_value_calls_total") >= 1
+    assert _value(body, f"{DOMAIN}_suppressed_writes_total") > 0
+    assert _value(body, f"{DOMAIN}_failed_writes_total") == 0
+    assert _value(body, f'{DOMAIN}_thermostats{{status="active"}}') == 1
+    assert _value(body, f'{DOMAIN}_thermostats{{status="off"}}') == 0
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    # Sleep some cyles. Set all off and to 0 to prevent from lingering errors.
+    await asyncio.sleep(CYCLE_TIME * 10)
+
+
+def test_worst_offenders() -> None:
+    """Test that the worst offenders table stays bounded."""
+    metrics = FleetMetrics()
+    for i in range(20):
+        metrics.record_lateness(f"climate.thermostat_{i}", float(i))
+    assert set(metrics.worst) == {f"climate.thermostat_{i}" for i in range(15, 20)}
+    assert metrics.lateness_count == 20  # noqa: PLR2004
+    metrics.remove("climate.thermostat_19")
+    assert "climate.thermostat_19" not in metrics.worst
+
+
+def test_worst_offenders_expire() -> None:
+    """Test that thermostats that stopped cycling leave the worst offenders."""
+    metrics = FleetMetrics()
+    with patch(
+        "custom_components.pid_thermostat.metrics.time.monotonic", return_value=0.0
+    ):
+        metrics.record_lateness("climate.stopped", 10.0)
+        metrics.record_lateness("climate.late", 1.0)
+    with patch(
+        "custom_components.pid_thermostat.metrics.time.monotonic",
+        return_value=WORST_WINDOW / 2,
+    ):
+        metrics.record_lateness("climate.late", 1.0)
+        assert set(metrics.worst) == {"climate.stopped", "climate.late"}
+    with patch(
+        "custom_components.pid_thermostat.metrics.time.monotonic",
+        return_value=WORST_WINDOW + 1,
+    ):
+        body = metrics.prometheus()
+    assert set(metrics.worst) == {"climate.late"}
+    assert "climate.stopped" not in body
@@ -0,0 +1,60 @@
+"""The tests for the explicit model predictive control law."""
+
+import math
+
+import pytest
+
+from custom_components.pid_thermostat.mpc import design_control_law
+
+GAIN = 0.2
+TIME_CONSTANT = 3600.0
+CYCLE_TIME = 60.0
+AMBIENT = 10.0
+SETPOINT = 20.0
+
+
+def test_memory_budget() -> None:
+    """Test the table fits the memory budget and the output limits."""
+    law = design_control_law(
+        GAIN,
+        TIME_CONSTANT,
+        CYCLE_TIME,
+        0.0,
+        100.0,
+        horizon=TIME_CONSTANT,
+        move_suppression=1.0,
+        memory=4096,
+    )
+    assert law.nbytes <= 4096  # noqa: PLR2004
+    assert law.as_dict()["grid"] == [8, 8, 8]
+    assert law.output(20.0, 0.0, 50.0) == 100.0  # noqa: PLR2004
+    assert law.output(-20.0, 0.0, 50.0) == 0.0
+    # At the setpoint and at rest the output is held
+    assert law.output(0.0, 0.0, 37.0) == pytest.approx(37.0)
+
+
+def test_closed_loop() -> None:
+    """Test the law reaches the setpoint without offset, within the limits."""
+    law = design_control_law(
+        GAIN,
+        TIME_CONSTANT,
+        CYCLE_TIME,
+        0.0,
+        100.0,
+        horizon=TIME_CONSTANT,
+        move_suppression=1.0,
+        memory=32768,
+    )
+    pole = math.exp(-CYCLE_TIME / TIME_CONSTANT)
+    temperature = previous = 15.0
+    output = 0.0
+    for _ in range(240):
+        output = law.output(SETPOINT - temperature, temperature - previous, output)
+        assert 0.0 <= output <= 100.0  # noqa: PLR2004
+        previous = temperature
+        temperature = (
+            AMBIENT + pole * (temperature - AMBIENT) + GAIN * (1 - pole) * output
+        )
+    assert temperature == pytest.approx(SETPOINT, abs=0.01)
+    # The output makes up for the heat loss, without a model of it
+    assert output == pytest.approx((SETPOINT - AMBIENT) / GAIN, abs=0.5)
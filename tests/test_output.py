@@ -0,0 +1,33 @@
+"""The tests for the output writers."""
+
+import pytest
+from homeassistant.core import HomeAssistant, State
+
+from custom_components.pid_thermostat.output import (
+    MultiOutputWriter,
+    OutputMapping,
+    OutputWriter,
+)
+
+ENTITY_VALVE = "input_number.valve"
+ENTITY_HEATER = "input_number.heater"
+
+
+async def test_zone_controller_output(hass: HomeAssistant) -> None:
+    """Test the controller output of a zone is not its mapped first output."""
+    writer = MultiOutputWriter(
+        hass,
+        [
+            OutputMapping(
+                OutputWriter(hass, ENTITY_VALVE, direct=False), 2.0, 1.0, None, None
+            ),
+            OutputMapping(
+                OutputWriter(hass, ENTITY_HEATER, direct=False), 1.0, 0.0, None, None
+            ),
+        ],
+    )
+    # Before the first write the mapping of the first output is inverted
+    assert writer.output(State(ENTITY_VALVE, "19.0")) == pytest.approx(9.0)
+    await writer.async_set_value(8.6)
+    # After it the written output is known, without its quantization
+    assert writer.output(State(ENTITY_VALVE, "20.0")) == pytest.approx(8.6)
@@ -0,0 +1,66 @@
+"""The tests for the learned steady-state output map."""
+
+import pytest
+
+from custom_components.pid_thermostat.output_map import (
+    SAMPLE_INTERVAL,
+    SETTLE_TIME,
+    OutputMap,
+)
+
+CYCLE = 60.0
+
+
+def _settle(
+    output_map: OutputMap, setpoint: float, outdoor: float, output: float
+) -> int:
+    """Run a settled loop until a sample is learned, return the cycles."""
+    now = 0.0
+    cycles = 0
+    while not output_map.learn(now, setpoint, outdoor, 0.1, output, saturated=False):
+        now += CYCLE
+        cycles += 1
+    return cycles
+
+
+def test_learn_and_lookup() -> None:
+    """Test a settled loop is learned and interpolated between setpoints."""
+    output_map = OutputMap()
+    assert output_map.lookup(20.0, 0.0) is None
+    cycles = _settle(output_map, 20.0, 0.0, 40.0)
+    assert cycles * CYCLE >= SETTLE_TIME + SAMPLE_INTERVAL
+    assert len(output_map) == 1
+    assert output_map.lookup(20.0, 0.0) == pytest.approx(40.0)
+    # Only the known cell next to the point counts
+    assert output_map.lookup(20.5, 0.0) == pytest.approx(40.0)
+    assert output_map.lookup(25.0, 0.0) is None
+
+    output_map.reset()
+    _settle(output_map, 21.0, 0.0, 50.0)
+    assert output_map.lookup(20.5, 0.0) == pytest.approx(45.0)
+
+    # Between the outdoor temperatures of the cells
+    output_map.reset()
+    _settle(output_map, 20.0, 5.0, 20.0)
+    assert output_map.lookup(20.0, 2.5) == pytest.approx(30.0)
+
+
+def test_not_settled() -> None:
+    """Test a large error or a saturated output restarts the settle time."""
+    output_map = OutputMap()
+    now = 0.0
+    while now < 2 * (SETTLE_TIME + SAMPLE_INTERVAL):
+        error = 1.0 if now % SETTLE_TIME == 0 else 0.0
+        assert not output_map.learn(now, 20.0, 0.0, error, 40.0, saturated=False)
+        now += CYCLE
+    assert not output_map.learn(now, 20.0, 0.0, 0.0, 100.0, saturated=True)
+    assert len(output_map) == 0
+
+
+def test_restore() -> None:
+    """Test the map survives a restart."""
+    output_map = OutputMap()
+    _settle(output_map, 19.0, -3.0, 60.0)
+    restored = OutputMap()
+    restored.restore(output_map.as_dict())
+    assert restored.lookup(19.0, -3.0) == pytest.approx(60.0)
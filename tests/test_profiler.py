@@ -0,0 +1,31 @@
+"""The tests for the profiler of the integration code paths."""
+
+import asyncio
+
+from custom_components.pid_thermostat.const import PROFILE_MODE_SAMPLING
+from custom_components.pid_thermostat.profiler import PROFILER, profiled
+
+
+async def test_suspension_not_profiled() -> None:
+    """Test the event loop work during an await is not attributed to a path."""
+    depths: list[tuple[str, int]] = []
+
+    @profiled
+    async def _path() -> int:
+        depths.append(("path", PROFILER._depth))  # noqa: SLF001
+        await asyncio.sleep(0.02)
+        depths.append(("path", PROFILER._depth))  # noqa: SLF001
+        return 1
+
+    async def _other() -> None:
+        await asyncio.sleep(0.01)
+        depths.append(("other", PROFILER._depth))  # noqa: SLF001
+
+    PROFILER.start(PROFILE_MODE_SAMPLING)
+    try:
+        result, _ = await asyncio.gather(_path(), _other())
+    finally:
+        PROFILER.stop()
+        PROFILER.reset()
+    assert result == 1
+    assert depths == [("path", 1), ("other", 0), ("path", 1)]
@@ -0,0 +1,55 @@
+"""The tests for the time-proportioning switch output."""
+
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.pid_thermostat.output import WriteResult
+from custom_components.pid_thermostat.pwm import PwmOutput
+
+ENT_SWITCH = "input_boolean.heater"
+PERIOD = 100.0
+MIN_TIME = 10.0
+
+
+async def test_on_time() -> None:
+    """Test the minimum on and off times."""
+    output = PwmOutput(None, ENT_SWITCH, PERIOD, MIN_TIME, MIN_TIME)
+    assert output.on_time(50.0) == 50.0  # noqa: PLR2004
+    # Too short to switch on, too short to switch off
+    assert output.on_time(5.0) == 0.0
+    assert output.on_time(95.0) == PERIOD
+    assert output.on_time(150.0) == PERIOD
+
+
+async def test_edges(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Test the switch is only called on edges from the shared scheduler."""
+    assert await async_setup_component(
+        hass, "input_boolean", {"input_boolean": {"heater": {}}}
+    )
+    output = PwmOutput(hass, ENT_SWITCH, PERIOD, MIN_TIME, MIN_TIME)
+
+    assert await output.async_set_value(50.0) is WriteResult.WRITTEN
+    await hass.async_block_till_done()
+    assert hass.states.get(ENT_SWITCH).state == STATE_ON
+    # Already on: the next cycle only moves the off edge
+    assert await output.async_set_value(60.0) is WriteResult.SUPPRESSED
+
+    freezer.tick(timedelta(seconds=55))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENT_SWITCH).state == STATE_ON
+
+    freezer.tick(timedelta(seconds=10))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENT_SWITCH).state == STATE_OFF
+
+    # Below the minimum on time the switch is not turned on
+    assert await output.async_set_value(5.0) is WriteResult.SUPPRESSED
+    await hass.async_block_till_done()
+    assert hass.states.get(ENT_SWITCH).state == STATE_OFF
@@ -0,0 +1,133 @@
+"""The tests for the on-demand refresh of polled sensors."""
+
+import asyncio
+
+import pytest
+from homeassistant.components.climate import (
+    ATTR_CURRENT_TEMPERATURE,
+    ATTR_HVAC_MODE,
+    SERVICE_SET_HVAC_MODE,
+    HVACMode,
+)
+from homeassistant.components.input_number import CONF_MAX, CONF_MIN, CONF_STEP
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_NAME,
+    CONF_PLATFORM,
+    CONF_TIMEOUT,
+    Platform,
+)
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.setup import async_setup_component
+from homeassistant.util.unit_system import METRIC_SYSTEM
+
+from custom_components.pid_thermostat.const import (
+    CONF_CYCLE_TIME,
+    CONF_HEATER,
+    CONF_MAX_AGE,
+    CONF_SENSOR,
+    CONF_SENSOR_REFRESH,
+    DEFAULT_NAME,
+    DOMAIN,
+)
+from custom_components.pid_thermostat.refresh import (
+    HOMEASSISTANT_DOMAIN,
+    SERVICE_UPDATE_ENTITY,
+    async_get_refresher,
+)
+
+ENTITY_CLIMATE = "climate.pid_thermostat"
+ENTITY_SENSOR = "sensor.temperature"
+ENTITY_HEATER = "input_number.heater"
+CYCLE_TIME = 0.01
+POLL_TIME = 0.05
+
+
+@pytest.fixture(name="update_calls")
+def fixture_update_calls(hass: HomeAssistant) -> list[str]:
+    """Register a slow update_entity service that polls the sensor to 15 °C."""
+    calls: list[str] = []
+
+    async def _async_update_entity(call: ServiceCall) -> None:
+        calls.append(call.data[ATTR_ENTITY_ID])
+        await asyncio.sleep(POLL_TIME)
+        if call.data[ATTR_ENTITY_ID] != ENTITY_SENSOR:
+            msg = "Entity does not support polling"
+            raise HomeAssistantError(msg)
+        hass.states.async_set(ENTITY_SENSOR, 15.0)
+
+    hass.services.async_register(
+        HOMEASSISTANT_DOMAIN, SERVICE_UPDATE_ENTITY, _async_update_entity
+    )
+    return calls
+
+
+async def test_coalesced_refresh(hass: HomeAssistant, update_calls: list[str]) -> None:
+    """Test thermostats on the same sensor share one refresh."""
+    refresher = async_get_refresher(hass)
+    results = await asyncio.gather(
+        refresher.async_refresh(ENTITY_SENSOR),
+        refresher.async_refresh(ENTITY_SENSOR),
+        refresher.async_refresh(ENTITY_SENSOR),
+    )
+    assert results == [True, True, True]
+    assert update_calls == [ENTITY_SENSOR]
+
+    # A waiter that gives up does not cancel the refresh of the others
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(POLL_TIME / 5):
+            await refresher.async_refresh(ENTITY_SENSOR)
+    assert await refresher.async_refresh(ENTITY_SENSOR)
+    assert update_calls == [ENTITY_SENSOR, ENTITY_SENSOR]
+    assert hass.states.get(ENTITY_SENSOR).state == "15.0"
+
+    assert not await refresher.async_refresh("sensor.not_polled")
+
+
+async def test_refresh_before_cycle(
+    hass: HomeAssistant, update_calls: list[str]
+) -> None:
+    """Test an old sensor value is refreshed before the thermostat computes."""
+    hass.config.units = METRIC_SYSTEM
+    hass.states.async_set(ENTITY_SENSOR, 10.0)
+    assert await async_setup_component(
+        hass,
+        "input_number",
+        {"input_number": {"heater": {CONF_MIN: 0, CONF_MAX: 100, CONF_STEP: 1}}},
+    )
+    assert await async_setup_component(
+        hass,
+        Platform.CLIMATE,
+        {
+            Platform.CLIMATE: {
+                CONF_PLATFORM: DOMAIN,
+                CONF_NAME: DEFAULT_NAME,
+                CONF_SENSOR: ENTITY_SENSOR,
+                CONF_HEATER: ENTITY_HEATER,
+                CONF_CYCLE_TIME: {"seconds": CYCLE_TIME},
+                CONF_SENSOR_REFRESH: {
+                    CONF_MAX_AGE: {"seconds": CYCLE_TIME},
+                    CONF_TIMEOUT: {"seconds": POLL_TIME * 4},
+                },
+            }
+        },
+    )
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+    await asyncio.sleep(POLL_TIME * 3)
+    assert ENTITY_SENSOR in update_calls
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes[ATTR_CURRENT_TEMPERATURE] == 15.0  # noqa: PLR2004
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
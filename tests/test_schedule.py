@@ -0,0 +1,210 @@
+"""The tests for the PID thermostat setpoint schedules."""
+
+from datetime import datetime, time, timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.climate import (
+    ATTR_PRESET_MODE,
+    PRESET_AWAY,
+    PRESET_NONE,
+    SERVICE_SET_PRESET_MODE,
+)
+from homeassistant.components.input_number import CONF_MAX, CONF_MIN, CONF_STEP
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    ATTR_TEMPERATURE,
+    CONF_NAME,
+    CONF_PLATFORM,
+    Platform,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_system import METRIC_SYSTEM
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.pid_thermostat.const import (
+    ATTR_SCHEDULE,
+    ATTR_TIME,
+    CONF_AWAY_TEMP,
+    CONF_HEATER,
+    CONF_SENSOR,
+    DEFAULT_NAME,
+    DOMAIN,
+    SERVICE_SET_SCHEDULE,
+)
+from custom_components.pid_thermostat.schedule import (
+    DATA_SCHEDULER,
+    MINUTES_PER_WEEK,
+    WeekSchedule,
+)
+
+ENTITY_CLIMATE = "climate.pid_thermostat"
+ENTITY_SENSOR = "sensor.temperature"
+ENTITY_HEATER = "input_number.heater"
+AWAY_TEMP = 12.0
+
+SCHEDULE = {
+    "mon": [
+        {ATTR_TIME: "06:00", ATTR_TEMPERATURE: 20.0},
+        {ATTR_TIME: "07:00", ATTR_TEMPERATURE: 22.0},
+    ],
+    "sun": [{ATTR_TIME: "22:00", ATTR_TEMPERATURE: 16.0}],
+}
+
+
+def _local(hour: int, minute: int = 0) -> datetime:
+    """Return a local time on Monday 2024-01-01."""
+    return datetime(2024, 1, 1, hour, minute, tzinfo=dt_util.get_default_time_zone())
+
+
+def test_week_schedule() -> None:
+    """Test the compiled transition arrays."""
+    schedule = WeekSchedule.from_days(
+        {
+            "mon": [{ATTR_TIME: time(6, 0), ATTR_TEMPERATURE: 20.0}],
+            "sun": [{ATTR_TIME: time(22, 0), ATTR_TEMPERATURE: 16.5}],
+        }
+    )
+    assert list(schedule.minutes) == [360, MINUTES_PER_WEEK - 120]
+    # Before the first transition, the last one of the previous week is active
+    assert schedule.setpoint_at(0) == 16.5  # noqa: PLR2004
+    assert schedule.setpoint_at(360) == 20.0  # noqa: PLR2004
+    assert schedule.next_transition(360) == (MINUTES_PER_WEEK - 480, 16.5)
+    assert schedule.next_transition(MINUTES_PER_WEEK - 1) == (361, 20.0)
+    assert schedule.previous_transition(0) == (120, 16.5)
+    assert schedule.previous_transition(400) == (40, 20.0)
+    assert list(WeekSchedule.from_flat(schedule.as_flat()).minutes) == list(
+        schedule.minutes
+    )
+
+
+@pytest.fixture(autouse=True)
+async def fixture_setup_thermostat(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Initialize hass, helper components and a thermostat."""
+    freezer.move_to(_local(5, 30))
+    hass.config.units = METRIC_SYSTEM
+    hass.states.async_set(ENTITY_SENSOR, 10.0)
+    assert await async_setup_component(
+        hass,
+        "input_number",
+        {
+            "input_number": {
+                "heater": {
+                    CONF_NAME: "Heater",
+                    CONF_MIN: 0,
+                    CONF_MAX: 100,
+                    CONF_STEP: 1,
+                }
+            }
+        },
+    )
+    assert await async_setup_component(
+        hass,
+        Platform.CLIMATE,
+        {
+            Platform.CLIMATE: {
+                CONF_PLATFORM: DOMAIN,
+                CONF_NAME: DEFAULT_NAME,
+                CONF_SENSOR: ENTITY_SENSOR,
+                CONF_HEATER: ENTITY_HEATER,
+                CONF_AWAY_TEMP: AWAY_TEMP,
+            }
+        },
+    )
+    await hass.async_block_till_done()
+
+
+async def test_schedule_transitions(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that scheduled setpoints are applied at their transitions."""
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_SCHEDULE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_SCHEDULE: SCHEDULE},
+        blocking=True,
+    )
+    # Current period started Sunday 22:00
+    assert hass.states.get(ENTITY_CLIMATE).attributes[ATTR_TEMPERATURE] == 16.0  # noqa: PLR2004
+
+    freezer.move_to(_local(6))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_CLIMATE).attributes[ATTR_TEMPERATURE] == 20.0  # noqa: PLR2004
+
+    freezer.move_to(_local(7))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_CLIMATE).attributes[ATTR_TEMPERATURE] == 22.0  # noqa: PLR2004
+
+
+async def test_schedule_while_away(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that a transition while away is applied when returning."""
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_PRESET_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_PRESET_MODE: PRESET_AWAY},
+        blocking=True,
+    )
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_SCHEDULE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_SCHEDULE: SCHEDULE},
+        blocking=True,
+    )
+    freezer.move_to(_local(6))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(ENTITY_CLIMATE).attributes[ATTR_TEMPERATURE] == AWAY_TEMP
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_PRESET_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_PRESET_MODE: PRESET_NONE},
+        blocking=True,
+    )
+    assert hass.states.get(ENTITY_CLIMATE).attributes[ATTR_TEMPERATURE] == 20.0  # noqa: PLR2004
+
+
+class _Thermostat:
+    """Thermostat that records the scheduled setpoints."""
+
+    def __init__(self, entity_id: str) -> None:
+        self.entity_id = entity_id
+        self.setpoints: list[float] = []
+
+    def apply_scheduled_setpoint(self, temperature: float) -> None:
+        self.setpoints.append(temperature)
+
+    def async_write_ha_state(self) -> None:
+        """Write the state."""
+
+
+async def test_register_applies_missed_transition(hass: HomeAssistant) -> None:
+    """Test a thermostat gets the transition it missed while not running."""
+    scheduler = hass.data[DATA_SCHEDULER]
+    scheduler.async_set_schedule("climate.other", WeekSchedule.from_days(SCHEDULE))
+
+    # Last seen before the transition of Sunday 22:00
+    thermostat = _Thermostat("climate.other")
+    scheduler.async_register(thermostat, _local(5) - timedelta(days=1))
+    assert thermostat.setpoints == [16.0]
+    scheduler.async_unregister(thermostat.entity_id)
+
+    # Last seen after it, a setpoint set by hand since is kept
+    thermostat = _Thermostat("climate.other")
+    scheduler.async_register(thermostat, _local(5))
+    assert thermostat.setpoints == []
+    scheduler.async_unregister(thermostat.entity_id)
+
+    # A new thermostat starts in the active block
+    thermostat = _Thermostat("climate.other")
+    scheduler.async_register(thermostat)
+    assert thermostat.setpoints == [16.0]
+    scheduler.async_unregister(thermostat.entity_id)
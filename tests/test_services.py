@@ -0,0 +1,247 @@
+"""The tests for the PID thermostat services."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from homeassistant.components.climate import (
+    ATTR_HVAC_MODE,
+    SERVICE_SET_HVAC_MODE,
+    HVACMode,
+)
+from homeassistant.components.input_number import CONF_MAX, CONF_MIN, CONF_STEP
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    ATTR_TEMPERATURE,
+    CONF_NAME,
+    CONF_PLATFORM,
+    Platform,
+)
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import ServiceValidationError, Unauthorized
+from homeassistant.setup import async_setup_component
+from homeassistant.util.unit_system import METRIC_SYSTEM
+from pytest_homeassistant_custom_component.common import MockUser
+
+from custom_components.pid_thermostat.autotune import AutotuneState
+from custom_components.pid_thermostat.const import (
+    ATTR_AUTOTUNE,
+    ATTR_COMPUTE,
+    ATTR_DURATION,
+    ATTR_HOTSPOTS,
+    ATTR_MAX_DEVIATION,
+    ATTR_MODE,
+    ATTR_THERMOSTATS,
+    CONF_CYCLE_TIME,
+    CONF_HEATER,
+    CONF_SENSOR,
+    DEFAULT_NAME,
+    DEFAULT_TARGET_TEMPERATURE,
+    DOMAIN,
+    PROFILE_MODE_DETERMINISTIC,
+    PROFILE_MODE_SAMPLING,
+    SERVICE_AUTOTUNE,
+    SERVICE_BULK_SET,
+    SERVICE_PROFILE,
+)
+from custom_components.pid_thermostat.profiler import PROFILER
+
+ENTITY_CLIMATE = "climate.pid_thermostat"
+ENTITY_SENSOR = "sensor.temperature"
+ENTITY_HEATER = "input_number.heater"
+CYCLE_TIME = 0.01
+
+CLIMATE_CONFIG = {
+    Platform.CLIMATE: {
+        CONF_PLATFORM: DOMAIN,
+        CONF_NAME: DEFAULT_NAME,
+        CONF_SENSOR: ENTITY_SENSOR,
+        CONF_HEATER: ENTITY_HEATER,
+        CONF_CYCLE_TIME: {"seconds": CYCLE_TIME},
+    }
+}
+NUMBER_CONFIG = {
+    "input_number": {
+        "heater": {
+            CONF_NAME: "Floor heater",
+            CONF_MIN: 0,
+            CONF_MAX: 100,
+            CONF_STEP: 1,
+        }
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+async def fixture_setup_thermostat(hass: HomeAssistant) -> None:
+    """Initialize hass, helper components and a running thermostat."""
+    hass.config.units = METRIC_SYSTEM
+    hass.states.async_set(ENTITY_SENSOR, 10.0)
+    assert await async_setup_component(hass, "input_number", NUMBER_CONFIG)
+    assert await async_setup_component(hass, Platform.CLIMATE, CLIMATE_CONFIG)
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.HEAT},
+        blocking=True,
+    )
+
+
+@pytest.mark.parametrize("mode", [PROFILE_MODE_DETERMINISTIC, PROFILE_MODE_SAMPLING])
+async def test_profile(hass: HomeAssistant, mode: str) -> None:
+    """Test profiling the integration code paths."""
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PROFILE,
+        {ATTR_DURATION: 1, ATTR_MODE: mode, ATTR_HOTSPOTS: 5},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["mode"] == mode
+    assert len(response["hotspots"]) <= 5  # noqa: PLR2004
+    stats_file = Path(response["file"])
+    assert stats_file.is_file()
+    assert stats_file.parent == Path(hass.config.config_dir)
+    stats_file.unlink()
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+
+
+async def test_profile_admin_only(
+    hass: HomeAssistant, hass_read_only_user: MockUser
+) -> None:
+    """Test that only an admin can profile."""
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROFILE,
+            {ATTR_DURATION: 1, ATTR_MODE: PROFILE_MODE_DETERMINISTIC},
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+            return_response=True,
+        )
+    assert not PROFILER.busy
+
+
+async def test_profile_cancelled(hass: HomeAssistant) -> None:
+    """Test a cancelled profile call releases the profiler."""
+    call = hass.async_create_task(
+        hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROFILE,
+            {ATTR_DURATION: 60, ATTR_MODE: PROFILE_MODE_DETERMINISTIC},
+            blocking=True,
+            return_response=True,
+        )
+    )
+    await asyncio.sleep(CYCLE_TIME * 3)
+    assert PROFILER.busy
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    assert not PROFILER.busy
+    assert not PROFILER.active
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+
+
+async def test_bulk_set(hass: HomeAssistant) -> None:
+    """Test setting setpoints and modes of thermostats in one call."""
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        {
+            ATTR_THERMOSTATS: {
+                ENTITY_CLIMATE: {ATTR_TEMPERATURE: 21.5, ATTR_HVAC_MODE: HVACMode.OFF}
+            },
+            ATTR_COMPUTE: True,
+        },
+        blocking=True,
+    )
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.state == HVACMode.OFF
+    assert state.attributes[ATTR_TEMPERATURE] == 21.5  # noqa: PLR2004
+
+    # A plain number is a shorthand for the setpoint
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        {ATTR_THERMOSTATS: {ENTITY_CLIMATE: 18}},
+        blocking=True,
+    )
+    assert hass.states.get(ENTITY_CLIMATE).attributes[ATTR_TEMPERATURE] == 18  # noqa: PLR2004
+
+
+async def test_bulk_set_invalid(hass: HomeAssistant) -> None:
+    """Test that an invalid entry does not change any thermostat."""
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_BULK_SET,
+            {
+                ATTR_THERMOSTATS: {
+                    ENTITY_CLIMATE: 25,
+                    "climate.unknown": 20,
+                }
+            },
+            blocking=True,
+        )
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_BULK_SET,
+            {ATTR_THERMOSTATS: {ENTITY_CLIMATE: {ATTR_HVAC_MODE: HVACMode.COOL}}},
+            blocking=True,
+        )
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.state == HVACMode.HEAT
+    assert state.attributes[ATTR_TEMPERATURE] == DEFAULT_TARGET_TEMPERATURE
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+
+
+async def test_autotune(hass: HomeAssistant) -> None:
+    """Test starting an autotune, and its abort when the thermostat is off."""
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_AUTOTUNE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_MAX_DEVIATION: 20},
+        blocking=True,
+    )
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes[ATTR_AUTOTUNE]["state"] == AutotuneState.RUNNING
+
+    await hass.services.async_call(
+        Platform.CLIMATE,
+        SERVICE_SET_HVAC_MODE,
+        {ATTR_ENTITY_ID: ENTITY_CLIMATE, ATTR_HVAC_MODE: HVACMode.OFF},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    state = hass.states.get(ENTITY_CLIMATE)
+    assert state.attributes[ATTR_AUTOTUNE]["state"] == AutotuneState.ABORTED
+
+    # Only a thermostat that is on can be tuned
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_AUTOTUNE,
+            {ATTR_ENTITY_ID: ENTITY_CLIMATE},
+            blocking=True,
+        )
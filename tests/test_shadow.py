@@ -0,0 +1,34 @@
+"""The tests for the shadow controllers."""
+
+import pytest
+
+from custom_components.pid_thermostat.shadow import ShadowController
+
+LIMITS = (0.0, 100.0)
+
+
+def test_shadow_output() -> None:
+    """Test the would-be output starts bumpless and follows the gains."""
+    shadow = ShadowController("fast", 10.0, 0.1, 0.0, 1)
+    # Integral starts at the live output
+    assert shadow.compute(20.0, 19.0, 0.0, 0.0, 30.0, LIMITS) == pytest.approx(40.0)
+    assert shadow.compute(20.0, 19.0, 0.0, 10.0, 30.0, LIMITS) == pytest.approx(41.0)
+    # Clamped to the output limits, cooling reverses the error
+    cooler = ShadowController("cool", 10.0, 0.1, 0.0, -1)
+    assert cooler.compute(20.0, 19.0, 0.0, 0.0, 0.0, LIMITS) == 0.0
+
+
+def test_effort_comparison() -> None:
+    """Test the running comparison with the live output."""
+    shadow = ShadowController("fast", 10.0, 0.0, 0.0, 1)
+    for process_value, live_output in ((19.0, 10.0), (19.5, 20.0), (19.0, 10.0)):
+        shadow.compute(20.0, process_value, 0.0, 30.0, live_output, LIMITS)
+    # Outputs 20, 15, 20 against live outputs 10, 20, 10
+    assert shadow.as_dict() == {
+        "output": 20.0,
+        "effort": 10.0,
+        "live_effort": 20.0,
+        "mean_output": 18.33,
+        "live_mean_output": 13.33,
+        "mean_difference": 8.33,
+    }
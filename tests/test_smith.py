@@ -0,0 +1,47 @@
+"""The tests for the Smith predictor dead-time compensation."""
+
+import pytest
+
+from custom_components.pid_thermostat.smith import SmithPredictor
+
+
+def test_dead_time_compensation() -> None:
+    """Test the correction covers the effect that is still in the dead time."""
+    predictor = SmithPredictor(0.1, 600.0, 90.0, 30.0, 1)
+    assert predictor.delay_cycles == 3  # noqa: PLR2004
+    assert predictor.correct(20.0) == 20.0  # noqa: PLR2004
+    predictor.update(50.0)
+    assert predictor.undelayed > 0
+    assert predictor.delayed == 0
+    assert predictor.correct(20.0) == pytest.approx(20.0 + predictor.undelayed)
+    for _ in range(3):
+        predictor.update(50.0)
+    # After the dead time the delayed model follows the undelayed one
+    assert predictor.delayed > 0
+    assert predictor.correct(20.0) < 20.0 + predictor.undelayed
+
+
+def test_steady_state() -> None:
+    """Test the correction vanishes at steady state and follows the direction."""
+    predictor = SmithPredictor(0.1, 60.0, 60.0, 30.0, -1)
+    for _ in range(200):
+        predictor.update(50.0)
+    assert predictor.undelayed == pytest.approx(-5.0)
+    assert predictor.correct(20.0) == pytest.approx(20.0)
+    assert predictor.slope == pytest.approx(0.0)
+
+
+def test_restore() -> None:
+    """Test the model state is restored unless the delay line changed."""
+    predictor = SmithPredictor(0.1, 600.0, 90.0, 30.0, 1)
+    for output in (10.0, 20.0, 30.0):
+        predictor.update(output)
+    data = predictor.as_dict()
+
+    restored = SmithPredictor(0.1, 600.0, 90.0, 30.0, 1)
+    restored.restore(data)
+    assert restored.correct(20.0) == predictor.correct(20.0)
+
+    resized = SmithPredictor(0.1, 600.0, 300.0, 30.0, 1)
+    resized.restore(data)
+    assert resized.undelayed == 0
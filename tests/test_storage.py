@@ -0,0 +1,89 @@
+"""The tests for the integration-wide thermostat state store."""
+
+from datetime import timedelta
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, Platform
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.pid_thermostat.const import DOMAIN
+from custom_components.pid_thermostat.storage import (
+    SAVE_DELAY,
+    SECTION_SCHEDULE,
+    STORAGE_KEY,
+    ThermostatStore,
+)
+
+ENTITY_CLIMATE = "climate.pid_thermostat"
+ENTITY_OTHER = "climate.other_thermostat"
+SCHEDULE = [360, 20.0, 420, 22.0]
+
+
+async def test_coalesced_writes(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that changes are written in one delayed write."""
+    store = ThermostatStore(hass)
+    await store.async_load()
+    store.async_set(ENTITY_CLIMATE, SECTION_SCHEDULE, SCHEDULE)
+    freezer.tick(timedelta(seconds=SAVE_DELAY / 2))
+    store.async_set(ENTITY_OTHER, SECTION_SCHEDULE, SCHEDULE)
+    assert STORAGE_KEY not in hass_storage
+
+    # Further changes do not postpone the pending write
+    freezer.tick(timedelta(seconds=SAVE_DELAY / 2))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert set(hass_storage[STORAGE_KEY]["data"]["thermostats"]) == {
+        ENTITY_CLIMATE,
+        ENTITY_OTHER,
+    }
+
+    store.async_remove(ENTITY_OTHER, SECTION_SCHEDULE)
+    freezer.tick(timedelta(seconds=SAVE_DELAY))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY]["data"]["thermostats"] == {
+        ENTITY_CLIMATE: {SECTION_SCHEDULE: SCHEDULE}
+    }
+
+
+async def test_follow_entity_registry(hass: HomeAssistant) -> None:
+    """Test that entries move along with renames and go with removals."""
+    registry = er.async_get(hass)
+    registry.async_get_or_create(
+        Platform.CLIMATE, DOMAIN, "pid_thermostat", suggested_object_id="pid_thermostat"
+    )
+    store = ThermostatStore(hass)
+    await store.async_load()
+    store.async_set(ENTITY_CLIMATE, SECTION_SCHEDULE, SCHEDULE)
+
+    registry.async_update_entity(ENTITY_CLIMATE, new_entity_id=ENTITY_OTHER)
+    await hass.async_block_till_done()
+    assert store.get(ENTITY_CLIMATE, SECTION_SCHEDULE) is None
+    assert store.get(ENTITY_OTHER, SECTION_SCHEDULE) == SCHEDULE
+
+    registry.async_remove(ENTITY_OTHER)
+    await hass.async_block_till_done()
+    assert store.get(ENTITY_OTHER, SECTION_SCHEDULE) is None
+
+
+async def test_prune_on_start(hass: HomeAssistant) -> None:
+    """Test that entries of thermostats gone while stopped are dropped."""
+    hass.set_state(CoreState.not_running)
+    store = ThermostatStore(hass)
+    await store.async_load()
+    store.async_set(ENTITY_CLIMATE, SECTION_SCHEDULE, SCHEDULE)
+    store.async_set(ENTITY_OTHER, SECTION_SCHEDULE, SCHEDULE)
+    # A thermostat without a unique id is only known by its state
+    hass.states.async_set(ENTITY_CLIMATE, "heat")
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+    assert store.get(ENTITY_CLIMATE, SECTION_SCHEDULE) == SCHEDULE
+    assert store.get(ENTITY_OTHER, SECTION_SCHEDULE) is None
@@ -0,0 +1,78 @@
+"""The tests for the out-of-process compute worker."""
+
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.pid_thermostat.compute_worker import compute
+from custom_components.pid_thermostat.worker import ComputeWorker
+
+REQUEST = {
+    "direction": 1,
+    "min": 0.0,
+    "max": 100.0,
+    "setpoint": 20.0,
+    "input": 19.0,
+    "kp": 10.0,
+    "ki": 0.1,
+    "kd": 100.0,
+    "slope": 0.01,
+}
+
+
+def test_compute() -> None:
+    """Test the worker computes the terms of the in-process controller."""
+    state = {"i_term": 30.0, "last_time": None}
+    reply = compute(state, {**REQUEST, "time": 0.0})
+    assert reply["output"] == pytest.approx(39.0)
+    reply = compute(state, {**REQUEST, "time": 10.0})
+    assert reply["p"] == pytest.approx(10.0)
+    assert reply["i"] == pytest.approx(31.0)
+    assert reply["d"] == pytest.approx(-1.0)
+    assert reply["state"] == {"i_term": pytest.approx(31.0), "last_time": 10.0}
+    # Cooling reverses the error, the output is clamped
+    reply = compute(state, {**REQUEST, "direction": -1, "kp": 100.0, "time": 20.0})
+    assert reply["output"] == 0.0
+
+
+async def test_worker_restart(hass: HomeAssistant) -> None:
+    """Test a killed worker is restarted and given the state again."""
+    worker = ComputeWorker(hass)
+    state = {"i_term": 30.0, "last_time": None}
+    try:
+        reply = await worker.async_compute(
+            "climate.test", {**REQUEST, "time": 0.0}, state
+        )
+        state = reply["state"]
+        # The worker holds the state, a stale copy is not sent
+        reply = await worker.async_compute(
+            "climate.test", {**REQUEST, "time": 10.0}, {"i_term": 0.0}
+        )
+        assert reply["i"] == pytest.approx(31.0)
+        state = reply["state"]
+        worker._process.kill()  # noqa: SLF001
+        reply = await worker.async_compute(
+            "climate.test", {**REQUEST, "time": 20.0}, state
+        )
+        assert reply["i"] == pytest.approx(32.0)
+    finally:
+        await worker.async_shutdown()
+
+
+async def test_missing_reply(hass: HomeAssistant) -> None:
+    """Test a batch without the reply of a thermostat resolves all its requests."""
+    worker = ComputeWorker(hass)
+
+    async def _async_send(batch: dict) -> dict:
+        return {"climate.test": {"output": 1.0}} if batch else {}
+
+    worker._async_send = _async_send  # noqa: SLF001
+    results = await asyncio.gather(
+        worker.async_compute("climate.test", REQUEST, None),
+        worker.async_compute("climate.other", REQUEST, None),
+        return_exceptions=True,
+    )
+    assert results[0] == {"output": 1.0}
+    assert isinstance(results[1], HomeAssistantError)